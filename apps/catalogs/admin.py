@@ -51,7 +51,7 @@ class StationAdmin(admin.ModelAdmin):
     list_display = ('name', 'field', 'station_type', 'is_operational', 'installed_at')
     list_filter = ('station_type', 'is_operational', 'field')
     search_fields = ('name', 'field__name')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('thingspeak_last_entry_id', 'thingspeak_synced_at', 'created_at', 'updated_at')
     autocomplete_fields = ['field']
     fieldsets = (
         ('Información General', {
@@ -60,6 +60,12 @@ class StationAdmin(admin.ModelAdmin):
         ('Estado', {
             'fields': ('is_operational', 'installed_at')
         }),
+        ('ThingSpeak', {
+            'fields': (
+                'thingspeak_channel_id', 'thingspeak_api_key', 'thingspeak_fields',
+                'thingspeak_last_entry_id', 'thingspeak_synced_at',
+            )
+        }),
         ('Detalles', {
             'fields': ('notes',)
         }),
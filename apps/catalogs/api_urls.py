@@ -7,6 +7,8 @@ from .views import (
     CampaignListView,
     SensorDataAPIView,
     SensorChannelInfoAPIView,
+    SensorCacheStatsAPIView,
+    VariableSeriesView,
 )
 
 urlpatterns = [
@@ -16,4 +18,6 @@ urlpatterns = [
     # Sensores IoT
     path('sensors/data/', SensorDataAPIView.as_view(), name='sensors-data'),
     path('sensors/channel/', SensorChannelInfoAPIView.as_view(), name='sensors-channel-info'),
+    path('sensors/cache/', SensorCacheStatsAPIView.as_view(), name='sensors-cache-stats'),
+    path('variables/series/', VariableSeriesView.as_view(), name='variables-series'),
 ]
@@ -0,0 +1,161 @@
+"""
+Caché en memoria de las respuestas de sensores (stale-while-revalidate).
+
+El dashboard de sensores consulta los datos cada pocos segundos desde cada
+navegador abierto. Las respuestas se guardan por parámetros de consulta
+(estación, `results`, `start_date`, `end_date`) durante `SENSOR_CACHE_TTL`
+segundos:
+
+- Respuesta vigente: se entrega sin consultar la base de datos (`hits`).
+- Respuesta vencida hace menos de `SENSOR_CACHE_MAX_STALE` segundos: se
+  entrega de inmediato (`stale_hits`) y un solo hilo en segundo plano la
+  actualiza (`refreshes`), aunque lleguen muchas peticiones a la vez.
+- Sin respuesta o demasiado antigua (`misses`): la primera petición la calcula
+  y las demás peticiones con los mismos parámetros esperan ese resultado
+  (`coalesced`) en lugar de repetir la consulta.
+
+Así la carga sobre la base de datos y la latencia no crecen con el número de
+usuarios viendo el dashboard. La caché y sus contadores son del proceso;
+con `SENSOR_CACHE_TTL = 0` se desactiva.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class SensorDataCache:
+    """
+    Caché LRU en memoria con actualización en segundo plano.
+
+    Los contadores (`hits`, `stale_hits`, `misses`, `coalesced`, `refreshes`,
+    `refresh_errors`) son del proceso actual.
+    """
+
+    def __init__(self, ttl, max_stale, max_entries):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._entries = OrderedDict()  # clave -> (valor, momento de carga)
+        self._loading = {}  # clave -> lock de la petición que la calcula
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def _store(self, key, value, loaded_at):
+        with self._lock:
+            self._entries[key] = (value, loaded_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        Valor guardado para la clave, calculándolo si hace falta.
+
+        Args:
+            key: Clave hashable con los parámetros de la consulta
+            loader: Función sin argumentos que calcula el valor; sus excepciones
+                se propagan y no se guardan
+
+        Returns:
+            Valor de la caché o de `loader()`
+        """
+        if not self.enabled:
+            return loader()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry[1] if entry is not None else None
+            if entry is not None and age <= self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            if entry is not None and age <= self.ttl + self.max_stale:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(
+                        target=self._refresh, args=(key, loader), name='sensor-cache-refresh', daemon=True
+                    ).start()
+                return entry[0]
+            self.misses += 1
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                current = self._entries.get(key)
+                if current is not None and current is not entry:
+                    # Otra petición la calculó mientras esta esperaba
+                    self.coalesced += 1
+                    return current[0]
+            try:
+                loaded_at = time.monotonic()
+                value = loader()
+                self._store(key, value, loaded_at)
+            finally:
+                with self._lock:
+                    if self._loading.get(key) is key_lock:
+                        del self._loading[key]
+        return value
+
+    def _refresh(self, key, loader):
+        try:
+            loaded_at = time.monotonic()
+            value = loader()
+            self._store(key, value, loaded_at)
+            with self._lock:
+                self.refreshes += 1
+        except Exception:
+            logger.exception("No se pudo actualizar la caché de sensores")
+            with self._lock:
+                self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+            # El hilo abre su propia conexión a la base de datos
+            connections.close_all()
+
+    def stats(self):
+        """
+        Estadísticas de la caché.
+
+        Returns:
+            dict: Contadores del proceso y respuestas guardadas
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'ttl_seconds': self.ttl,
+                'max_stale_seconds': self.max_stale,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+                'coalesced': self.coalesced,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+sensor_data_cache = SensorDataCache(
+    settings.SENSOR_CACHE_TTL, settings.SENSOR_CACHE_MAX_STALE, settings.SENSOR_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,295 @@
+"""
+Importación de lecturas de ThingSpeak a `Variable`.
+
+Cada estación con `thingspeak_channel_id` guarda el `entry_id` de la última
+lectura importada (`thingspeak_last_entry_id`). En cada consulta se piden las
+últimas lecturas del canal y solo se insertan las posteriores a esa marca, con
+`source='automatic'`, una fila por campo configurado. Si el canal tiene más
+lecturas nuevas que las de la primera página (p. ej. el worker estuvo detenido)
+se piden de nuevo todas las pendientes, hasta el máximo de 8000 de ThingSpeak.
+
+La marca se lee y se actualiza en la misma transacción que la inserción, con la
+estación bloqueada, de modo que dos workers no importan la misma lectura dos
+veces. Si el canal se vació en ThingSpeak (su último `entry_id` es menor que la
+marca) se piden de nuevo todas sus lecturas y la importación empieza desde el
+principio.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.events.models import Variable
+from .models import Station
+from .sensors import get_station_service
+
+logger = logging.getLogger(__name__)
+
+# Lecturas pedidas en cada consulta; si hay más pendientes se piden todas
+POLL_RESULTS = 100
+# Máximo de lecturas por petición que acepta ThingSpeak
+MAX_RESULTS = 8000
+INSERT_BATCH_SIZE = 1000
+
+# Campos del canal cuando la estación no tiene `thingspeak_fields`
+DEFAULT_FIELD_MAP = {
+    'field1': 'air_temp',
+    'field2': 'humidity',
+}
+
+VARIABLE_UNITS = {
+    'soil_moisture': '%',
+    'soil_temp': '°C',
+    'soil_ec': 'µS/cm',
+    'soil_ph': 'pH',
+    'air_temp': '°C',
+    'humidity': '%',
+    'precipitation': 'mm',
+    'wind_speed': 'm/s',
+    'solar_radiation': 'W/m²',
+    'ndvi': '',
+    'ndre': '',
+}
+
+# Límite de Variable.value (max_digits=12, decimal_places=4)
+MAX_VALUE = Decimal('1e8')
+VALUE_QUANTUM = Decimal('0.0001')
+
+
+def station_field_map(station):
+    """
+    Tipo de variable de cada campo del canal de una estación.
+
+    Args:
+        station: Estación
+
+    Returns:
+        dict: {'field1': 'air_temp', ...}
+
+    Raises:
+        ValueError: Si algún campo o tipo de variable no es válido
+    """
+    field_map = station.thingspeak_fields or DEFAULT_FIELD_MAP
+    valid_fields = {f'field{number}' for number in range(1, 9)}
+    for field_key, variable_type in field_map.items():
+        if field_key not in valid_fields:
+            raise ValueError(f"Campo de ThingSpeak inválido en {station.name}: {field_key}")
+        if variable_type not in VARIABLE_UNITS:
+            raise ValueError(f"Tipo de variable inválido en {station.name}: {variable_type}")
+    return field_map
+
+
+def _parse_value(raw):
+    """Valor numérico de un campo, o None si está vacío o no cabe en Variable."""
+    if raw is None:
+        return None
+    try:
+        value = Decimal(str(raw).strip())
+    except InvalidOperation:
+        return None
+    if not value.is_finite() or abs(value) >= MAX_VALUE:
+        return None
+    return value.quantize(VALUE_QUANTUM)
+
+
+def feed_variables(station, feed, field_map):
+    """
+    Variables de una lectura de ThingSpeak.
+
+    Args:
+        station: Estación
+        feed: Lectura del canal ({'created_at', 'entry_id', 'field1', ...})
+        field_map: Resultado de `station_field_map()`
+
+    Returns:
+        list: Instancias de Variable sin guardar (vacía si la lectura no tiene
+            fecha o valores válidos)
+    """
+    timestamp = parse_datetime(feed.get('created_at') or '')
+    if timestamp is None:
+        return []
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, dt_timezone.utc)
+
+    variables = []
+    for field_key, variable_type in field_map.items():
+        value = _parse_value(feed.get(field_key))
+        if value is None:
+            continue
+        variables.append(Variable(
+            station=station,
+            field_id=station.field_id,
+            timestamp=timestamp,
+            variable_type=variable_type,
+            value=value,
+            unit=VARIABLE_UNITS[variable_type],
+            source='automatic',
+            metadata={
+                'channel_id': station.thingspeak_channel_id,
+                'entry_id': feed['entry_id'],
+                'field': field_key,
+            },
+        ))
+    return variables
+
+
+def fetch_station_feeds(station, service=None):
+    """
+    Lecturas del canal de una estación que pueden ser nuevas.
+
+    Args:
+        station: Estación con canal ThingSpeak
+        service: ThingSpeakService (por defecto el del canal de la estación)
+
+    Returns:
+        dict: Respuesta de ThingSpeak ({'channel', 'feeds'}), o None si hubo error
+    """
+    service = service or get_station_service(station)
+    watermark = station.thingspeak_last_entry_id
+    # La primera importación trae todo el historial disponible
+    results = MAX_RESULTS if watermark is None else POLL_RESULTS
+    data = service.get_latest_feeds(results=results)
+    if data is None:
+        return None
+
+    last_entry_id = (data.get('channel') or {}).get('last_entry_id')
+    if watermark is None or not last_entry_id or last_entry_id == watermark:
+        return data
+    # Si el canal se reinició (último entry_id menor que la marca) todas sus
+    # lecturas son nuevas
+    pending = last_entry_id - watermark if last_entry_id > watermark else last_entry_id
+    if pending > results:
+        if pending > MAX_RESULTS:
+            logger.warning(
+                "%s: %s lecturas pendientes en ThingSpeak; solo se importan las últimas %s",
+                station.name, pending, MAX_RESULTS,
+            )
+        data = service.get_latest_feeds(results=min(pending, MAX_RESULTS))
+    return data
+
+
+def store_station_feeds(station, data, field_map):
+    """
+    Inserta las lecturas posteriores a la marca de la estación.
+
+    Args:
+        station: Estación con canal ThingSpeak
+        data: Respuesta de ThingSpeak ({'channel', 'feeds'})
+        field_map: Resultado de `station_field_map()`
+
+    Returns:
+        dict: {'entries': lecturas importadas, 'variables': filas insertadas,
+            'last_entry_id'}
+    """
+    channel = data.get('channel') or {}
+    feeds = data.get('feeds') or []
+
+    with transaction.atomic():
+        locked = (
+            Station.objects.select_for_update()
+            .only('thingspeak_last_entry_id', 'thingspeak_channel')
+            .get(pk=station.pk)
+        )
+        watermark = locked.thingspeak_last_entry_id or 0
+        last_entry_id = channel.get('last_entry_id')
+        if last_entry_id is not None and last_entry_id < watermark:
+            logger.warning(
+                "%s: el canal %s se reinició (entry_id %s < %s); se importa desde el inicio",
+                station.name, station.thingspeak_channel_id, last_entry_id, watermark,
+            )
+            watermark = 0
+
+        new_feeds = [
+            feed for feed in feeds
+            if isinstance(feed.get('entry_id'), int) and feed['entry_id'] > watermark
+        ]
+        variables = []
+        for feed in new_feeds:
+            variables.extend(feed_variables(station, feed, field_map))
+        Variable.objects.bulk_create(variables, batch_size=INSERT_BATCH_SIZE)
+
+        if new_feeds:
+            watermark = max(feed['entry_id'] for feed in new_feeds)
+        Station.objects.filter(pk=station.pk).update(
+            thingspeak_last_entry_id=watermark,
+            thingspeak_channel=channel or locked.thingspeak_channel,
+            thingspeak_synced_at=timezone.now(),
+        )
+
+    station.thingspeak_last_entry_id = watermark
+    return {
+        'entries': len(new_feeds),
+        'variables': len(variables),
+        'last_entry_id': watermark,
+    }
+
+
+def ingest_station(station, service=None):
+    """
+    Importa las lecturas nuevas del canal ThingSpeak de una estación.
+
+    Args:
+        station: Estación con canal ThingSpeak
+        service: ThingSpeakService (opcional, para usar otro cliente)
+
+    Returns:
+        dict: Resultado de `store_station_feeds()`, o None si no se pudo
+            consultar ThingSpeak
+    """
+    field_map = station_field_map(station)
+    data = fetch_station_feeds(station, service)
+    if data is None:
+        return None
+    return store_station_feeds(station, data, field_map)
+
+
+def ingest_stations(stations=None, max_workers=None):
+    """
+    Importa las lecturas nuevas de varias estaciones.
+
+    Los canales se consultan en paralelo en un pool de hilos (solo HTTP, sin
+    acceso a la base de datos), de modo que refrescar todas las estaciones tarda
+    aproximadamente lo que la consulta más lenta; las inserciones se hacen en el
+    hilo que llama, conforme llegan las respuestas.
+
+    Args:
+        stations: QuerySet o lista de estaciones (por defecto las operacionales
+            con canal ThingSpeak)
+        max_workers: Consultas simultáneas (por defecto `THINGSPEAK_MAX_WORKERS`)
+
+    Returns:
+        dict: {station: resultado de `ingest_station()`}; el resultado es None si
+            la consulta falló
+    """
+    if stations is None:
+        stations = Station.objects.filter(is_operational=True).exclude(thingspeak_channel_id='')
+    max_workers = max(1, max_workers or settings.THINGSPEAK_MAX_WORKERS)
+
+    outcome = {}
+    field_maps = {}
+    for station in stations:
+        outcome[station] = None
+        try:
+            field_maps[station] = station_field_map(station)
+        except ValueError as e:
+            logger.error("%s: %s", station.name, e)
+    if not field_maps:
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(field_maps))) as pool:
+        futures = {pool.submit(fetch_station_feeds, station): station for station in field_maps}
+        for future in as_completed(futures):
+            station = futures[future]
+            try:
+                data = future.result()
+            except Exception:
+                logger.exception("%s: error al consultar el canal %s", station.name, station.thingspeak_channel_id)
+                continue
+            if data is not None:
+                outcome[station] = store_station_feeds(station, data, field_maps[station])
+    return outcome
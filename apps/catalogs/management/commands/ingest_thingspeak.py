@@ -0,0 +1,92 @@
+"""
+Comando de Django que importa las lecturas de ThingSpeak a `Variable`.
+
+Consulta en paralelo el canal de cada estación operacional con
+`thingspeak_channel_id` una vez por intervalo e inserta las lecturas nuevas;
+el dashboard y la API de sensores leen de la base de datos, sin importar
+cuántos usuarios las consulten.
+
+Uso:
+    python manage.py ingest_thingspeak
+    python manage.py ingest_thingspeak --interval 30
+    python manage.py ingest_thingspeak --workers 64
+    python manage.py ingest_thingspeak --once  # Una sola consulta y termina
+    python manage.py ingest_thingspeak --once --station <uuid>
+"""
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.catalogs.ingestion import ingest_stations
+from apps.catalogs.models import Station
+
+
+class Command(BaseCommand):
+    help = 'Importa periódicamente las lecturas de los canales ThingSpeak de las estaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.THINGSPEAK_POLL_INTERVAL,
+            help=f'Segundos entre consultas (por defecto {settings.THINGSPEAK_POLL_INTERVAL})',
+        )
+        parser.add_argument(
+            '--station',
+            action='append',
+            default=[],
+            help='ID de la estación a importar (se puede repetir; por defecto todas las operacionales)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.THINGSPEAK_MAX_WORKERS,
+            help=f'Canales consultados en paralelo (por defecto {settings.THINGSPEAK_MAX_WORKERS})',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Importa una sola vez y termina',
+        )
+
+    def handle(self, *args, **options):
+        interval = max(1.0, options['interval'])
+        station_ids = options['station']
+
+        stations = Station.objects.filter(is_operational=True).exclude(thingspeak_channel_id='')
+        if station_ids:
+            stations = Station.objects.exclude(thingspeak_channel_id='').filter(pk__in=station_ids)
+            try:
+                found = {str(pk) for pk in stations.values_list('pk', flat=True)}
+            except ValidationError as e:
+                raise CommandError(f'ID de estación inválido: {e}')
+            missing = set(station_ids) - found
+            if missing:
+                raise CommandError(f"Estaciones sin canal ThingSpeak o inexistentes: {', '.join(sorted(missing))}")
+        if not stations.exists():
+            raise CommandError('No hay estaciones operacionales con canal ThingSpeak configurado')
+
+        self.stdout.write(self.style.SUCCESS(f'📡 Importación de ThingSpeak iniciada ({stations.count()} estaciones)'))
+
+        try:
+            while True:
+                started = time.monotonic()
+                for station, result in ingest_stations(stations.select_related('field'), options['workers']).items():
+                    if result is None:
+                        self.stdout.write(self.style.WARNING(f'   ⚠ {station.name}: no se pudo consultar el canal'))
+                    elif result['entries']:
+                        self.stdout.write(
+                            f"   • {station.name}: {result['entries']} lecturas, "
+                            f"{result['variables']} variables (entry_id {result['last_entry_id']})"
+                        )
+                if options['once']:
+                    break
+
+                # No mantener la conexión abierta entre consultas
+                connections.close_all()
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nImportación detenida'))
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.17 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalogs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="station",
+            name="thingspeak_api_key",
+            field=models.CharField(
+                blank=True, default="", max_length=64, verbose_name="API Key de Lectura"
+            ),
+        ),
+        migrations.AddField(
+            model_name="station",
+            name="thingspeak_channel",
+            field=models.JSONField(
+                blank=True, null=True, verbose_name="Información del Canal"
+            ),
+        ),
+        migrations.AddField(
+            model_name="station",
+            name="thingspeak_channel_id",
+            field=models.CharField(
+                blank=True, default="", max_length=20, verbose_name="Canal ThingSpeak"
+            ),
+        ),
+        migrations.AddField(
+            model_name="station",
+            name="thingspeak_fields",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text='Tipo de variable de cada campo, p. ej. {"field1": "air_temp", "field2": "humidity"}; vacío usa temperatura del aire y humedad relativa',
+                verbose_name="Campos del Canal",
+            ),
+        ),
+        migrations.AddField(
+            model_name="station",
+            name="thingspeak_last_entry_id",
+            field=models.PositiveBigIntegerField(
+                blank=True, null=True, verbose_name="Último entry_id Importado"
+            ),
+        ),
+        migrations.AddField(
+            model_name="station",
+            name="thingspeak_synced_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Última Importación"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.17 on 2026-10-17 12:10
+
+from django.conf import settings
+from django.db import migrations
+
+
+def assign_default_channel(apps, schema_editor):
+    """
+    Asigna el canal de THINGSPEAK_CHANNEL_ID a una estación.
+
+    Antes de 0002 el dashboard consultaba ese canal directamente; ahora solo se
+    muestran las estaciones con canal, de modo que sin esta asignación el
+    dashboard quedaría vacío. Se usa la estación que mostraría el dashboard (la
+    primera operacional por nombre) o, si no hay estaciones, se crea una en el
+    lote más antiguo. No hace nada si ya hay estaciones con canal.
+    """
+    channel_id = str(settings.THINGSPEAK_CHANNEL_ID or "").strip()
+    if not channel_id:
+        return
+
+    Station = apps.get_model("catalogs", "Station")
+    Field = apps.get_model("catalogs", "Field")
+    db_alias = schema_editor.connection.alias
+    stations = Station.objects.using(db_alias)
+    if stations.exclude(thingspeak_channel_id="").exists():
+        return
+
+    station = stations.filter(is_operational=True).order_by("name").first()
+    if station is None:
+        field = Field.objects.using(db_alias).order_by("created_at").first()
+        if field is None:
+            return
+        station = Station(name=f"Estación ThingSpeak {channel_id}", field=field, station_type="clima")
+
+    station.thingspeak_channel_id = channel_id
+    station.thingspeak_api_key = settings.THINGSPEAK_API_KEY or ""
+    station.save(using=db_alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalogs", "0002_station_thingspeak"),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_default_channel, migrations.RunPython.noop),
+    ]
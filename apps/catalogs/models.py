@@ -93,6 +93,21 @@ class Station(models.Model):
     notes = models.TextField(blank=True, null=True, verbose_name="Notas")
     is_operational = models.BooleanField(default=True, verbose_name="Operacional")
     installed_at = models.DateField(blank=True, null=True, verbose_name="Fecha de Instalación")
+    # Canal ThingSpeak del que `ingest_thingspeak` importa las lecturas a Variable
+    thingspeak_channel_id = models.CharField(max_length=20, blank=True, default='', verbose_name="Canal ThingSpeak")
+    thingspeak_api_key = models.CharField(max_length=64, blank=True, default='', verbose_name="API Key de Lectura")
+    thingspeak_fields = models.JSONField(
+        blank=True,
+        default=dict,
+        verbose_name="Campos del Canal",
+        help_text='Tipo de variable de cada campo, p. ej. {"field1": "air_temp", "field2": "humidity"}; '
+                  'vacío usa temperatura del aire y humedad relativa',
+    )
+    thingspeak_last_entry_id = models.PositiveBigIntegerField(
+        blank=True, null=True, verbose_name="Último entry_id Importado"
+    )
+    thingspeak_channel = models.JSONField(blank=True, null=True, verbose_name="Información del Canal")
+    thingspeak_synced_at = models.DateTimeField(blank=True, null=True, verbose_name="Última Importación")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
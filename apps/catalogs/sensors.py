@@ -1,30 +1,85 @@
 """
 Servicio para integración con ThingSpeak IoT Platform.
 Permite consultar datos de sensores en tiempo real.
+
+Todas las instancias de `ThingSpeakService` comparten una sesión HTTP por
+proceso (`get_http_session`): las conexiones keep-alive se reutilizan entre
+consultas y entre canales, sin un nuevo handshake TCP+TLS por petición, y los
+errores transitorios (conexión, 429, 5xx) se reintentan con espera
+exponencial. La sesión admite varios hilos a la vez (`ingest_stations`
+consulta los canales de las estaciones en paralelo).
+
+Las vistas de sensores no consultan ThingSpeak: leen las lecturas que el
+comando `ingest_thingspeak` importa a `Variable` (`get_station_historical_data`).
 """
 import requests
+import threading
 from typing import Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, time, timedelta
 import logging
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
 logger = logging.getLogger(__name__)
 
+# Estados HTTP que se reintentan (límite de peticiones y errores del servidor)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Sesión HTTP compartida del proceso para consultar ThingSpeak.
+    
+    Returns:
+        requests.Session con pool de conexiones keep-alive de hasta
+        `THINGSPEAK_MAX_WORKERS` conexiones por host y reintentos con espera
+        exponencial (`THINGSPEAK_RETRIES`, `THINGSPEAK_BACKOFF`)
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=settings.THINGSPEAK_RETRIES,
+                backoff_factor=settings.THINGSPEAK_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            pool_size = max(1, settings.THINGSPEAK_MAX_WORKERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
 
 class ThingSpeakService:
     """Servicio para consultar datos de sensores desde ThingSpeak."""
     
-    BASE_URL = "https://api.thingspeak.com"
-    
-    def __init__(self, channel_id: str, api_key: str):
+    def __init__(self, channel_id: str, api_key: str, base_url: str = None, session: requests.Session = None):
         """
         Inicializa el servicio de ThingSpeak.
         
         Args:
             channel_id: ID del canal de ThingSpeak
             api_key: API key de lectura del canal
+            base_url: URL de la API (por defecto `THINGSPEAK_BASE_URL`)
+            session: Sesión HTTP (por defecto la compartida del proceso)
         """
         self.channel_id = channel_id
         self.api_key = api_key
+        self.base_url = (base_url or settings.THINGSPEAK_BASE_URL).rstrip('/')
+        self.session = session or get_http_session()
     
     def get_latest_feeds(self, results: int = 10, start_date: str = None, end_date: str = None) -> Optional[Dict]:
         """
@@ -39,7 +94,7 @@ class ThingSpeakService:
             Diccionario con información del canal y feeds, o None si hay error
         """
         try:
-            url = f"{self.BASE_URL}/channels/{self.channel_id}/feeds.json"
+            url = f"{self.base_url}/channels/{self.channel_id}/feeds.json"
             params = {
                 'api_key': self.api_key,
                 'results': min(results, 8000)  # ThingSpeak limita a 8000
@@ -51,7 +106,7 @@ class ThingSpeakService:
             if end_date:
                 params['end'] = end_date
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=settings.THINGSPEAK_TIMEOUT)
             response.raise_for_status()
             
             return response.json()
@@ -72,13 +127,13 @@ class ThingSpeakService:
             Diccionario con datos del campo, o None si hay error
         """
         try:
-            url = f"{self.BASE_URL}/channels/{self.channel_id}/fields/{field_number}.json"
+            url = f"{self.base_url}/channels/{self.channel_id}/fields/{field_number}.json"
             params = {
                 'api_key': self.api_key,
                 'results': results
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=settings.THINGSPEAK_TIMEOUT)
             response.raise_for_status()
             
             return response.json()
@@ -245,8 +300,209 @@ def get_thingspeak_service() -> ThingSpeakService:
     Returns:
         Instancia de ThingSpeakService
     """
-    # Configuración del canal de ThingSpeak
-    CHANNEL_ID = "3142831"
-    API_KEY = "FQR4GTLHXXO0I3K2"
+    return ThingSpeakService(settings.THINGSPEAK_CHANNEL_ID, settings.THINGSPEAK_API_KEY)
+
+
+def get_station_service(station) -> ThingSpeakService:
+    """
+    Crea una instancia del servicio ThingSpeak para el canal de una estación.
+    
+    Args:
+        station: Estación con `thingspeak_channel_id` configurado
+        
+    Returns:
+        Instancia de ThingSpeakService
+    """
+    return ThingSpeakService(station.thingspeak_channel_id, station.thingspeak_api_key)
+
+
+def get_sensor_station(station_id=None):
+    """
+    Estación cuyas lecturas se muestran en el dashboard y la API de sensores.
+    
+    Args:
+        station_id: ID de la estación (opcional; por defecto la primera estación
+            operacional con canal ThingSpeak)
+        
+    Returns:
+        Station, o None si no hay estaciones con canal configurado
+        
+    Raises:
+        ValueError: Si el ID no es válido
+        Station.DoesNotExist: Si la estación no existe
+    """
+    from .models import Station
+
+    stations = Station.objects.exclude(thingspeak_channel_id='')
+    if station_id:
+        try:
+            return stations.get(pk=station_id)
+        except ValidationError as e:
+            raise ValueError(f"ID de estación inválido: {station_id}") from e
+    return stations.filter(is_operational=True).order_by('name').first()
+
+
+def _parse_bound(value: str, end: bool = False):
+    """Convierte una fecha ISO (con o sin hora) en datetime con zona horaria."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Fecha inválida: {value}")
+        # Una fecha sin hora incluye el día completo
+        parsed = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+        if end:
+            parsed -= timedelta(microseconds=1)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def get_cached_sensor_data(station_id=None, results: int = 20, start_date: str = None, end_date: str = None):
+    """
+    Estación y lecturas de `get_station_historical_data`, desde la caché de sensores.
+    
+    Args:
+        station_id: ID de la estación (opcional, ver `get_sensor_station`)
+        results: Número de lecturas a obtener
+        start_date: Fecha de inicio en formato ISO
+        end_date: Fecha de fin en formato ISO
+        
+    Returns:
+        tuple: (Station o None si no hay estaciones con canal, datos o None si
+            no hay lecturas)
+        
+    Raises:
+        ValueError: Si el ID o alguna fecha no son válidos
+        Station.DoesNotExist: Si la estación no existe
+    """
+    from .cache import sensor_data_cache
+
+    def load():
+        station = get_sensor_station(station_id)
+        if station is None:
+            return None, None
+        return station, get_station_historical_data(station, results, start_date, end_date)
+
+    key = (station_id or '', results, start_date or '', end_date or '')
+    return sensor_data_cache.get_or_load(key, load)
+
+
+def get_station_historical_data(station, results: int = 20, start_date: str = None, end_date: str = None) -> Optional[Dict]:
+    """
+    Lecturas de temperatura y humedad de una estación desde la base de datos.
+    
+    Devuelve el mismo formato que `ThingSpeakService.get_formatted_historical_data`
+    con las lecturas importadas por `ingest_thingspeak`: las últimas `results`
+    lecturas del rango, en orden cronológico.
     
-    return ThingSpeakService(CHANNEL_ID, API_KEY)
+    Args:
+        station: Estación
+        results: Número de lecturas a obtener
+        start_date: Fecha de inicio en formato ISO (YYYY-MM-DD o YYYY-MM-DDTHH:MM:SS)
+        end_date: Fecha de fin en formato ISO (YYYY-MM-DD o YYYY-MM-DDTHH:MM:SS)
+        
+    Returns:
+        Diccionario con datos históricos formateados, con `last_event_id` para
+        continuar con el stream de sensores, o None si no hay lecturas
+        
+    Raises:
+        ValueError: Si alguna fecha no es válida
+    """
+    readings = _station_readings(station)
+    if start_date:
+        readings = readings.filter(timestamp__gte=_parse_bound(start_date))
+    if end_date:
+        readings = readings.filter(timestamp__lte=_parse_bound(end_date, end=True))
+
+    # Las variables de una misma lectura comparten el timestamp
+    timestamps = list(
+        readings.order_by('-timestamp').values_list('timestamp', flat=True).distinct()[:results]
+    )
+    if not timestamps:
+        return None
+
+    feeds, last_event_id = _group_feeds(
+        readings.filter(timestamp__gte=timestamps[-1], timestamp__lte=timestamps[0])
+        .order_by('timestamp')
+        .values_list('pk', 'timestamp', 'variable_type', 'value', 'metadata')
+    )
+
+    channel = station.thingspeak_channel or {}
+    return {
+        'channel_id': channel.get('id', station.thingspeak_channel_id),
+        'channel_name': channel.get('name', station.name),
+        'description': channel.get('description'),
+        'field_names': {
+            'field1': channel.get('field1', 'Temperatura'),
+            'field2': channel.get('field2', 'Humedad'),
+        },
+        'station_id': str(station.pk),
+        'synced_at': timezone.localtime(station.thingspeak_synced_at).isoformat() if station.thingspeak_synced_at else None,
+        'last_event_id': last_event_id,
+        'feeds': feeds,
+    }
+
+
+def _station_readings(station):
+    """Variables automáticas de temperatura y humedad de una estación."""
+    from apps.events.models import Variable
+
+    return Variable.objects.filter(
+        station=station, source='automatic', variable_type__in=['air_temp', 'humidity']
+    )
+
+
+def _group_feeds(rows):
+    """
+    Agrupa variables en lecturas con el formato de ThingSpeak.
+    
+    Args:
+        rows: Iterable de (id, timestamp, variable_type, value, metadata)
+        
+    Returns:
+        tuple: (lecturas en orden cronológico, mayor ID de variable o None)
+    """
+    feeds = {}
+    last_id = None
+    for pk, timestamp, variable_type, value, metadata in rows:
+        last_id = pk if last_id is None else max(last_id, pk)
+        feed = feeds.setdefault(timestamp, {
+            'timestamp': timestamp.isoformat().replace('+00:00', 'Z'),
+            'entry_id': (metadata or {}).get('entry_id'),
+            'temperature': None,
+            'humidity': None,
+        })
+        feed['temperature' if variable_type == 'air_temp' else 'humidity'] = float(value)
+    return [feeds[timestamp] for timestamp in sorted(feeds)], last_id
+
+
+def get_last_reading_id(station) -> Optional[int]:
+    """ID de la variable más reciente de la estación (cursor del stream de sensores)."""
+    return _station_readings(station).order_by('-pk').values_list('pk', flat=True).first()
+
+
+def get_station_readings_since(station, last_id: int = None, limit: int = 1000, until_id: int = None):
+    """
+    Lecturas importadas después de una variable.
+    
+    Args:
+        station: Estación
+        last_id: ID de la última variable ya entregada (None para todas)
+        limit: Máximo de variables a leer
+        until_id: ID de la última variable a incluir (opcional)
+        
+    Returns:
+        tuple: (lecturas en orden cronológico, ID de la última variable leída
+            o `last_id` si no hay nuevas, True si se alcanzó `limit`)
+    """
+    readings = _station_readings(station)
+    if last_id is not None:
+        readings = readings.filter(pk__gt=last_id)
+    if until_id is not None:
+        readings = readings.filter(pk__lte=until_id)
+    rows = list(
+        readings.order_by('pk').values_list('pk', 'timestamp', 'variable_type', 'value', 'metadata')[:limit]
+    )
+    feeds, new_last_id = _group_feeds(rows)
+    return feeds, new_last_id if new_last_id is not None else last_id, len(rows) == limit
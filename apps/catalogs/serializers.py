@@ -3,9 +3,15 @@ Serializers para la API de Catálogos.
 Incluye serialización de Campos (Fields), Campañas (Campaigns) y Estaciones (Stations).
 """
 
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
+
+from apps.events.models import Variable
 from .models import Field, Campaign, Station
+from .series import MAX_POINTS, parse_bucket
 
 
 class FieldSerializer(serializers.ModelSerializer):
@@ -196,3 +202,84 @@ class StationSerializer(serializers.ModelSerializer):
     def get_status_display(self, obj):
         """Retorna el estado de la estación en formato legible."""
         return "Activa" if obj.is_active else "Inactiva"
+
+
+class VariableSeriesQuerySerializer(serializers.Serializer):
+    """Serializer para los parámetros de la serie de tiempo de variables."""
+    
+    station = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text="ID de la estación (se requiere station o field)"
+    )
+    field = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text="ID del lote (se requiere station o field)"
+    )
+    variable_type = serializers.ChoiceField(
+        choices=Variable.VARIABLE_TYPES,
+        help_text="Tipo de variable"
+    )
+    source = serializers.ChoiceField(
+        choices=[('manual', 'Manual'), ('automatic', 'Automático')],
+        required=False,
+        allow_null=True,
+        help_text="Origen de las lecturas (opcional, por defecto todas)"
+    )
+    date_from = serializers.DateTimeField(
+        required=False,
+        allow_null=True,
+        help_text="Inicio del rango (opcional, por defecto 24 horas antes de date_to)"
+    )
+    date_to = serializers.DateTimeField(
+        required=False,
+        allow_null=True,
+        help_text="Fin del rango (opcional, por defecto ahora)"
+    )
+    mode = serializers.ChoiceField(
+        choices=[('buckets', 'Intervalos'), ('lttb', 'LTTB')],
+        default='buckets',
+        help_text="buckets: mínimo/máximo/promedio/conteo por intervalo; lttb: lecturas elegidas con LTTB"
+    )
+    bucket = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Tamaño del intervalo en modo buckets: segundos o 30s, 15m, 1h, 1d "
+                  "(opcional, por defecto el que da como máximo `points` intervalos)"
+    )
+    points = serializers.IntegerField(
+        default=500,
+        min_value=3,
+        max_value=MAX_POINTS,
+        help_text=f"Puntos de la serie (3-{MAX_POINTS}): número de lecturas en modo lttb "
+                  "y máximo de intervalos sin `bucket` en modo buckets"
+    )
+
+    def validate_bucket(self, value):
+        if not value:
+            return None
+        try:
+            return parse_bucket(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, attrs):
+        if not attrs.get('station') and not attrs.get('field'):
+            raise serializers.ValidationError({'station': 'Se requiere station o field'})
+        if attrs.get('station') and not Station.objects.filter(pk=attrs['station']).exists():
+            raise serializers.ValidationError({'station': 'Estación no encontrada'})
+        if attrs.get('field') and not Field.objects.filter(pk=attrs['field']).exists():
+            raise serializers.ValidationError({'field': 'Lote no encontrado'})
+
+        attrs['date_to'] = attrs.get('date_to') or timezone.now()
+        attrs['date_from'] = attrs.get('date_from') or attrs['date_to'] - timedelta(days=1)
+        if attrs['date_from'] >= attrs['date_to']:
+            raise serializers.ValidationError({'date_to': 'Debe ser posterior a date_from'})
+
+        bucket = attrs.get('bucket')
+        if bucket and (attrs['date_to'] - attrs['date_from']).total_seconds() / bucket > MAX_POINTS:
+            raise serializers.ValidationError({
+                'bucket': f'El rango tendría más de {MAX_POINTS} intervalos; use un intervalo mayor'
+            })
+        return attrs
@@ -0,0 +1,234 @@
+"""
+Series de tiempo reducidas de `Variable` para graficar.
+
+Un año de lecturas cada minuto son más de 500,000 puntos; para graficarlo
+basta con unos cientos. Dos modos:
+
+- `buckets`: agrupa las lecturas en intervalos de tamaño fijo y calcula
+  mínimo, máximo, promedio y conteo en la base de datos (una sola consulta
+  `GROUP BY`). Los intervalos se alinean a la medianoche local (p. ej. con
+  `1d` cada intervalo es un día calendario) y los intervalos sin lecturas se
+  omiten.
+- `lttb`: Largest-Triangle-Three-Buckets. Elige `points` lecturas reales que
+  conservan la forma de la serie (picos incluidos). Las lecturas se recorren
+  en orden con un cursor y solo se mantienen dos intervalos en memoria.
+"""
+import math
+import re
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+
+from django.db.models import Avg, Count, FloatField, Func, Max, Min, Value
+from django.db.models.functions import Floor
+from django.utils import timezone
+
+from apps.events.models import Variable
+
+# Tamaños de intervalo que se eligen automáticamente (segundos)
+NICE_BUCKETS = [
+    1, 5, 10, 15, 30,
+    60, 2 * 60, 5 * 60, 10 * 60, 15 * 60, 30 * 60,
+    3600, 2 * 3600, 3 * 3600, 6 * 3600, 12 * 3600,
+    86400, 7 * 86400, 30 * 86400,
+]
+BUCKET_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+BUCKET_PATTERN = re.compile(r'^(\d+)([smhd]?)$')
+
+# Máximo de puntos o intervalos por respuesta
+MAX_POINTS = 5000
+LTTB_CHUNK_SIZE = 5000
+
+
+class EpochSeconds(Func):
+    """Segundos desde 1970-01-01 UTC de una fecha y hora."""
+
+    output_field = FloatField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='EXTRACT(EPOCH FROM %(expressions)s)', **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)', **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Segundos enteros: con julianday() el redondeo de coma flotante puede
+        # mover una lectura exactamente en el límite al intervalo anterior.
+        # '%' se escapa para la plantilla y para los parámetros de la consulta.
+        return self.as_sql(
+            compiler, connection, template="CAST(strftime('%%%%s', %(expressions)s) AS REAL)", **extra_context
+        )
+
+
+def parse_bucket(value):
+    """
+    Tamaño de intervalo en segundos.
+
+    Args:
+        value: Segundos ('900') o número con unidad s, m, h o d ('15m', '1d')
+
+    Returns:
+        int: Segundos
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    match = BUCKET_PATTERN.match(str(value).strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Intervalo inválido: {value} (p. ej. 30s, 15m, 1h, 1d)")
+    return int(match.group(1)) * BUCKET_UNITS[match.group(2) or 's']
+
+
+def auto_bucket(date_from, date_to, points):
+    """Menor tamaño de `NICE_BUCKETS` que divide el rango en `points` intervalos o menos."""
+    span = (date_to - date_from).total_seconds()
+    target = span / max(1, points)
+    for seconds in NICE_BUCKETS:
+        if seconds >= target:
+            return seconds
+    return math.ceil(target / NICE_BUCKETS[-1]) * NICE_BUCKETS[-1]
+
+
+def _series_queryset(variable_type, date_from, date_to, station_id=None, field_id=None, source=None):
+    readings = Variable.objects.filter(
+        variable_type=variable_type, timestamp__gte=date_from, timestamp__lte=date_to
+    )
+    if station_id:
+        readings = readings.filter(station_id=station_id)
+    if field_id:
+        readings = readings.filter(field_id=field_id)
+    if source:
+        readings = readings.filter(source=source)
+    return readings
+
+
+def _to_float(value):
+    return None if value is None else round(float(value), 4)
+
+
+def bucket_series(variable_type, date_from, date_to, bucket_seconds,
+                  station_id=None, field_id=None, source=None):
+    """
+    Mínimo, máximo, promedio y conteo por intervalo.
+
+    Args:
+        variable_type: Tipo de variable (p. ej. 'air_temp')
+        date_from: Inicio del rango (datetime con zona horaria)
+        date_to: Fin del rango
+        bucket_seconds: Tamaño del intervalo en segundos
+        station_id: ID de la estación (opcional)
+        field_id: ID del lote (opcional)
+        source: 'manual' o 'automatic' (opcional)
+
+    Returns:
+        list: [{'start', 'min', 'max', 'avg', 'count'}, ...] en orden cronológico
+    """
+    # Desplazamiento para alinear los intervalos a la medianoche local
+    offset = timezone.localtime(date_from).utcoffset().total_seconds()
+    bucket = Floor((EpochSeconds('timestamp') + Value(offset)) / Value(float(bucket_seconds)))
+
+    rows = (
+        _series_queryset(variable_type, date_from, date_to, station_id, field_id, source)
+        .annotate(bucket=bucket)
+        .values('bucket')
+        .annotate(min=Min('value'), max=Max('value'), avg=Avg('value'), count=Count('pk'))
+        .order_by('bucket')
+    )
+    series = []
+    for row in rows:
+        start = datetime.fromtimestamp(int(row['bucket']) * bucket_seconds - offset, tz=dt_timezone.utc)
+        series.append({
+            'start': timezone.localtime(start).isoformat(),
+            'min': _to_float(row['min']),
+            'max': _to_float(row['max']),
+            'avg': _to_float(row['avg']),
+            'count': row['count'],
+        })
+    return series
+
+
+def largest_triangle_three_buckets(points, total, threshold):
+    """
+    Reduce una serie a `threshold` puntos con LTTB (Steinarsson, 2013).
+
+    Args:
+        points: Iterable de (x, y, elemento) en orden creciente de x
+        total: Número de puntos de `points`
+        threshold: Puntos a conservar (al menos 3)
+
+    Returns:
+        list: Elementos elegidos, incluidos el primero y el último
+    """
+    iterator = iter(points)
+    if threshold >= total or threshold < 3:
+        return [item for _, _, item in iterator]
+
+    # El primer y el último punto se conservan; los demás se reparten en
+    # threshold - 2 intervalos y de cada uno se elige el punto que forma el
+    # triángulo de mayor área con el punto elegido antes y el promedio del
+    # intervalo siguiente
+    every = (total - 2) / (threshold - 2)
+    bounds = [int(index * every) + 1 for index in range(threshold - 1)]
+    bounds[-1] = total - 1
+
+    selected = next(iterator)
+    sampled = [selected[2]]
+    current = list(islice(iterator, bounds[1] - bounds[0]))
+    for index in range(threshold - 2):
+        if index + 1 < threshold - 2:
+            following = list(islice(iterator, bounds[index + 2] - bounds[index + 1]))
+        else:
+            following = list(islice(iterator, 1))  # Último punto
+        if not current:
+            break
+        if following:
+            next_x = sum(point[0] for point in following) / len(following)
+            next_y = sum(point[1] for point in following) / len(following)
+        else:
+            next_x, next_y = current[-1][0], current[-1][1]
+
+        ax, ay = selected[0], selected[1]
+        selected = max(
+            current,
+            key=lambda point: abs((ax - next_x) * (point[1] - ay) - (ax - point[0]) * (next_y - ay)),
+        )
+        sampled.append(selected[2])
+        current = following
+
+    if current:
+        sampled.append(current[-1][2])
+    return sampled
+
+
+def lttb_series(variable_type, date_from, date_to, points,
+                station_id=None, field_id=None, source=None):
+    """
+    Lecturas elegidas con LTTB.
+
+    Args:
+        variable_type: Tipo de variable
+        date_from: Inicio del rango (datetime con zona horaria)
+        date_to: Fin del rango
+        points: Puntos a devolver
+        station_id: ID de la estación (opcional)
+        field_id: ID del lote (opcional)
+        source: 'manual' o 'automatic' (opcional)
+
+    Returns:
+        tuple: ([{'timestamp', 'value'}, ...], lecturas en el rango)
+    """
+    readings = _series_queryset(variable_type, date_from, date_to, station_id, field_id, source)
+    total = readings.count()
+    rows = (
+        readings.order_by('timestamp', 'pk')
+        .values_list('timestamp', 'value')
+        .iterator(chunk_size=LTTB_CHUNK_SIZE)
+    )
+    sampled = largest_triangle_three_buckets(
+        ((timestamp.timestamp(), float(value), (timestamp, value)) for timestamp, value in rows),
+        total,
+        points,
+    )
+    return [
+        {'timestamp': timezone.localtime(timestamp).isoformat(), 'value': _to_float(value)}
+        for timestamp, value in sampled
+    ], total
@@ -0,0 +1,279 @@
+"""
+Stream de lecturas de sensores con Server-Sent Events.
+
+El dashboard carga el historial una vez (`sensors_data_api`) y después recibe
+solo las lecturas que importa `ingest_thingspeak`, en lugar de volver a
+descargar toda la ventana cada pocos segundos:
+
+- Cada mensaje `readings` lleva las lecturas nuevas (`{"feeds": [...]}`, con el
+  formato del historial) y como `id` el ID de la última variable enviada.
+- Al reconectarse, el navegador envía ese ID en la cabecera `Last-Event-ID` y
+  el stream continúa desde ahí sin perder ni repetir lecturas. La primera
+  conexión puede indicarlo con `?last_event_id=` (el `last_event_id` del
+  historial); sin ninguno de los dos empieza con las lecturas posteriores a
+  la conexión.
+- Sin lecturas nuevas se envía un comentario cada
+  `SENSOR_STREAM_POLL_SECONDS` para mantener abierta la conexión a través de
+  proxies.
+
+Las conexiones no consultan la base de datos por su cuenta: en cada proceso
+un solo hilo por estación (`StationPoller`) busca lecturas nuevas cada
+`SENSOR_STREAM_POLL_SECONDS`, guarda los últimos lotes en memoria y despierta
+a las conexiones de esa estación. Solo una conexión que viene de un ID que el
+hilo ya no tiene (reconexión tardía u otro proceso) lo alcanza con una
+consulta propia. El hilo termina cuando se desconecta el último navegador.
+
+Cada conexión ocupa un hilo del servidor mientras está abierta, por lo que el
+endpoint requiere un servidor con hilos (p. ej. gunicorn con
+`--worker-class gthread`) o asíncrono. Cada conexión termina después de
+`SENSOR_STREAM_MAX_SECONDS` y el navegador se reconecta solo (tras `retry`
+milisegundos); por proceso se aceptan como máximo
+`SENSOR_STREAM_MAX_CONNECTIONS` conexiones y las demás reciben 503 (el
+dashboard pasa entonces a consultar los datos periódicamente).
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections
+
+from .sensors import get_last_reading_id, get_station_readings_since
+
+logger = logging.getLogger(__name__)
+
+# Milisegundos que espera el navegador antes de reconectarse
+RETRY_MILLISECONDS = 3000
+# Variables leídas por consulta; si hay más pendientes se envían de inmediato
+BATCH_SIZE = 1000
+# Lotes de lecturas que cada estación conserva para las conexiones atrasadas
+BUFFER_BATCHES = 100
+
+
+def format_event(data, event=None, event_id=None):
+    """
+    Mensaje SSE.
+
+    Args:
+        data: Contenido serializable a JSON
+        event: Tipo de evento (opcional)
+        event_id: ID del evento (opcional)
+
+    Returns:
+        str: Mensaje terminado en línea vacía
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def parse_last_event_id(value):
+    """
+    ID de la última variable recibida por el cliente.
+
+    Raises:
+        ValueError: Si el valor no es un entero no negativo
+    """
+    if value in (None, ''):
+        return None
+    last_id = int(value)
+    if last_id < 0:
+        raise ValueError(f"Last-Event-ID inválido: {value}")
+    return last_id
+
+
+class StreamLimitError(Exception):
+    """Se alcanzó `SENSOR_STREAM_MAX_CONNECTIONS` en el proceso."""
+
+
+class StationPoller:
+    """
+    Lecturas nuevas de una estación compartidas por sus conexiones.
+
+    Attributes:
+        station: Estación
+        position: ID de la última variable leída
+        batches: Últimos lotes (ID anterior al lote, ID de su última variable,
+            lecturas), consecutivos
+        subscribers: Conexiones abiertas
+    """
+
+    def __init__(self, station, position):
+        self.station = station
+        self.position = position
+        self.batches = deque(maxlen=BUFFER_BATCHES)
+        self.subscribers = 0
+
+    def pending(self, cursor):
+        """
+        Lotes posteriores a `cursor` (se llama con el lock del hub).
+
+        Returns:
+            list: Lotes pendientes (vacía si no hay nuevos), o None si `cursor`
+                no es el inicio de un lote guardado
+        """
+        if cursor == self.position:
+            return []
+        for index, (after_id, _, _) in enumerate(self.batches):
+            if after_id == cursor:
+                return list(islice(self.batches, index, None))
+        return None
+
+
+class SensorStreamHub:
+    """
+    Conexiones de stream del proceso y un `StationPoller` por estación.
+
+    Attributes:
+        max_connections: Máximo de conexiones abiertas
+        connections: Conexiones abiertas
+    """
+
+    def __init__(self, max_connections):
+        self.max_connections = max_connections
+        self.connections = 0
+        self._pollers = {}
+        self._changed = threading.Condition()
+
+    def subscribe(self, station):
+        """
+        Registra una conexión a la estación e inicia su hilo si hace falta.
+
+        Returns:
+            StationPoller: Lecturas compartidas de la estación
+
+        Raises:
+            StreamLimitError: Si ya hay `max_connections` conexiones
+        """
+        with self._changed:
+            if self.connections >= self.max_connections:
+                raise StreamLimitError(f"Se alcanzó el máximo de {self.max_connections} conexiones de stream")
+            poller = self._pollers.get(station.pk)
+            if poller is None:
+                poller = StationPoller(station, get_last_reading_id(station) or 0)
+                self._pollers[station.pk] = poller
+                threading.Thread(
+                    target=self._poll, args=(poller,), name=f'sensor-stream-{station.pk}', daemon=True
+                ).start()
+            poller.subscribers += 1
+            self.connections += 1
+            return poller
+
+    def unsubscribe(self, poller):
+        with self._changed:
+            poller.subscribers -= 1
+            self.connections -= 1
+
+    def wait(self, poller, cursor, timeout):
+        """
+        Espera hasta `timeout` segundos lotes posteriores a `cursor`.
+
+        Returns:
+            tuple: (resultado de `StationPoller.pending()`, posición del hilo)
+        """
+        with self._changed:
+            position = poller.position
+            if poller.pending(cursor) == [] or cursor > position:
+                self._changed.wait_for(lambda: poller.position != position, timeout)
+            return poller.pending(cursor), poller.position
+
+    def _poll(self, poller):
+        while True:
+            time.sleep(settings.SENSOR_STREAM_POLL_SECONDS)
+            with self._changed:
+                if not poller.subscribers:
+                    del self._pollers[poller.station.pk]
+                    return
+            try:
+                more = True
+                while more:
+                    feeds, last_id, more = get_station_readings_since(poller.station, poller.position, BATCH_SIZE)
+                    if last_id == poller.position:
+                        break
+                    with self._changed:
+                        poller.batches.append((poller.position, last_id, feeds))
+                        poller.position = last_id
+                        self._changed.notify_all()
+            except Exception:
+                logger.exception("No se pudieron leer las lecturas nuevas de la estación %s", poller.station.pk)
+            finally:
+                # El hilo abre su propia conexión a la base de datos
+                connections.close_all()
+
+
+class SensorEventStream:
+    """
+    Mensajes SSE con las lecturas nuevas de una estación.
+
+    Se pasa directamente a `StreamingHttpResponse`, que llama a `close()` al
+    terminar la respuesta y libera la conexión en el hub.
+
+    Raises:
+        StreamLimitError: Al crearse, si el proceso ya tiene el máximo de conexiones
+    """
+
+    def __init__(self, station, last_id=None, hub=None):
+        """
+        Args:
+            station: Estación
+            last_id: ID de la última variable recibida por el cliente (None para
+                empezar con las lecturas posteriores a la conexión)
+            hub: SensorStreamHub (por defecto el del proceso)
+        """
+        self.station = station
+        self.hub = hub or sensor_stream_hub
+        self.poller = self.hub.subscribe(station)
+        self.cursor = self.poller.position if last_id is None else last_id
+        self._closed = False
+
+    def __iter__(self):
+        return self._events()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.hub.unsubscribe(self.poller)
+
+    def _events(self):
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+
+        deadline = time.monotonic() + settings.SENSOR_STREAM_MAX_SECONDS
+        try:
+            while True:
+                batches, position = self.hub.wait(self.poller, self.cursor, settings.SENSOR_STREAM_POLL_SECONDS)
+                if batches is None and self.cursor < position:
+                    yield from self._catch_up(position)
+                elif batches:
+                    for _, last_id, feeds in batches:
+                        if feeds:
+                            yield format_event({'feeds': feeds}, event='readings', event_id=last_id)
+                        self.cursor = last_id
+                else:
+                    yield ': ping\n\n'
+                if time.monotonic() >= deadline:
+                    return
+        finally:
+            self.close()
+
+    def _catch_up(self, until_id):
+        """Lecturas entre `cursor` y la posición del hilo de la estación, leídas por esta conexión."""
+        try:
+            more = True
+            while more:
+                feeds, last_id, more = get_station_readings_since(self.station, self.cursor, BATCH_SIZE, until_id)
+                if feeds:
+                    yield format_event({'feeds': feeds}, event='readings', event_id=last_id)
+                self.cursor = last_id
+            self.cursor = until_id
+        finally:
+            connections.close_all()
+
+
+sensor_stream_hub = SensorStreamHub(settings.SENSOR_STREAM_MAX_CONNECTIONS)
@@ -6,7 +6,7 @@ from .views import (
     # Template views
     field_list_view, field_create_view, field_edit_view, field_delete_view,
     campaign_list_view, campaign_create_view, campaign_edit_view, campaign_delete_view,
-    sensors_dashboard_view, sensors_data_api
+    sensors_dashboard_view, sensors_data_api, sensors_stream_view
 )
 
 urlpatterns = [
@@ -25,5 +25,6 @@ urlpatterns = [
     # Sensors / IoT
     path('sensors/', sensors_dashboard_view, name='sensors_dashboard'),
     path('sensors/api/data/', sensors_data_api, name='sensors_data_api'),
+    path('sensors/api/stream/', sensors_stream_view, name='sensors_stream'),
 ]
 
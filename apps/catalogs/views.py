@@ -3,9 +3,10 @@ from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
 from django.core.paginator import Paginator
 from rest_framework import generics, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiResponse
 from drf_spectacular.types import OpenApiTypes
 from .models import Field, Campaign, Station
 from .serializers import (
@@ -16,6 +17,7 @@ from .serializers import (
     CampaignListSerializer,
     CampaignCreateUpdateSerializer,
     StationSerializer,
+    VariableSeriesQuerySerializer,
 )
 
 
@@ -163,19 +165,24 @@ class CampaignListView(generics.ListAPIView):
 # ========== Sensores / IoT API Views ==========
 
 from django.http import JsonResponse
-from .sensors import get_thingspeak_service
+from .cache import sensor_data_cache
+from .sensors import get_cached_sensor_data, get_sensor_station
 
 
 @extend_schema(
     summary="Obtener Datos de Sensores",
     description="""
-    Obtiene datos históricos de sensores IoT desde la plataforma ThingSpeak.
+    Obtiene datos históricos de sensores IoT importados desde la plataforma ThingSpeak.
     
     Este endpoint permite consultar mediciones de temperatura y humedad de sensores
     conectados al sistema de trazabilidad. Los datos se pueden filtrar por rango de fechas
     y número de registros.
     
+    Las lecturas se leen de la base de datos (variables automáticas de la estación);
+    el comando `ingest_thingspeak` las importa de ThingSpeak periódicamente.
+    
     **Parámetros de filtrado:**
+    - `station`: ID de la estación (por defecto la primera estación operacional con canal ThingSpeak)
     - `results`: Número de registros a obtener (por defecto 20, máximo 8000)
     - `start_date`: Fecha de inicio en formato ISO (YYYY-MM-DDTHH:MM:SS)
     - `end_date`: Fecha de fin en formato ISO (YYYY-MM-DDTHH:MM:SS)
@@ -188,6 +195,13 @@ from .sensors import get_thingspeak_service
     """,
     tags=['Sensores IoT'],
     parameters=[
+        OpenApiParameter(
+            name='station',
+            type=OpenApiTypes.UUID,
+            location=OpenApiParameter.QUERY,
+            description='ID de la estación (por defecto la primera estación operacional con canal ThingSpeak)',
+            required=False,
+        ),
         OpenApiParameter(
             name='results',
             type=OpenApiTypes.INT,
@@ -213,6 +227,8 @@ from .sensors import get_thingspeak_service
     ],
     responses={
         200: OpenApiTypes.OBJECT,
+        400: OpenApiTypes.OBJECT,
+        404: OpenApiTypes.OBJECT,
         500: OpenApiTypes.OBJECT,
     },
     examples=[
@@ -230,6 +246,9 @@ from .sensors import get_thingspeak_service
                         'field1': 'Temperatura',
                         'field2': 'Humedad',
                     },
+                    'station_id': '3fa85f64-5717-4562-b3fc-2c963f66afa6',
+                    'synced_at': '2025-11-15T12:07:02.153000-06:00',
+                    'last_event_id': 612,
                     'feeds': [
                         {
                             'timestamp': '2025-11-15T18:04:38Z',
@@ -278,8 +297,6 @@ class SensorDataAPIView(APIView):
     def get(self, request):
         """Obtiene datos históricos de sensores con filtros opcionales."""
         try:
-            service = get_thingspeak_service()
-            
             # Obtener parámetros de la petición
             results = int(request.GET.get('results', 20))
             start_date = request.GET.get('start_date')
@@ -298,12 +315,17 @@ class SensorDataAPIView(APIView):
                     'error': 'El parámetro results no puede ser mayor a 8000'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Obtener datos históricos con filtros opcionales
-            data = service.get_formatted_historical_data(
+            station, data = get_cached_sensor_data(
+                request.GET.get('station'),
                 results=results,
                 start_date=start_date,
                 end_date=end_date
             )
+            if station is None:
+                return Response({
+                    'success': False,
+                    'error': 'No hay estaciones con canal ThingSpeak configurado'
+                }, status=status.HTTP_404_NOT_FOUND)
             
             if data:
                 return Response({
@@ -313,9 +335,14 @@ class SensorDataAPIView(APIView):
             else:
                 return Response({
                     'success': False,
-                    'error': 'No se pudieron obtener datos de los sensores'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                    'error': 'No hay lecturas de sensores en el período solicitado'
+                }, status=status.HTTP_404_NOT_FOUND)
                 
+        except Station.DoesNotExist:
+            return Response({
+                'success': False,
+                'error': 'La estación no existe o no tiene canal ThingSpeak'
+            }, status=status.HTTP_404_NOT_FOUND)
         except ValueError as e:
             return Response({
                 'success': False,
@@ -333,7 +360,8 @@ class SensorDataAPIView(APIView):
     description="""
     Obtiene información general del canal de sensores IoT.
     
-    Este endpoint proporciona metadatos del canal ThingSpeak incluyendo:
+    Este endpoint proporciona los metadatos del canal ThingSpeak guardados en la
+    última importación (`ingest_thingspeak`), incluyendo:
     - ID del canal
     - Nombre del canal
     - Descripción
@@ -344,11 +372,22 @@ class SensorDataAPIView(APIView):
     **Casos de uso:**
     - Obtener configuración del canal antes de consultar datos
     - Verificar disponibilidad de campos de sensores
-    - Validar conectividad con ThingSpeak
+    - Validar que la importación desde ThingSpeak está al día
     """,
     tags=['Sensores IoT'],
+    parameters=[
+        OpenApiParameter(
+            name='station',
+            type=OpenApiTypes.UUID,
+            location=OpenApiParameter.QUERY,
+            description='ID de la estación (por defecto la primera estación operacional con canal ThingSpeak)',
+            required=False,
+        ),
+    ],
     responses={
         200: OpenApiTypes.OBJECT,
+        400: OpenApiTypes.OBJECT,
+        404: OpenApiTypes.OBJECT,
         500: OpenApiTypes.OBJECT,
     },
     examples=[
@@ -370,7 +409,10 @@ class SensorDataAPIView(APIView):
                         'created_at': '2025-11-01T18:37:44Z',
                         'updated_at': '2025-11-15T14:21:09Z',
                         'last_entry_id': 306
-                    }
+                    },
+                    'station_id': '3fa85f64-5717-4562-b3fc-2c963f66afa6',
+                    'last_imported_entry_id': 306,
+                    'synced_at': '2025-11-15T12:07:02.153000-06:00'
                 }
             },
             response_only=True,
@@ -387,24 +429,34 @@ class SensorChannelInfoAPIView(APIView):
     def get(self, request):
         """Obtiene información general del canal de sensores."""
         try:
-            service = get_thingspeak_service()
+            station = get_sensor_station(request.GET.get('station'))
             
-            # Obtener información del canal (1 registro para tener acceso a channel info)
-            raw_data = service.get_latest_feeds(results=1)
-            
-            if raw_data and 'channel' in raw_data:
+            if station is not None and station.thingspeak_channel:
                 return Response({
                     'success': True,
                     'data': {
-                        'channel': raw_data['channel']
+                        'channel': station.thingspeak_channel,
+                        'station_id': str(station.pk),
+                        'last_imported_entry_id': station.thingspeak_last_entry_id,
+                        'synced_at': station.thingspeak_synced_at,
                     }
                 }, status=status.HTTP_200_OK)
             else:
                 return Response({
                     'success': False,
-                    'error': 'No se pudo obtener información del canal'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                    'error': 'No hay información del canal; el canal aún no se ha importado'
+                }, status=status.HTTP_404_NOT_FOUND)
                 
+        except Station.DoesNotExist:
+            return Response({
+                'success': False,
+                'error': 'La estación no existe o no tiene canal ThingSpeak'
+            }, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': f'Parámetro inválido: {str(e)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 'success': False,
@@ -412,6 +464,185 @@ class SensorChannelInfoAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@extend_schema(
+    summary="Estadísticas de la caché de sensores",
+    description="""
+    Estado de la caché en memoria de los datos de sensores (solo administradores).
+    
+    Los contadores son del proceso que atiende la petición:
+    - `hits`: respuestas vigentes entregadas sin consultar la base de datos
+    - `stale_hits`: respuestas vencidas entregadas mientras se actualizaban en segundo plano
+    - `misses`: consultas sin respuesta guardada (incluye `coalesced`)
+    - `coalesced`: peticiones que esperaron la misma consulta que calculaba otra petición
+    - `refreshes` / `refresh_errors`: actualizaciones en segundo plano
+    - `entries` / `max_entries`: respuestas guardadas y límite (`SENSOR_CACHE_MAX_ENTRIES`)
+    """,
+    tags=['Sensores IoT'],
+    responses={
+        200: OpenApiResponse(
+            description="Estadísticas de la caché",
+            response={
+                'type': 'object',
+                'properties': {
+                    'enabled': {'type': 'boolean', 'example': True},
+                    'ttl_seconds': {'type': 'integer', 'example': 10},
+                    'max_stale_seconds': {'type': 'integer', 'example': 120},
+                    'hits': {'type': 'integer', 'example': 420},
+                    'stale_hits': {'type': 'integer', 'example': 35},
+                    'misses': {'type': 'integer', 'example': 12},
+                    'hit_ratio': {'type': 'number', 'nullable': True, 'example': 0.974},
+                    'coalesced': {'type': 'integer', 'example': 4},
+                    'refreshes': {'type': 'integer', 'example': 35},
+                    'refresh_errors': {'type': 'integer', 'example': 0},
+                    'entries': {'type': 'integer', 'example': 6},
+                    'max_entries': {'type': 'integer', 'example': 256},
+                }
+            }
+        ),
+    },
+)
+class SensorCacheStatsAPIView(APIView):
+    """
+    Estadísticas de la caché de datos de sensores.
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(sensor_data_cache.stats(), status=status.HTTP_200_OK)
+
+
+# ========== Series de Variables API Views ==========
+
+from django.utils import timezone
+from .ingestion import VARIABLE_UNITS
+from .series import auto_bucket, bucket_series, lttb_series
+
+
+@extend_schema(
+    summary="Serie de tiempo de una variable",
+    description="""
+    Serie de tiempo reducida de las variables (`Variable`) de una estación o lote,
+    lista para graficar sin descargar todas las lecturas.
+    
+    **Modos:**
+    - `buckets` (por defecto): agrupa las lecturas en intervalos de `bucket` y
+      devuelve `min`, `max`, `avg` y `count` de cada uno, calculados en la base de
+      datos. Los intervalos se alinean a la medianoche local y los intervalos sin
+      lecturas se omiten. Sin `bucket` se elige el menor tamaño estándar
+      (1s ... 30d) que da como máximo `points` intervalos.
+    - `lttb`: devuelve `points` lecturas reales elegidas con
+      Largest-Triangle-Three-Buckets, que conserva la forma de la serie (picos
+      incluidos); `source_points` es el número de lecturas del rango.
+    
+    **Query Parameters:**
+    - `station` / `field`: ID de la estación y/o del lote (se requiere al menos uno)
+    - `variable_type`: Tipo de variable (air_temp, humidity, soil_moisture, ...)
+    - `source`: manual o automatic (opcional)
+    - `date_from` / `date_to`: Rango (por defecto las últimas 24 horas)
+    - `mode`: buckets o lttb
+    - `bucket`: Tamaño del intervalo (segundos o 30s, 15m, 1h, 1d)
+    - `points`: Puntos de la serie (por defecto 500, máximo 5000)
+    """,
+    tags=['Sensores IoT'],
+    parameters=[VariableSeriesQuerySerializer],
+    responses={
+        200: OpenApiResponse(
+            description="Serie de tiempo",
+            response={
+                'type': 'object',
+                'properties': {
+                    'station_id': {'type': 'string', 'format': 'uuid', 'nullable': True},
+                    'field_id': {'type': 'string', 'format': 'uuid', 'nullable': True},
+                    'variable_type': {'type': 'string', 'example': 'air_temp'},
+                    'unit': {'type': 'string', 'example': '°C'},
+                    'date_from': {'type': 'string', 'format': 'date-time'},
+                    'date_to': {'type': 'string', 'format': 'date-time'},
+                    'mode': {'type': 'string', 'enum': ['buckets', 'lttb']},
+                    'bucket_seconds': {'type': 'integer', 'nullable': True, 'example': 3600},
+                    'source_points': {'type': 'integer', 'example': 1440},
+                    'points': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'start': {'type': 'string', 'format': 'date-time'},
+                                'min': {'type': 'number', 'example': 21.5},
+                                'max': {'type': 'number', 'example': 27.25},
+                                'avg': {'type': 'number', 'example': 24.1833},
+                                'count': {'type': 'integer', 'example': 60},
+                                'timestamp': {'type': 'string', 'format': 'date-time'},
+                                'value': {'type': 'number', 'example': 24.5},
+                            }
+                        }
+                    },
+                }
+            }
+        ),
+        400: OpenApiResponse(description="Parámetros inválidos"),
+    },
+    examples=[
+        OpenApiExample(
+            'Promedios por hora',
+            value={
+                'station_id': '3fa85f64-5717-4562-b3fc-2c963f66afa6',
+                'field_id': None,
+                'variable_type': 'air_temp',
+                'unit': '°C',
+                'date_from': '2025-11-15T00:00:00-06:00',
+                'date_to': '2025-11-16T00:00:00-06:00',
+                'mode': 'buckets',
+                'bucket_seconds': 3600,
+                'source_points': 1440,
+                'points': [
+                    {'start': '2025-11-15T00:00:00-06:00', 'min': 21.5, 'max': 22.75, 'avg': 22.1, 'count': 60},
+                    {'start': '2025-11-15T01:00:00-06:00', 'min': 21.0, 'max': 22.0, 'avg': 21.6, 'count': 60},
+                ],
+            },
+            response_only=True,
+        ),
+    ],
+)
+class VariableSeriesView(APIView):
+    """
+    Serie de tiempo de una variable, agrupada por intervalos o reducida con LTTB.
+    """
+    
+    def get(self, request):
+        serializer = VariableSeriesQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        filters = {
+            'variable_type': data['variable_type'],
+            'date_from': data['date_from'],
+            'date_to': data['date_to'],
+            'station_id': data.get('station'),
+            'field_id': data.get('field'),
+            'source': data.get('source'),
+        }
+        if data['mode'] == 'lttb':
+            bucket_seconds = None
+            points, source_points = lttb_series(points=data['points'], **filters)
+        else:
+            bucket_seconds = data.get('bucket') or auto_bucket(data['date_from'], data['date_to'], data['points'])
+            points = bucket_series(bucket_seconds=bucket_seconds, **filters)
+            source_points = sum(point['count'] for point in points)
+        
+        return Response({
+            'station_id': data.get('station'),
+            'field_id': data.get('field'),
+            'variable_type': data['variable_type'],
+            'unit': VARIABLE_UNITS.get(data['variable_type'], ''),
+            'date_from': timezone.localtime(data['date_from']).isoformat(),
+            'date_to': timezone.localtime(data['date_to']).isoformat(),
+            'mode': data['mode'],
+            'bucket_seconds': bucket_seconds,
+            'source_points': source_points,
+            'points': points,
+        }, status=status.HTTP_200_OK)
+
+
 # ========== Template Views ==========
 
 @login_required
@@ -610,8 +841,10 @@ def campaign_delete_view(request, pk):
 
 # ========== Sensores / IoT Views ==========
 
-from django.http import JsonResponse
-from .sensors import get_thingspeak_service
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from .sensors import get_cached_sensor_data, get_sensor_station
+from .stream import SensorEventStream, StreamLimitError, parse_last_event_id
 
 
 @login_required
@@ -628,21 +861,24 @@ def sensors_dashboard_view(request):
 
 @login_required
 def sensors_data_api(request):
-    """API para obtener datos de sensores en tiempo real."""
+    """API para obtener datos de sensores en tiempo real (importados por `ingest_thingspeak`)."""
     try:
-        service = get_thingspeak_service()
-        
         # Obtener parámetros de la petición
-        results = int(request.GET.get('results', 20))
+        results = min(max(int(request.GET.get('results', 20)), 1), 8000)
         start_date = request.GET.get('start_date')
         end_date = request.GET.get('end_date')
         
-        # Obtener datos históricos con filtros opcionales
-        data = service.get_formatted_historical_data(
+        station, data = get_cached_sensor_data(
+            request.GET.get('station'),
             results=results,
             start_date=start_date,
             end_date=end_date
         )
+        if station is None:
+            return JsonResponse({
+                'success': False,
+                'error': 'No hay estaciones con canal ThingSpeak configurado'
+            }, status=404)
         
         if data:
             return JsonResponse({
@@ -652,11 +888,65 @@ def sensors_data_api(request):
         else:
             return JsonResponse({
                 'success': False,
-                'error': 'No se pudieron obtener datos del sensor'
-            }, status=500)
+                'error': 'No hay lecturas del sensor en el período solicitado'
+            }, status=404)
             
+    except Station.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'La estación no existe o no tiene canal ThingSpeak'
+        }, status=404)
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Parámetro inválido: {str(e)}'
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
             'error': str(e)
         }, status=500)
+
+
+@login_required
+def sensors_stream_view(request):
+    """Stream SSE con las lecturas nuevas de sensores (ver `apps.catalogs.stream`)."""
+    try:
+        # En la reconexión el navegador envía el último ID recibido
+        last_id = parse_last_event_id(
+            request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        )
+        station = get_sensor_station(request.GET.get('station'))
+    except Station.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'La estación no existe o no tiene canal ThingSpeak'
+        }, status=404)
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Parámetro inválido: {str(e)}'
+        }, status=400)
+    
+    if station is None:
+        return JsonResponse({
+            'success': False,
+            'error': 'No hay estaciones con canal ThingSpeak configurado'
+        }, status=404)
+    
+    try:
+        stream = SensorEventStream(station, last_id)
+    except StreamLimitError as e:
+        # El dashboard pasa a consultar los datos periódicamente
+        response = JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=503)
+        response['Retry-After'] = str(settings.SENSOR_STREAM_MAX_SECONDS)
+        return response
+    
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx acumule los mensajes antes de enviarlos
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -3,7 +3,9 @@ Management command para verificar la distribución de eventos.
 """
 
 from django.core.management.base import BaseCommand
-from apps.events.models import Event
+from django.db.models import Max, Min
+from apps.events.models import EventDailyCount
+from apps.events.rollups import count_events
 from apps.catalogs.models import Campaign, Field
 
 
@@ -15,27 +17,36 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('📊 ESTADÍSTICAS DE DISTRIBUCIÓN DE EVENTOS'))
         self.stdout.write('=' * 70)
 
+        # Conteos desde la tabla de resumen (sin recorrer la tabla de eventos)
+        by_campaign = count_events(group_by=('campaign',))
+        by_field = count_events(group_by=('field',))
+        campaign_ranges = {
+            row['campaign_id']: (row['first'], row['last'])
+            for row in EventDailyCount.objects.filter(campaign__isnull=False)
+            .values('campaign_id')
+            .annotate(first=Min('day'), last=Max('day'))
+        }
+
         self.stdout.write(f'\n📈 TOTALES:')
-        self.stdout.write(f'   • Eventos: {Event.objects.count()}')
+        self.stdout.write(f'   • Eventos: {sum(by_campaign.values())}')
         self.stdout.write(f'   • Campos: {Field.objects.count()}')
         self.stdout.write(f'   • Campañas: {Campaign.objects.count()}')
 
         self.stdout.write(f'\n📅 EVENTOS POR CAMPAÑA:')
         for c in Campaign.objects.all().order_by('start_date'):
-            count = Event.objects.filter(campaign=c).count()
+            count = by_campaign.get(c.pk, 0)
             status = '🟢 Activa' if c.is_active else '⚪ Finalizada'
             self.stdout.write(f'\n   {status} {c.name}')
             self.stdout.write(f'      Periodo: {c.start_date} a {c.end_date or "presente"}')
             self.stdout.write(f'      Eventos: {count}')
             
             if count > 0:
-                first = Event.objects.filter(campaign=c).order_by('timestamp').first()
-                last = Event.objects.filter(campaign=c).order_by('timestamp').last()
-                self.stdout.write(f'      Rango real: {first.timestamp.strftime("%d/%m/%Y")} - {last.timestamp.strftime("%d/%m/%Y")}')
+                first, last = campaign_ranges[c.pk]
+                self.stdout.write(f'      Rango real: {first.strftime("%d/%m/%Y")} - {last.strftime("%d/%m/%Y")}')
 
         self.stdout.write(f'\n📍 EVENTOS POR CAMPO:')
         for f in Field.objects.all():
-            count = Event.objects.filter(field=f).count()
+            count = by_field.get(f.pk, 0)
             self.stdout.write(f'   • {f.name} ({f.code}): {count} eventos')
 
         self.stdout.write('\n' + '=' * 70)
@@ -26,6 +26,8 @@ from apps.events.models import (
     OutbreakEvent, ClimateEvent, HarvestEvent, PostHarvestEvent,
     LaborCostEvent
 )
+from apps.events.registry import event_type_registry
+from apps.events.rollups import count_events
 
 User = get_user_model()
 
@@ -312,9 +314,16 @@ class Command(BaseCommand):
         for event_type, count in counts.items():
             self.stdout.write(f'      • {event_type.capitalize()}: {count}')
 
+    def get_event_type(self, name):
+        """Obtiene un tipo de evento del registro en memoria (sin consultar por evento)."""
+        entry = event_type_registry.get_by_name(name)
+        if entry is None:
+            raise EventType.DoesNotExist(f'Tipo de evento "{name}" no encontrado')
+        return entry.event_type
+
     def create_irrigation_event(self, field, campaign, base_date):
         """Crea evento de riego."""
-        event_type = EventType.objects.get(name='Aplicación de Riego')
+        event_type = self.get_event_type('Aplicación de Riego')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(6, 9))
@@ -339,7 +348,7 @@ class Command(BaseCommand):
 
     def create_fertilization_event(self, field, campaign, base_date):
         """Crea evento de fertilización."""
-        event_type = EventType.objects.get(name='Aplicación de Fertilizante')
+        event_type = self.get_event_type('Aplicación de Fertilizante')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(7, 10))
@@ -369,7 +378,7 @@ class Command(BaseCommand):
 
     def create_phytosanitary_event(self, field, campaign, base_date):
         """Crea evento fitosanitario."""
-        event_type = EventType.objects.get(name='Aplicación Fitosanitaria')
+        event_type = self.get_event_type('Aplicación Fitosanitaria')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(6, 8))
@@ -403,7 +412,7 @@ class Command(BaseCommand):
 
     def create_maintenance_event(self, field, campaign, base_date):
         """Crea evento de labores de cultivo."""
-        event_type = EventType.objects.get(name='Labores de Cultivo')
+        event_type = self.get_event_type('Labores de Cultivo')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(7, 11))
@@ -434,7 +443,7 @@ class Command(BaseCommand):
 
     def create_monitoring_event(self, field, campaign, base_date):
         """Crea evento de monitoreo."""
-        event_type = EventType.objects.get(name='Monitoreo de Plagas')
+        event_type = self.get_event_type('Monitoreo de Plagas')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(8, 12))
@@ -465,7 +474,7 @@ class Command(BaseCommand):
 
     def create_outbreak_event(self, field, campaign, base_date):
         """Crea evento de brote."""
-        event_type = EventType.objects.get(name='Brote de Plaga/Enfermedad')
+        event_type = self.get_event_type('Brote de Plaga/Enfermedad')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(8, 14))
@@ -495,7 +504,7 @@ class Command(BaseCommand):
 
     def create_climate_event(self, field, campaign, base_date):
         """Crea evento climático."""
-        event_type = EventType.objects.get(name='Condiciones Climáticas')
+        event_type = self.get_event_type('Condiciones Climáticas')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(12, 18))
@@ -516,7 +525,7 @@ class Command(BaseCommand):
 
     def create_harvest_event(self, field, campaign, base_date):
         """Crea evento de cosecha."""
-        event_type = EventType.objects.get(name='Cosecha')
+        event_type = self.get_event_type('Cosecha')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(6, 10))
@@ -544,7 +553,7 @@ class Command(BaseCommand):
 
     def create_postharvest_event(self, field, campaign, base_date):
         """Crea evento de poscosecha."""
-        event_type = EventType.objects.get(name='Almacenamiento Poscosecha')
+        event_type = self.get_event_type('Almacenamiento Poscosecha')
         
         days_offset = random.randint(0, 3)  # Pocos días después de la cosecha
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(10, 14))
@@ -566,7 +575,7 @@ class Command(BaseCommand):
 
     def create_labor_cost_event(self, field, campaign, base_date):
         """Crea evento de costos de mano de obra."""
-        event_type = EventType.objects.get(name='Mano de Obra y Costos')
+        event_type = self.get_event_type('Mano de Obra y Costos')
         
         days_offset = random.randint(0, 28)
         event_date = base_date + timedelta(days=days_offset, hours=random.randint(16, 18))
@@ -601,16 +610,18 @@ class Command(BaseCommand):
             self.stdout.write(f'   • {field.name} ({field.code}) - {field.surface_ha} ha')
         
         self.stdout.write(f'\n📅 Campañas: {Campaign.objects.count()}')
+        events_by_campaign = count_events(group_by=('campaign',))
         for campaign in Campaign.objects.all():
             status = '✓ Activa' if campaign.is_active else '  Finalizada'
-            event_count = Event.objects.filter(campaign=campaign).count()
+            event_count = events_by_campaign.get(campaign.pk, 0)
             self.stdout.write(f'   {status} {campaign.name} ({campaign.season}) - {event_count} eventos')
         
-        self.stdout.write(f'\n📊 Total de Eventos: {Event.objects.count()}')
+        self.stdout.write(f'\n📊 Total de Eventos: {sum(events_by_campaign.values())}')
         
         # Contar eventos por tipo
-        for event_type in EventType.objects.all():
-            count = Event.objects.filter(event_type=event_type).count()
+        events_by_type = count_events(group_by=('event_type',))
+        for event_type in event_type_registry.event_types():
+            count = events_by_type.get(event_type.pk, 0)
             if count > 0:
                 self.stdout.write(f'   • {event_type.name}: {count}')
         
@@ -3,6 +3,8 @@ from .models import (
     EventType, 
     Event, 
     Attachment, 
+    EventDailyCount,
+    EventTombstone,
     Variable,
     IrrigationEvent,
     FertilizationEvent,
@@ -394,6 +396,37 @@ class AttachmentAdmin(admin.ModelAdmin):
     autocomplete_fields = ['event', 'uploaded_by']
 
 
+@admin.register(EventDailyCount)
+class EventDailyCountAdmin(admin.ModelAdmin):
+    """Conteos mantenidos automáticamente; solo lectura."""
+    list_display = ('day', 'field', 'campaign', 'event_type', 'count')
+    list_filter = ('event_type', 'field', 'campaign')
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EventTombstone)
+class EventTombstoneAdmin(admin.ModelAdmin):
+    """Borrados registrados para la exportación incremental; solo lectura."""
+    list_display = ('event_id', 'field_id', 'deleted_at')
+    search_fields = ('event_id',)
+    date_hierarchy = 'deleted_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Variable)
 class VariableAdmin(admin.ModelAdmin):
     list_display = ('variable_type', 'value', 'unit', 'station', 'field', 'timestamp', 'source')
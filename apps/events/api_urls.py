@@ -6,6 +6,7 @@ from .views import (
     EventListView, 
     EventTypeListView, 
     EventCreateView,
+    EventBulkCreateView,
     EventDetailView,
     EventUpdateView,
     EventDeleteView,
@@ -17,6 +18,7 @@ urlpatterns = [
     # Eventos
     path('', EventListView.as_view(), name='event-list'),
     path('create/', EventCreateView.as_view(), name='event-create'),
+    path('bulk/', EventBulkCreateView.as_view(), name='event-bulk-create'),
     path('<uuid:pk>/', EventDetailView.as_view(), name='event-detail'),
     path('<uuid:pk>/update/', EventUpdateView.as_view(), name='event-update'),
     path('<uuid:pk>/delete/', EventDeleteView.as_view(), name='event-delete'),
@@ -0,0 +1,134 @@
+"""
+Ingesta masiva de eventos de distintos tipos.
+
+Valida todas las filas en una sola pasada (con las relaciones precargadas y el
+pipeline de validación de cada tipo, ver `validation.py`), agrupa las válidas
+por modelo específico e inserta la fila base en `events` y la fila hija en la
+tabla de cada tipo con unos pocos INSERT por tabla.
+"""
+import logging
+
+from django.db import connections, router, transaction
+from rest_framework import serializers
+
+from .models import Event
+from .registry import event_type_registry
+from .rollups import record_events_created
+from .serializers import EventSerializer
+from .validation import build_related_cache, get_validation_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Máximo de eventos aceptados por petición
+MAX_BULK_EVENTS = 10000
+
+# Filas por sentencia INSERT
+BULK_BATCH_SIZE = 500
+
+
+def _insert_local_rows(model, objs, using):
+    """
+    Inserta solo las columnas propias de `model` para cada objeto.
+
+    `bulk_create` no admite modelos con herencia multitabla, por lo que la fila
+    base y la hija se insertan por separado con el mismo mecanismo que usa
+    `Model.save()` internamente.
+    """
+    fields = model._meta.local_concrete_fields
+    ops = connections[using].ops
+    batch_size = max(1, min(BULK_BATCH_SIZE, ops.bulk_batch_size(fields, objs)))
+    for start in range(0, len(objs), batch_size):
+        model._base_manager._insert(objs[start:start + batch_size], fields=fields, using=using)
+
+
+class BulkEventIngestor:
+    """
+    Valida e inserta lotes de eventos de tipos mezclados.
+
+    Uso:
+        report = BulkEventIngestor(user=request.user).ingest(rows)
+    """
+
+    def __init__(self, user=None):
+        self.user = user
+
+    def ingest(self, rows):
+        """
+        Procesa una lista de eventos.
+
+        Las filas inválidas no detienen la carga: se reportan con sus errores y
+        el resto se inserta.
+
+        Args:
+            rows: Lista de diccionarios con los datos de cada evento
+
+        Returns:
+            dict: Reporte con `total`, `created`, `failed` y `results` por fila
+        """
+        related_cache = build_related_cache([row for row in rows if isinstance(row, dict)])
+
+        results = []
+        valid_by_model = {}
+
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                results.append(self._error(index, {'non_field_errors': ['Se esperaba un objeto JSON.']}))
+                continue
+
+            entry = event_type_registry.get(row.get('event_type'))
+            serializer_class = entry.serializer_class if entry is not None else EventSerializer
+
+            try:
+                validated_data = get_validation_pipeline(serializer_class).validate(row, related_cache)
+            except serializers.ValidationError as exc:
+                results.append(self._error(index, exc.detail))
+                continue
+
+            if not validated_data['event_type'].is_active:
+                results.append(self._error(index, {
+                    'event_type': ['No se pueden crear eventos de un tipo inactivo.']
+                }))
+                continue
+
+            model_class = entry.model
+            event = model_class(**validated_data, created_by=self.user)
+            valid_by_model.setdefault(model_class, []).append(event)
+            results.append({'index': index, 'status': 'created', 'id': str(event.id)})
+
+        created = self._insert(valid_by_model)
+        logger.info("Carga masiva de eventos: %s creados, %s con errores", created, len(rows) - created)
+
+        return {
+            'total': len(rows),
+            'created': created,
+            'failed': len(rows) - created,
+            'results': results,
+        }
+
+    def _insert(self, valid_by_model):
+        """Inserta las filas base y luego las hijas, agrupadas por modelo, y suma sus conteos diarios."""
+        all_events = [event for events in valid_by_model.values() for event in events]
+        if not all_events:
+            return 0
+
+        using = router.db_for_write(Event)
+        with transaction.atomic(using=using):
+            _insert_local_rows(Event, all_events, using)
+            for model_class, events in valid_by_model.items():
+                if model_class is Event:
+                    continue
+                parent_link = model_class._meta.get_ancestor_link(Event)
+                for event in events:
+                    setattr(event, parent_link.attname, event.id)
+                _insert_local_rows(model_class, events, using)
+            record_events_created(all_events, using)
+
+        for event in all_events:
+            event._state.adding = False
+            event._state.db = using
+
+        return len(all_events)
+
+    @staticmethod
+    def _error(index, errors):
+        return {'index': index, 'status': 'error', 'errors': errors}
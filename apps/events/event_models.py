@@ -14,6 +14,7 @@ from .models import (
     PostHarvestEvent,
     LaborCostEvent,
 )
+from .registry import event_type_registry
 
 # Mapeo de nombres de tipos de eventos a sus modelos específicos
 EVENT_TYPE_MODEL_MAP = {
@@ -74,3 +75,83 @@ def is_specific_event_model(model_class):
     """
     return model_class in SPECIFIC_EVENT_MODELS
 
+
+# Relaciones que se cargan junto con un evento para las vistas de detalle
+EVENT_RELATED_FIELDS = ('event_type', 'field', 'campaign', 'created_by')
+
+
+def _typed_queryset(model_class, related_fields):
+    """QuerySet del modelo indicado con las relaciones solicitadas."""
+    queryset = model_class.objects.all()
+    if related_fields:
+        queryset = queryset.select_related(*related_fields)
+    return queryset
+
+
+def _registered_model(event_type_id):
+    """Modelo específico de un tipo de evento según el registro (Event si no existe)."""
+    entry = event_type_registry.get(event_type_id)
+    return entry.model if entry is not None else Event
+
+
+def get_typed_event(pk, related_fields=EVENT_RELATED_FIELDS):
+    """
+    Carga un evento como instancia de su modelo específico.
+    
+    Lee el tipo de evento desde la fila base de `events`, resuelve su modelo con
+    el registro de tipos y consulta directamente la tabla hija, en lugar de probar
+    cada modelo específico hasta encontrar el correcto. El costo es siempre
+    de dos consultas, sin importar cuántos tipos de evento existan.
+    
+    Args:
+        pk: ID (UUID) del evento
+        related_fields: Relaciones a incluir con select_related
+        
+    Returns:
+        Instancia del modelo específico, o Event base si el tipo no tiene modelo
+        
+    Raises:
+        Event.DoesNotExist: Si el evento no existe
+    """
+    event_type_id = Event.objects.filter(pk=pk).values_list('event_type_id', flat=True).first()
+    if event_type_id is None:
+        raise Event.DoesNotExist(f"Evento con ID {pk} no encontrado")
+    
+    model_class = _registered_model(event_type_id)
+    
+    try:
+        return _typed_queryset(model_class, related_fields).get(pk=pk)
+    except model_class.DoesNotExist:
+        # El evento no tiene fila en la tabla hija (p. ej. creado como Event base)
+        return _typed_queryset(Event, related_fields).get(pk=pk)
+
+
+def get_typed_events(events, related_fields=EVENT_RELATED_FIELDS):
+    """
+    Convierte una lista de eventos base en instancias de sus modelos específicos.
+    
+    Agrupa los eventos por modelo concreto y ejecuta una sola consulta por tabla
+    hija involucrada, por lo que el costo depende del número de tipos de evento
+    presentes y no del tamaño de la lista. El orden original se conserva.
+    
+    Args:
+        events: Iterable de instancias de Event
+        related_fields: Relaciones a incluir con select_related
+        
+    Returns:
+        list: Eventos tipados; los que no tienen modelo específico se devuelven tal cual
+    """
+    events = list(events)
+    
+    ids_by_model = {}
+    for event in events:
+        model_class = _registered_model(event.event_type_id)
+        if model_class is not Event:
+            ids_by_model.setdefault(model_class, []).append(event.pk)
+    
+    typed_by_id = {}
+    for model_class, ids in ids_by_model.items():
+        for typed_event in _typed_queryset(model_class, related_fields).filter(pk__in=ids):
+            typed_by_id[typed_event.pk] = typed_event
+    
+    return [typed_by_id.get(event.pk, event) for event in events]
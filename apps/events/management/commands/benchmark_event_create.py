@@ -0,0 +1,164 @@
+"""
+Comando de Django para medir el rendimiento de la creación de eventos por la API.
+
+Envía a `EventCreateView` payloads válidos de todos los tipos (tomados de
+eventos existentes) y reporta creaciones por segundo y consultas por creación.
+Todo se ejecuta dentro de una transacción que se revierte al terminar.
+
+Con `--legacy` se mide la creación anterior al pipeline de validación (ver
+`validation.py`): el serializer valida el payload con el serializer del tipo
+y la vista lo vuelve a validar y guarda con ese serializer. Así se comparan
+ambos caminos con la misma base de datos y los mismos payloads.
+
+Uso:
+    python manage.py benchmark_event_create
+    python manage.py benchmark_event_create --iterations 2000 --sample 100
+    python manage.py benchmark_event_create --legacy
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.events.event_models import get_typed_events
+from apps.events.models import Event, EventType
+from apps.events.serializers import EventCreateSerializer, EventSerializer, get_event_serializer
+from apps.events.views import EventCreateView
+
+
+class LegacyEventCreateSerializer(EventCreateSerializer):
+    """Validación anterior al pipeline: consulta el tipo y valida con el serializer específico."""
+
+    def to_internal_value(self, data):
+        event_type_id = data.get('event_type')
+
+        if event_type_id:
+            try:
+                event_type = EventType.objects.get(pk=event_type_id)
+                serializer_class = get_event_serializer(event_type.name)
+
+                if serializer_class != EventSerializer:
+                    serializer = serializer_class(data=data)
+                    serializer.is_valid(raise_exception=True)
+                    return serializer.validated_data
+            except EventType.DoesNotExist:
+                pass
+
+        return super(EventCreateSerializer, self).to_internal_value(data)
+
+
+class LegacyEventCreateView(EventCreateView):
+    """Creación anterior al pipeline: la vista vuelve a validar con el serializer específico."""
+
+    serializer_class = LegacyEventCreateSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        event_type = serializer.validated_data['event_type']
+        serializer_class = get_event_serializer(event_type.name)
+
+        if serializer_class != EventSerializer:
+            specific_serializer = serializer_class(data=request.data)
+            specific_serializer.is_valid(raise_exception=True)
+            event = specific_serializer.save(
+                event_type=event_type,
+                created_by=request.user if request.user.is_authenticated else None
+            )
+            response_serializer = serializer_class(event)
+        else:
+            event = serializer.save(created_by=request.user if request.user.is_authenticated else None)
+            response_serializer = EventSerializer(event)
+
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+
+class Command(BaseCommand):
+    help = 'Mide creaciones por segundo del endpoint de creación de eventos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=500,
+            help='Número de eventos a crear (por defecto 500)',
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=50,
+            help='Eventos existentes usados como plantilla de payload (por defecto 50)',
+        )
+        parser.add_argument(
+            '--legacy',
+            action='store_true',
+            help='Mide la creación anterior al pipeline de validación (doble validación)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        payloads = self._build_payloads(options['sample'])
+        if not payloads:
+            raise CommandError('No hay eventos para usar como plantilla. Ejecute populate_data primero.')
+
+        user = get_user_model().objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('Se requiere un superusuario para autenticar las peticiones.')
+
+        factory = APIRequestFactory()
+        view = (LegacyEventCreateView if options['legacy'] else EventCreateView).as_view()
+
+        def post(payload):
+            request = factory.post('/api/v1/events/create/', payload, format='json')
+            force_authenticate(request, user=user)
+            response = view(request)
+            if response.status_code != 201:
+                raise CommandError(f'Creación fallida ({response.status_code}): {response.data}')
+
+        with transaction.atomic():
+            # Calentamiento: construye serializers y caches fuera de la medición
+            for payload in payloads:
+                post(payload)
+
+            # Contador en lugar de CaptureQueriesContext, que solo guarda las
+            # últimas 9000 consultas
+            queries = 0
+
+            def count_query(execute, sql, params, many, context):
+                nonlocal queries
+                queries += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_query):
+                start = time.perf_counter()
+                for i in range(iterations):
+                    post(payloads[i % len(payloads)])
+                elapsed = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Camino: {"anterior (--legacy)" if options["legacy"] else "pipeline de validación"}')
+        self.stdout.write(f'Tipos de evento: {len({p["event_type"] for p in payloads})}')
+        self.stdout.write(f'Eventos creados: {iterations} en {elapsed:.2f}s')
+        self.stdout.write(f'Consultas por creación: {queries / iterations:.1f}')
+        self.stdout.write(self.style.SUCCESS(f'Creaciones por segundo: {iterations / elapsed:.1f}'))
+
+    def _build_payloads(self, sample):
+        """Serializa eventos existentes (uno o más por tipo) como payloads de creación."""
+        event_type_ids = list(Event.objects.order_by().values_list('event_type', flat=True).distinct())
+        per_type = max(1, sample // max(1, len(event_type_ids)))
+
+        events = []
+        for event_type_id in event_type_ids:
+            events.extend(Event.objects.filter(event_type_id=event_type_id).order_by('-timestamp')[:per_type])
+
+        return [
+            dict(get_event_serializer(event.event_type.name)(event).data)
+            for event in get_typed_events(events)
+        ]
@@ -0,0 +1,35 @@
+"""
+Comando de Django para depurar los registros de eventos borrados.
+
+Elimina los `EventTombstone` más antiguos que `EVENT_TOMBSTONE_RETENTION_DAYS`.
+Los cursores de la exportación incremental anteriores a ese plazo dejan de
+ser válidos (el cliente debe hacer una exportación completa).
+
+Uso:
+    python manage.py purge_event_tombstones
+    python manage.py purge_event_tombstones --days 30
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.events.models import EventTombstone
+
+
+class Command(BaseCommand):
+    help = 'Elimina los registros de eventos borrados más antiguos que la retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.EVENT_TOMBSTONE_RETENTION_DAYS,
+            help=f'Días de retención (por defecto {settings.EVENT_TOMBSTONE_RETENTION_DAYS})',
+        )
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - timedelta(days=max(0, options['days']))
+        deleted, _ = EventTombstone.objects.filter(deleted_at__lt=limit).delete()
+        self.stdout.write(self.style.SUCCESS(f'✓ {deleted} registros de borrado eliminados'))
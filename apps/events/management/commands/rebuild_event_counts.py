@@ -0,0 +1,45 @@
+"""
+Comando de Django para reconstruir la tabla de conteos diarios de eventos.
+
+Recalcula `EventDailyCount` desde la tabla `events`. Útil tras cargas o
+correcciones hechas directamente en la base de datos.
+
+Uso:
+    python manage.py rebuild_event_counts
+    python manage.py rebuild_event_counts --check  # Solo compara, no modifica
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from apps.events.models import EventDailyCount
+from apps.events.rollups import compute_event_counts, rebuild_event_counts, stored_event_counts
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los conteos diarios de eventos por campo, campaña y tipo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Compara los conteos con la tabla de eventos sin modificarlos',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            expected = compute_event_counts()
+            stored = stored_event_counts()
+            mismatched = [key for key in expected.keys() | stored.keys() if expected.get(key) != stored.get(key)]
+            if mismatched:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠ {len(mismatched)} filas de conteo desfasadas '
+                    f'({sum(expected.values())} eventos, {sum(stored.values())} en la tabla de resumen)'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ Conteos al día: {sum(expected.values())} eventos'))
+            return
+
+        rows = rebuild_event_counts()
+        total = EventDailyCount.objects.aggregate(total=Sum('count'))['total'] or 0
+        self.stdout.write(self.style.SUCCESS(f'✓ {rows} filas de conteo generadas ({total} eventos)'))
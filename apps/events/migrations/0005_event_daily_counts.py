@@ -0,0 +1,117 @@
+# Generated by Django 4.2.17 on 2026-10-17 02:37
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def populate_event_daily_counts(apps, schema_editor):
+    """Calcula los conteos diarios de los eventos existentes."""
+    Event = apps.get_model("events", "Event")
+    EventDailyCount = apps.get_model("events", "EventDailyCount")
+    db_alias = schema_editor.connection.alias
+
+    rows = (
+        Event.objects.using(db_alias)
+        .order_by()
+        .annotate(day=TruncDate("timestamp"))
+        .values("field_id", "campaign_id", "event_type_id", "day")
+        .annotate(total=Count("id"))
+    )
+    EventDailyCount.objects.using(db_alias).bulk_create(
+        [
+            EventDailyCount(
+                field_id=row["field_id"],
+                campaign_id=row["campaign_id"],
+                event_type_id=row["event_type_id"],
+                day=row["day"],
+                count=row["total"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalogs", "0001_initial"),
+        ("events", "0004_climateevent_fertilizationevent_harvestevent_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventDailyCount",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("day", models.DateField(verbose_name="Día")),
+                (
+                    "count",
+                    models.PositiveIntegerField(default=0, verbose_name="Eventos"),
+                ),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_daily_counts",
+                        to="catalogs.campaign",
+                        verbose_name="Campaña",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_counts",
+                        to="events.eventtype",
+                        verbose_name="Tipo de Evento",
+                    ),
+                ),
+                (
+                    "field",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_daily_counts",
+                        to="catalogs.field",
+                        verbose_name="Campo",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Conteo Diario de Eventos",
+                "verbose_name_plural": "Conteos Diarios de Eventos",
+                "db_table": "event_daily_counts",
+                "indexes": [
+                    models.Index(
+                        fields=["campaign", "field"],
+                        name="event_daily_campaig_d9e580_idx",
+                    ),
+                    models.Index(
+                        fields=["event_type"], name="event_daily_event_t_cc1701_idx"
+                    ),
+                    models.Index(fields=["day"], name="event_daily_day_6870d4_idx"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="eventdailycount",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("campaign__isnull", False)),
+                fields=("field", "campaign", "event_type", "day"),
+                name="unique_event_daily_count",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="eventdailycount",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("campaign__isnull", True)),
+                fields=("field", "event_type", "day"),
+                name="unique_event_daily_count_no_campaign",
+            ),
+        ),
+        migrations.RunPython(populate_event_daily_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.17 on 2026-10-17 03:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_event_daily_counts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventTombstone",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("event_id", models.UUIDField(verbose_name="Evento")),
+                (
+                    "field_id",
+                    models.UUIDField(blank=True, null=True, verbose_name="Campo"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Borrado el"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Evento Borrado",
+                "verbose_name_plural": "Eventos Borrados",
+                "db_table": "event_tombstones",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["updated_at", "id"], name="events_updated_2cf292_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventtombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="event_tombs_deleted_9cb9b4_idx"
+            ),
+        ),
+    ]
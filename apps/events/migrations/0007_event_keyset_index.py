@@ -0,0 +1,19 @@
+# Generated by Django 4.2.17 on 2026-10-17 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_event_tombstones"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["-timestamp", "-id"], name="events_timesta_1d5c47_idx"
+            ),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -44,6 +44,28 @@ class EventType(models.Model):
         return f"{self.name} ({self.get_category_display()})"
 
 
+class EventQuerySet(models.QuerySet):
+    """QuerySet de eventos (lo heredan los modelos específicos)."""
+
+    def delete(self):
+        """
+        Borra los eventos, los descuenta de los conteos diarios y registra sus
+        borrados para la exportación incremental, en la misma transacción.
+        """
+        from .rollups import record_events_deleted
+
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using, savepoint=False):
+            rows = list(self.order_by().values_list('pk', 'field_id', 'campaign_id', 'event_type_id', 'timestamp'))
+            result = super().delete()
+            record_events_deleted([row[1:] for row in rows], using)
+            EventTombstone.record([(row[0], row[1]) for row in rows], using)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Event(models.Model):
     """Modelo base para eventos de trazabilidad."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -79,6 +101,8 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         db_table = 'events'
         ordering = ['-timestamp']
@@ -89,7 +113,11 @@ class Event(models.Model):
             models.Index(fields=['event_type']),
             models.Index(fields=['campaign']),
             models.Index(fields=['-timestamp']),
+            # Paginación por cursor (ver apps.events.pagination)
+            models.Index(fields=['-timestamp', '-id']),
             models.Index(fields=['created_by']),
+            # Exportación incremental (ver apps.reports.delta)
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def clean(self):
@@ -103,6 +131,40 @@ class Event(models.Model):
                 'timestamp': f'El timestamp no puede estar más de 1 hora en el futuro. Máximo permitido: {max_timestamp}'
             })
 
+    def save(self, *args, **kwargs):
+        """Guarda el evento y actualiza sus conteos diarios en la misma transacción."""
+        from .rollups import COUNT_KEY_FIELDS, get_stored_count_key, record_event_saved
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        update_fields = kwargs.get('update_fields')
+        tracks_counts = update_fields is None or not set(update_fields).isdisjoint(COUNT_KEY_FIELDS)
+
+        with transaction.atomic(using=using, savepoint=False):
+            previous_key = None
+            if tracks_counts and not self._state.adding:
+                previous_key = get_stored_count_key(self.pk, using)
+            super().save(*args, **kwargs)
+            if tracks_counts:
+                record_event_saved(previous_key, self, using)
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        Borra el evento, lo descuenta de los conteos diarios y registra el
+        borrado para la exportación incremental, en la misma transacción.
+        """
+        from .rollups import record_event_deleted
+
+        using = using or router.db_for_write(type(self), instance=self)
+        # Con keep_parents un modelo específico conserva su fila en `events`
+        removes_event = not keep_parents or type(self) is Event
+        event_id = self.pk
+        with transaction.atomic(using=using, savepoint=False):
+            result = super().delete(using=using, keep_parents=keep_parents)
+            if removes_event:
+                record_event_deleted(self, using)
+                EventTombstone.record([(event_id, self.field_id)], using)
+        return result
+
     def __str__(self):
         return f"{self.event_type.name} - {self.field.name} @ {self.timestamp}"
 
@@ -812,6 +874,106 @@ class Attachment(models.Model):
         return f"{self.file_name} - {self.event}"
 
 
+class EventDailyCount(models.Model):
+    """
+    Conteo de eventos por campo, campaña, tipo de evento y día.
+
+    Tabla de resumen mantenida al crear, modificar y borrar eventos (ver
+    `apps.events.rollups`); se reconstruye con `rebuild_event_counts`.
+    """
+    id = models.BigAutoField(primary_key=True)
+    field = models.ForeignKey(
+        'catalogs.Field',
+        on_delete=models.CASCADE,
+        related_name='event_daily_counts',
+        verbose_name="Campo"
+    )
+    campaign = models.ForeignKey(
+        'catalogs.Campaign',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='event_daily_counts',
+        verbose_name="Campaña"
+    )
+    event_type = models.ForeignKey(
+        EventType,
+        on_delete=models.CASCADE,
+        related_name='daily_counts',
+        verbose_name="Tipo de Evento"
+    )
+    day = models.DateField(verbose_name="Día")
+    count = models.PositiveIntegerField(default=0, verbose_name="Eventos")
+
+    class Meta:
+        db_table = 'event_daily_counts'
+        verbose_name = "Conteo Diario de Eventos"
+        verbose_name_plural = "Conteos Diarios de Eventos"
+        indexes = [
+            models.Index(fields=['campaign', 'field']),
+            models.Index(fields=['event_type']),
+            models.Index(fields=['day']),
+        ]
+        constraints = [
+            # Dos restricciones porque NULL no se considera repetido en UNIQUE
+            models.UniqueConstraint(
+                fields=['field', 'campaign', 'event_type', 'day'],
+                condition=models.Q(campaign__isnull=False),
+                name='unique_event_daily_count'
+            ),
+            models.UniqueConstraint(
+                fields=['field', 'event_type', 'day'],
+                condition=models.Q(campaign__isnull=True),
+                name='unique_event_daily_count_no_campaign'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.field_id} / {self.campaign_id} / {self.event_type_id} @ {self.day}: {self.count}"
+
+
+class EventTombstone(models.Model):
+    """
+    Registro de un evento borrado.
+
+    Lo crean `Event.delete()`, `Event.objects.filter(...).delete()` y, al
+    borrar un campo, la señal `pre_delete` de Field (ver `signals.py`) para que
+    la exportación incremental informe los borrados; se depura con
+    `purge_event_tombstones`.
+    """
+    id = models.BigAutoField(primary_key=True)
+    event_id = models.UUIDField(verbose_name="Evento")
+    field_id = models.UUIDField(null=True, blank=True, verbose_name="Campo")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Borrado el")
+
+    class Meta:
+        db_table = 'event_tombstones'
+        verbose_name = "Evento Borrado"
+        verbose_name_plural = "Eventos Borrados"
+        indexes = [
+            models.Index(fields=['deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} borrado el {self.deleted_at}"
+
+    @classmethod
+    def record(cls, events, using=None):
+        """
+        Registra eventos borrados.
+
+        Args:
+            events: Pares (event_id, field_id)
+            using: Alias de la base de datos
+        """
+        using = using or router.db_for_write(cls)
+        deleted_at = timezone.now()
+        cls.objects.using(using).bulk_create(
+            [cls(event_id=event_id, field_id=field_id, deleted_at=deleted_at) for event_id, field_id in events],
+            batch_size=1000,
+        )
+
+
 class Variable(models.Model):
     """Modelo para variables ambientales/IoT."""
     VARIABLE_TYPES = [
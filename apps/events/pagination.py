@@ -0,0 +1,296 @@
+"""
+Paginación por cursor (keyset) para el listado de eventos.
+
+En lugar de OFFSET, cada página se obtiene filtrando a partir del último
+`(timestamp, id)` visto, de modo que la consulta aprovecha los índices sobre
+`(-timestamp, -id)` y `(field, -timestamp)` y una página profunda cuesta lo
+mismo que la primera. El total exacto (COUNT) es opcional.
+"""
+import base64
+import binascii
+import uuid
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+# Orden estable: el id desempata eventos con el mismo timestamp
+KEYSET_ORDERING = ('-timestamp', '-id')
+
+
+def encode_cursor(event, reverse=False):
+    """
+    Codifica la posición de un evento como cursor opaco.
+
+    Args:
+        event: Evento que marca la posición
+        reverse: True si el cursor apunta hacia la página anterior
+
+    Returns:
+        str: Cursor en base64 seguro para URLs
+    """
+    direction = 'p' if reverse else 'n'
+    raw = f"{direction}|{event.timestamp.isoformat()}|{event.pk}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Args:
+        cursor: Cursor recibido en la petición
+
+    Returns:
+        tuple: (reverse, timestamp, id)
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        direction, timestamp_str, pk_str = raw.split('|')
+        timestamp = parse_datetime(timestamp_str)
+        pk = uuid.UUID(pk_str)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+    if direction not in ('n', 'p') or timestamp is None:
+        raise ValueError(f"Cursor inválido: {cursor}")
+
+    return direction == 'p', timestamp, pk
+
+
+class KeysetPage:
+    """
+    Página de resultados obtenida con paginación por cursor.
+
+    Expone una interfaz similar a `django.core.paginator.Page` para su uso
+    en templates (`has_next`, `has_previous`, `has_other_pages`).
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, total_count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total_count = total_count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def paginate_keyset(queryset, cursor=None, page_size=20, with_count=True):
+    """
+    Obtiene una página de eventos ordenados por `(-timestamp, -id)`.
+
+    Args:
+        queryset: QuerySet de eventos ya filtrado
+        cursor: Cursor de la página a obtener (None para la primera)
+        page_size: Número de eventos por página
+        with_count: Si es False no se ejecuta el COUNT del total
+
+    Returns:
+        KeysetPage: Página con los eventos y los cursores vecinos
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    total_count = queryset.count() if with_count else None
+
+    reverse = False
+    if cursor:
+        reverse, timestamp, pk = decode_cursor(cursor)
+        if reverse:
+            queryset = queryset.filter(
+                Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=pk)
+            ).order_by('timestamp', 'id')
+        else:
+            queryset = queryset.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk)
+            ).order_by(*KEYSET_ORDERING)
+    else:
+        queryset = queryset.order_by(*KEYSET_ORDERING)
+
+    # Se pide un elemento extra para saber si hay más allá de esta página
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if reverse:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    next_cursor = encode_cursor(rows[-1]) if rows and has_next else None
+    previous_cursor = encode_cursor(rows[0], reverse=True) if rows and has_previous else None
+
+    return KeysetPage(rows, next_cursor, previous_cursor, total_count)
+
+
+def parse_count_param(value):
+    """Interpreta el parámetro `count` (por defecto se calcula el total)."""
+    if value is None:
+        return True
+    return value.lower() not in ('0', 'false', 'no')
+
+
+class EventCursorPagination(BasePagination):
+    """
+    Paginación por cursor para la API de eventos.
+
+    Parámetros:
+    - `cursor`: posición devuelta en `next`/`previous`
+    - `page_size`: eventos por página (máximo `max_page_size`)
+    - `count=false`: omite el total exacto de eventos
+
+    Por compatibilidad, si la petición incluye `page` se usa la paginación
+    por número de página anterior.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy_paginator = None
+
+        if PageNumberPagination.page_query_param in request.query_params:
+            self.legacy_paginator = PageNumberPagination()
+            return self.legacy_paginator.paginate_queryset(queryset, request, view)
+
+        try:
+            self.page = paginate_keyset(
+                queryset,
+                cursor=request.query_params.get(self.cursor_query_param),
+                page_size=self.get_page_size(request),
+                with_count=parse_count_param(request.query_params.get(self.count_query_param)),
+            )
+        except ValueError:
+            raise NotFound('Cursor inválido')
+
+        return list(self.page)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.page.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.page.next_cursor)
+
+    def get_previous_link(self):
+        if not self.page.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        if self.legacy_paginator is not None:
+            return self.legacy_paginator.get_paginated_response(data)
+
+        payload = OrderedDict()
+        if self.page.total_count is not None:
+            payload['count'] = self.page.total_count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {
+                    'type': 'integer',
+                    'example': 123,
+                    'description': 'Total de eventos (se omite con count=false)',
+                },
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                    'example': 'http://api.example.org/api/v1/events/?cursor=bnwyMDI0LTEwLTI3VDEwOjMwOjAw',
+                },
+                'previous': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor de paginación (valor de next/previous)',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Eventos por página (máximo {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Usar false para omitir el conteo total de eventos',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+
+
+def build_cursor_query(query_params, cursor):
+    """
+    Construye la query string de un enlace de paginación conservando filtros.
+
+    Args:
+        query_params: QueryDict de la petición actual
+        cursor: Cursor de la página destino
+
+    Returns:
+        str: Query string sin el signo '?'
+    """
+    params = query_params.copy()
+    params.pop('page', None)
+    params['cursor'] = cursor
+    return params.urlencode()
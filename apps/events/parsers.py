@@ -0,0 +1,32 @@
+"""
+Parsers adicionales para la API de Eventos.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parser para NDJSON (un objeto JSON por línea).
+
+    Devuelve la lista de objetos; las líneas vacías se ignoran.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        rows = []
+        for line_number, raw_line in enumerate(stream, 1):
+            line = raw_line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                raise ParseError(f'NDJSON inválido en la línea {line_number}: {e}')
+        return rows
@@ -0,0 +1,140 @@
+"""
+Registro en memoria de los tipos de evento.
+
+Los tipos de evento son pocos y casi nunca cambian, pero casi cada operación
+sobre eventos necesita la fila de `EventType` y, a partir de su nombre, el
+modelo, el serializer y el formulario específicos. El registro carga todos los
+tipos con una sola consulta y los indexa por ID (y por nombre), de modo que las
+rutas calientes resuelven todo con un acceso a diccionario.
+
+Es local a cada proceso: se invalida con las señales `post_save`/`post_delete`
+de `EventType` (ver `signals.py`) y se recarga en el siguiente acceso.
+"""
+import threading
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+
+from .models import EventType
+
+
+class RegisteredEventType:
+    """
+    Entrada del registro: la fila de `EventType` y sus clases asociadas.
+
+    Attributes:
+        event_type: Instancia de EventType
+        model: Modelo específico (Event base si el tipo no tiene modelo)
+        serializer_class: Serializer específico del tipo
+        form_class: Formulario del tipo (None si no tiene)
+    """
+    __slots__ = ('event_type', 'model', 'serializer_class', 'form_class')
+
+    def __init__(self, event_type, model, serializer_class, form_class):
+        self.event_type = event_type
+        self.model = model
+        self.serializer_class = serializer_class
+        self.form_class = form_class
+
+    def __repr__(self):
+        return f'<RegisteredEventType {self.event_type.pk}: {self.event_type.name}>'
+
+
+class EventTypeRegistry:
+    """
+    Índice en memoria de los tipos de evento por ID y por nombre.
+
+    Uso:
+        entry = event_type_registry.get(event_type_id)
+        if entry is not None:
+            entry.model, entry.serializer_class, entry.form_class
+    """
+
+    def __init__(self):
+        # (por_id, por_nombre); se reemplaza completo para que los lectores
+        # nunca vean un índice a medio invalidar
+        self._indexes = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Carga todos los tipos de evento (una consulta) si no están cargados."""
+        indexes = self._indexes
+        if indexes is not None:
+            return indexes
+
+        # Importados aquí porque estos módulos dependen (directa o indirectamente) de este
+        from .event_models import get_event_model
+        from .forms import get_event_form
+        from .serializers import get_event_serializer
+
+        with self._lock:
+            if self._indexes is None:
+                entries = [
+                    RegisteredEventType(
+                        event_type,
+                        get_event_model(event_type.name),
+                        get_event_serializer(event_type.name),
+                        get_event_form(event_type.name),
+                    )
+                    for event_type in EventType.objects.all()
+                ]
+                self._indexes = (
+                    {entry.event_type.pk: entry for entry in entries},
+                    {entry.event_type.name: entry for entry in entries},
+                )
+            return self._indexes
+
+    def invalidate(self):
+        """Descarta el contenido; se recarga en el siguiente acceso."""
+        with self._lock:
+            self._indexes = None
+
+    def get(self, pk):
+        """
+        Obtiene la entrada de un tipo de evento por su ID.
+
+        Args:
+            pk: ID del tipo de evento (entero o texto)
+
+        Returns:
+            RegisteredEventType o None si no existe o el ID no es válido
+        """
+        try:
+            pk = EventType._meta.pk.to_python(pk)
+        except (DjangoValidationError, TypeError, ValueError):
+            return None
+        return self._load()[0].get(pk)
+
+    def get_by_name(self, name):
+        """
+        Obtiene la entrada de un tipo de evento por su nombre.
+
+        Returns:
+            RegisteredEventType o None si no existe
+        """
+        return self._load()[1].get(name)
+
+    def entries(self):
+        """Todas las entradas, en el orden por defecto de EventType."""
+        return list(self._load()[0].values())
+
+    def event_types(self, *ordering, active_only=False):
+        """
+        Filas de EventType del registro.
+
+        Args:
+            ordering: Atributos por los que ordenar (por defecto categoría y nombre)
+            active_only: Si es True solo se incluyen los tipos activos
+
+        Returns:
+            list: Instancias de EventType
+        """
+        event_types = [entry.event_type for entry in self.entries()]
+        if active_only:
+            event_types = [event_type for event_type in event_types if event_type.is_active]
+        if ordering:
+            event_types.sort(key=attrgetter(*ordering))
+        return event_types
+
+
+event_type_registry = EventTypeRegistry()
@@ -0,0 +1,243 @@
+"""
+Conteos de eventos por campo, campaña, tipo de evento y día.
+
+`EventDailyCount` guarda cuántos eventos hay por cada combinación
+`(field, campaign, event_type, day)`. Las pantallas de conteo y distribución
+leen de esa tabla en lugar de recorrer `events`.
+
+Mantenimiento:
+- `Event.save()` aplica la diferencia entre la clave anterior y la nueva en la
+  misma transacción que el guardado.
+- `Event.delete()` y `Event.objects.filter(...).delete()` descuentan los
+  eventos borrados en la misma transacción. Al borrar un campo sus conteos se
+  borran en cascada junto con sus eventos (sin señales por evento, de modo que
+  Django borra los eventos en bloque).
+- La carga masiva (que no pasa por `save()`) aplica sus conteos explícitamente.
+- `python manage.py rebuild_event_counts` reconstruye la tabla desde `events`.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Event, EventDailyCount
+
+
+# Campos de Event que determinan la fila de conteo de un evento
+COUNT_KEY_FIELDS = ('field', 'field_id', 'campaign', 'campaign_id', 'event_type', 'event_type_id', 'timestamp')
+
+
+def event_day(timestamp):
+    """Día (en la zona horaria del proyecto) al que se asigna un evento."""
+    if timezone.is_aware(timestamp):
+        timestamp = timezone.localtime(timestamp)
+    return timestamp.date()
+
+
+def event_count_key(event):
+    """
+    Clave de conteo de un evento.
+
+    Returns:
+        tuple: (field_id, campaign_id, event_type_id, day)
+    """
+    return (event.field_id, event.campaign_id, event.event_type_id, event_day(event.timestamp))
+
+
+def get_stored_count_key(pk, using=None):
+    """Clave de conteo del evento tal como está guardado (None si no existe)."""
+    row = (
+        Event.objects.using(using)
+        .filter(pk=pk)
+        .values_list('field_id', 'campaign_id', 'event_type_id', 'timestamp')
+        .first()
+    )
+    if row is None:
+        return None
+    return (row[0], row[1], row[2], event_day(row[3]))
+
+
+def _key_filter(key):
+    field_id, campaign_id, event_type_id, day = key
+    return {
+        'field_id': field_id,
+        'campaign_id': campaign_id,
+        'event_type_id': event_type_id,
+        'day': day,
+    }
+
+
+def _key_order(item):
+    # campaign_id puede ser None, que no se compara con UUID
+    return tuple('' if part is None else str(part) for part in item[0])
+
+
+def apply_count_deltas(deltas, using=None):
+    """
+    Suma (o resta) conteos a la tabla de resumen.
+
+    Debe llamarse dentro de la transacción que crea, modifica o borra los
+    eventos correspondientes.
+
+    Args:
+        deltas: Mapeo {clave de conteo: diferencia}
+        using: Alias de la base de datos
+    """
+    using = using or router.db_for_write(EventDailyCount)
+    emptied_fields = set()
+    # Siempre en el mismo orden: dos transacciones que tocan las mismas filas
+    # las bloquean en el mismo orden y no pueden quedar en deadlock
+    for key, delta in sorted(deltas.items(), key=_key_order):
+        if not delta:
+            continue
+        rows = EventDailyCount.objects.using(using).filter(**_key_filter(key))
+
+        if delta < 0:
+            rows.update(count=F('count') + delta)
+            emptied_fields.add(key[0])
+            continue
+
+        if rows.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic(using=using):
+                EventDailyCount.objects.using(using).create(count=delta, **_key_filter(key))
+        except IntegrityError:
+            # Otra transacción creó la fila entre el UPDATE y el INSERT
+            rows.update(count=F('count') + delta)
+
+    if emptied_fields:
+        # Un solo DELETE para las filas que quedaron sin eventos
+        EventDailyCount.objects.using(using).filter(field_id__in=emptied_fields, count__lte=0).delete()
+
+
+def record_event_saved(previous_key, event, using=None):
+    """Actualiza los conteos tras guardar un evento (alta o modificación)."""
+    current_key = event_count_key(event)
+    if previous_key == current_key:
+        return
+    deltas = Counter({current_key: 1})
+    if previous_key is not None:
+        deltas[previous_key] -= 1
+    apply_count_deltas(deltas, using)
+
+
+def record_event_deleted(event, using=None):
+    """Descuenta un evento borrado."""
+    apply_count_deltas({event_count_key(event): -1}, using)
+
+
+def record_events_deleted(keys, using=None):
+    """
+    Descuenta eventos borrados en bloque.
+
+    Args:
+        keys: Tuplas (field_id, campaign_id, event_type_id, timestamp) de los eventos
+        using: Alias de la base de datos
+    """
+    deltas = Counter()
+    for field_id, campaign_id, event_type_id, timestamp in keys:
+        deltas[(field_id, campaign_id, event_type_id, event_day(timestamp))] -= 1
+    apply_count_deltas(deltas, using)
+
+
+def record_events_created(events, using=None):
+    """Suma los conteos de eventos insertados sin pasar por `save()`."""
+    apply_count_deltas(Counter(event_count_key(event) for event in events), using)
+
+
+def detach_campaign_counts(campaign_id, using=None):
+    """
+    Mueve los conteos de una campaña a "sin campaña".
+
+    Al borrar una campaña sus eventos quedan con `campaign = NULL` mediante un
+    UPDATE que no pasa por `save()`.
+    """
+    using = using or router.db_for_write(EventDailyCount)
+    rows = EventDailyCount.objects.using(using).filter(campaign_id=campaign_id)
+    deltas = Counter()
+    for field_id, event_type_id, day, count in rows.values_list('field_id', 'event_type_id', 'day', 'count'):
+        deltas[(field_id, None, event_type_id, day)] += count
+    rows.delete()
+    apply_count_deltas(deltas, using)
+
+
+def compute_event_counts(using=None):
+    """
+    Calcula los conteos agrupando directamente la tabla `events`.
+
+    Returns:
+        dict: {clave de conteo: número de eventos}
+    """
+    rows = (
+        Event.objects.using(using)
+        .order_by()
+        .annotate(day=TruncDate('timestamp'))
+        .values_list('field_id', 'campaign_id', 'event_type_id', 'day')
+        .annotate(total=Count('id'))
+    )
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def stored_event_counts(using=None):
+    """Conteos guardados en la tabla de resumen: {clave de conteo: número de eventos}."""
+    rows = EventDailyCount.objects.using(using).values_list(
+        'field_id', 'campaign_id', 'event_type_id', 'day', 'count'
+    )
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def rebuild_event_counts(using=None):
+    """
+    Reconstruye la tabla de resumen a partir de `events`.
+
+    Returns:
+        int: Número de filas de conteo generadas
+    """
+    using = using or router.db_for_write(EventDailyCount)
+    with transaction.atomic(using=using):
+        counts = compute_event_counts(using)
+        EventDailyCount.objects.using(using).all().delete()
+        EventDailyCount.objects.using(using).bulk_create(
+            [EventDailyCount(count=total, **_key_filter(key)) for key, total in counts.items()],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def count_events(group_by=(), **filters):
+    """
+    Cuenta eventos desde la tabla de resumen.
+
+    Args:
+        group_by: Dimensiones por las que agrupar (p. ej. `('event_type',)` o
+            `('campaign', 'field')`); vacío para el total
+        **filters: Filtros sobre EventDailyCount (p. ej. `campaign_id=...`,
+            `day__gte=...`)
+
+    Returns:
+        int si no se agrupa; si no, dict {valor: total} con una dimensión o
+        {(valor, ...): total} con varias
+    """
+    rows = EventDailyCount.objects.filter(**filters)
+    if not group_by:
+        return rows.aggregate(total=Sum('count'))['total'] or 0
+
+    columns = [f'{dimension}_id' if dimension != 'day' else 'day' for dimension in group_by]
+    totals = rows.order_by().values_list(*columns).annotate(total=Sum('count'))
+    if len(columns) == 1:
+        return {row[0]: row[1] for row in totals}
+    return {tuple(row[:-1]): row[-1] for row in totals}
+
+
+def event_day_range(**filters):
+    """
+    Primer y último día con eventos según la tabla de resumen.
+
+    Returns:
+        tuple: (primer_día, último_día); (None, None) si no hay eventos
+    """
+    bounds = EventDailyCount.objects.filter(**filters).aggregate(first=Min('day'), last=Max('day'))
+    return bounds['first'], bounds['last']
@@ -3,6 +3,8 @@ Serializers para la API de Eventos.
 Incluye serialización de Eventos y Tipos de Eventos.
 """
 
+from collections.abc import Mapping
+
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from .models import (
@@ -20,6 +22,8 @@ from .models import (
     LaborCostEvent,
 )
 from .event_models import EVENT_TYPE_MODEL_MAP
+from .registry import event_type_registry
+from .validation import build_related_cache, get_validation_pipeline
 
 
 class EventTypeSerializer(serializers.ModelSerializer):
@@ -300,10 +304,40 @@ def get_event_serializer(event_type_name):
     return EVENT_SERIALIZER_MAP.get(event_type_name, EventSerializer)
 
 
+# Serializers con solo los campos propios de cada tipo de evento (se crean bajo demanda)
+_EVENT_DETAILS_SERIALIZERS = {}
+
+
+def get_event_details_serializer(serializer_class):
+    """
+    Obtiene un serializer con solo los campos específicos de un tipo de evento.
+    
+    Args:
+        serializer_class: Serializer específico (p. ej. IrrigationEventSerializer)
+        
+    Returns:
+        Clase de serializer con los campos que no pertenecen al Event base
+    """
+    if serializer_class not in _EVENT_DETAILS_SERIALIZERS:
+        base_fields = set(EventSerializer.Meta.fields)
+        meta = type('Meta', (), {
+            'model': serializer_class.Meta.model,
+            'fields': [f for f in serializer_class.Meta.fields if f not in base_fields],
+        })
+        name = serializer_class.__name__.replace('Serializer', 'DetailsSerializer')
+        _EVENT_DETAILS_SERIALIZERS[serializer_class] = type(
+            name, (serializers.ModelSerializer,), {'Meta': meta}
+        )
+    return _EVENT_DETAILS_SERIALIZERS[serializer_class]
+
+
 class EventListSerializer(serializers.ModelSerializer):
     """
     Serializer simplificado para listado de eventos.
     Incluye solo los campos esenciales para optimizar la respuesta.
+    
+    Si el contexto incluye `expand_details`, agrega `details` con los campos
+    específicos del tipo de evento (la instancia debe ser del modelo específico).
     """
     
     event_type_name = serializers.CharField(source='event_type.name', read_only=True)
@@ -312,34 +346,53 @@ class EventListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = ['id', 'event_type', 'event_type_name', 'field', 'field_name', 'timestamp', 'observations']
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        
+        if self.context.get('expand_details'):
+            entry = event_type_registry.get(instance.event_type_id)
+            serializer_class = entry.serializer_class if entry is not None else EventSerializer
+            details = None
+            if serializer_class != EventSerializer and isinstance(instance, serializer_class.Meta.model):
+                details = get_event_details_serializer(serializer_class)(instance).data
+            data['details'] = details
+        
+        return data
 
 
 class EventCreateSerializer(serializers.ModelSerializer):
     """
     Serializer para crear eventos.
     Usa el serializer específico según el tipo de evento.
+    
+    La validación específica se hace una sola vez con el pipeline cacheado del
+    tipo de evento (ver `validation.py`); el tipo de evento se obtiene del
+    registro en memoria y el campo y la campaña se cargan una vez y se
+    comparten con esa validación.
     """
     
+    # Modelo y serializer específicos resueltos al validar
+    event_model = Event
+    event_serializer_class = EventSerializer
+    
     def to_internal_value(self, data):
         """Determina qué serializer usar basado en event_type."""
-        event_type_id = data.get('event_type')
+        entry = event_type_registry.get(data.get('event_type')) if isinstance(data, Mapping) else None
         
-        if event_type_id:
-            try:
-                from .models import EventType
-                event_type = EventType.objects.get(pk=event_type_id)
-                serializer_class = get_event_serializer(event_type.name)
-                
-                # Si hay un serializer específico, usarlo
-                if serializer_class != EventSerializer:
-                    serializer = serializer_class(data=data)
-                    serializer.is_valid(raise_exception=True)
-                    return serializer.validated_data
-            except EventType.DoesNotExist:
-                pass
+        if entry is None:
+            # Fallback al serializer base (reporta el error de event_type)
+            return super().to_internal_value(data)
         
-        # Fallback al serializer base
-        return super().to_internal_value(data)
+        self.event_model = entry.model
+        self.event_serializer_class = entry.serializer_class
+        
+        related_cache = build_related_cache([data], event_types=[entry.event_type])
+        return get_validation_pipeline(self.event_serializer_class).validate(data, related_cache)
+    
+    def create(self, validated_data):
+        """Crea el evento con el modelo específico de su tipo."""
+        return self.event_model.objects.create(**validated_data)
     
     class Meta:
         model = Event
@@ -0,0 +1,52 @@
+"""
+Señales de la app de Eventos.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.catalogs.models import Campaign, Field
+from .models import Event, EventTombstone, EventType
+from .registry import event_type_registry
+from .rollups import detach_campaign_counts
+
+
+@receiver(post_save, sender=EventType)
+@receiver(post_delete, sender=EventType)
+def invalidate_event_type_registry(sender, **kwargs):
+    """Invalida el registro de tipos de evento al crear, editar o borrar uno."""
+    event_type_registry.invalidate()
+    # Si el cambio ocurre dentro de una transacción, otro hilo pudo recargar
+    # el registro antes del commit con los datos anteriores
+    transaction.on_commit(event_type_registry.invalidate)
+
+
+@receiver(pre_delete, sender=Field)
+def record_deleted_field_tombstones(sender, instance, using, **kwargs):
+    """
+    Registra los borrados de los eventos de un campo que se va a borrar.
+
+    Los eventos se borran en cascada sin pasar por `Event.delete()`; los
+    conteos diarios del campo también se borran en cascada. No hay señales por
+    evento, de modo que Django borra los eventos en bloque.
+    """
+    event_ids = Event.objects.using(using).filter(field_id=instance.pk).values_list('pk', flat=True)
+    EventTombstone.record([(event_id, instance.pk) for event_id in event_ids], using)
+
+
+@receiver(pre_delete, sender=Campaign)
+def detach_deleted_campaign_counts(sender, instance, using, **kwargs):
+    """Pasa a "sin campaña" los conteos de una campaña que se va a borrar."""
+    detach_campaign_counts(instance.pk, using)
+
+
+@receiver(pre_delete, sender=Campaign)
+def touch_deleted_campaign_events(sender, instance, using, **kwargs):
+    """
+    Marca como modificados los eventos de una campaña que se va a borrar.
+
+    `SET_NULL` se aplica con un UPDATE que no actualiza `updated_at`; sin esto
+    la exportación incremental no vería el cambio de campaña.
+    """
+    Event.objects.using(using).filter(campaign_id=instance.pk).update(updated_at=timezone.now())
@@ -0,0 +1,153 @@
+"""
+Validación de datos de eventos por tipo.
+
+Cada tipo de evento tiene un pipeline de validación que se construye una sola
+vez y se reutiliza: el serializer específico (con sus campos ya generados a
+partir del modelo) valida cada payload en una sola pasada y resuelve las
+relaciones contra objetos ya cargados, sin repetir consultas.
+"""
+import threading
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+from apps.catalogs.models import Field, Campaign
+from .models import EventType
+from .registry import event_type_registry
+
+
+class PrefetchedRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Relación por PK que se resuelve contra objetos precargados.
+
+    Busca en `context['related_cache'][model]` en lugar de hacer un `get()`
+    por payload.
+    """
+
+    def to_internal_value(self, data):
+        model = self.queryset.model
+        try:
+            pk = model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        instance = self.context['related_cache'].get(model, {}).get(pk)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+
+def to_pk(model, value):
+    """Convierte `value` al tipo del PK de `model` (None si no es válido)."""
+    try:
+        return model._meta.pk.to_python(value)
+    except (DjangoValidationError, TypeError, ValueError):
+        return None
+
+
+def prefetch_related_objects(model, values):
+    """
+    Carga en una consulta los objetos de `model` cuyos PK aparecen en `values`.
+
+    Returns:
+        dict: Objetos indexados por PK
+    """
+    pks = {to_pk(model, value) for value in values}
+    pks.discard(None)
+    return model.objects.in_bulk(pks) if pks else {}
+
+
+def build_related_cache(payloads, event_types=None):
+    """
+    Precarga las relaciones referenciadas por una lista de payloads.
+
+    Args:
+        payloads: Lista de diccionarios con datos de eventos
+        event_types: Tipos de evento a incluir (por defecto todos los del registro)
+
+    Returns:
+        dict: {modelo: {pk: instancia}} para EventType, Field y Campaign
+    """
+    if event_types is None:
+        event_types = event_type_registry.event_types()
+    return {
+        EventType: {event_type.pk: event_type for event_type in event_types},
+        Field: prefetch_related_objects(Field, [p.get('field') for p in payloads]),
+        Campaign: prefetch_related_objects(Campaign, [p.get('campaign') for p in payloads]),
+    }
+
+
+class EventValidationPipeline:
+    """
+    Pipeline de validación para un tipo de evento.
+
+    Deriva del serializer específico una versión cuyas relaciones usan
+    `PrefetchedRelatedField` y cuyo `created_by` es de solo lectura (se asigna
+    al guardar). La instancia del serializer se crea una vez por hilo y se
+    reutiliza en cada validación.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.validation_class = type(
+            f'Validation{serializer_class.__name__}',
+            (serializer_class,),
+            {
+                'event_type': PrefetchedRelatedField(queryset=EventType.objects.all()),
+                'field': PrefetchedRelatedField(queryset=Field.objects.all()),
+                'campaign': PrefetchedRelatedField(
+                    queryset=Campaign.objects.all(), required=False, allow_null=True
+                ),
+                'created_by': serializers.PrimaryKeyRelatedField(read_only=True),
+            },
+        )
+        self._local = threading.local()
+
+    def _get_serializer(self):
+        serializer = getattr(self._local, 'serializer', None)
+        if serializer is None:
+            serializer = self.validation_class(context={})
+            self._local.serializer = serializer
+        return serializer
+
+    def validate(self, data, related_cache):
+        """
+        Valida un payload.
+
+        Args:
+            data: Datos del evento
+            related_cache: Objetos relacionados precargados (ver `build_related_cache`)
+
+        Returns:
+            dict: Datos validados
+
+        Raises:
+            serializers.ValidationError: Con los errores por campo
+        """
+        serializer = self._get_serializer()
+        serializer._context = {'related_cache': related_cache}
+        try:
+            return serializer.run_validation(data)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError(serializers.as_serializer_error(exc))
+
+
+_PIPELINES = {}
+_PIPELINES_LOCK = threading.Lock()
+
+
+def get_validation_pipeline(serializer_class):
+    """
+    Obtiene (creándolo la primera vez) el pipeline de un serializer de evento.
+
+    Args:
+        serializer_class: Serializer específico del tipo de evento
+
+    Returns:
+        EventValidationPipeline
+    """
+    pipeline = _PIPELINES.get(serializer_class)
+    if pipeline is None:
+        with _PIPELINES_LOCK:
+            pipeline = _PIPELINES.setdefault(serializer_class, EventValidationPipeline(serializer_class))
+    return pipeline
@@ -1,20 +1,26 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiResponse
 from drf_spectacular.types import OpenApiTypes
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.utils import timezone
 from django.db import transaction
 from datetime import datetime, timedelta
 import pytz
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from .models import Event, EventType, Attachment
 from apps.catalogs.models import Field, Campaign
-from .forms import get_event_form, EVENT_FORM_MAP
-from .event_models import get_event_model, EVENT_TYPE_MODEL_MAP
+from .forms import EVENT_FORM_MAP
+from .event_models import get_typed_event, get_typed_events
+from .registry import event_type_registry
+from .rollups import count_events
+from .bulk import BulkEventIngestor, MAX_BULK_EVENTS
+from .parsers import NDJSONParser
+from .pagination import EventCursorPagination, paginate_keyset, parse_count_param, build_cursor_query
 from .serializers import (
     EventSerializer, 
     EventListSerializer, 
@@ -68,6 +74,13 @@ from .serializers import (
             description='Fecha final para filtrar eventos (formato: YYYY-MM-DD)',
             required=False,
         ),
+        OpenApiParameter(
+            name='expand',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description='Usar "details" para incluir los campos específicos de cada tipo de evento',
+            required=False,
+        ),
     ],
     responses={
         200: EventListSerializer(many=True),
@@ -97,11 +110,31 @@ class EventListView(generics.ListAPIView):
     API endpoint para listar eventos de trazabilidad.
     
     Permite filtrar por tipo de evento y rango de fechas mediante query parameters.
+    Pagina por cursor sobre `(timestamp, id)`.
+    
+    Con `?expand=details` los eventos de la página se cargan desde sus tablas
+    específicas (una consulta por tipo de evento presente en la página).
     """
     serializer_class = EventListSerializer
+    pagination_class = EventCursorPagination
+    
+    def expand_details(self):
+        expand = self.request.query_params.get('expand', '')
+        return 'details' in [part.strip() for part in expand.split(',')]
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand_details'] = self.expand_details()
+        return context
+    
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.expand_details():
+            page = get_typed_events(page, related_fields=('event_type', 'field'))
+        return page
     
     def get_queryset(self):
-        queryset = Event.objects.all().select_related('event_type').order_by('-timestamp')
+        queryset = Event.objects.all().select_related('event_type', 'field').order_by('-timestamp')
         
         # Filtrar por tipo de evento
         event_type = self.request.query_params.get('event_type')
@@ -401,26 +434,108 @@ class EventCreateView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Obtener el tipo de evento y determinar el modelo específico
-        event_type = serializer.validated_data['event_type']
-        model_class = get_event_model(event_type.name)
-        serializer_class = get_event_serializer(event_type.name)
+        # El serializer ya resolvió el modelo y el serializer específicos
+        event = serializer.save(created_by=request.user if request.user.is_authenticated else None)
+        response_serializer = serializer.event_serializer_class(event)
         
-        # Si hay un serializer específico, usarlo
-        if serializer_class != EventSerializer:
-            specific_serializer = serializer_class(data=request.data)
-            specific_serializer.is_valid(raise_exception=True)
-            event = specific_serializer.save(
-                event_type=event_type,
-                created_by=request.user if request.user.is_authenticated else None
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(
+    summary="Carga Masiva de Eventos",
+    description="""
+    Crea muchos eventos de distintos tipos en una sola petición.
+    
+    Acepta un arreglo JSON (`application/json`) o NDJSON (`application/x-ndjson`,
+    un evento por línea). Cada evento usa el mismo formato que `POST /api/v1/events/create/`.
+    
+    **Procesamiento:**
+    - Todas las filas se validan en una sola pasada
+    - Las filas válidas se agrupan por tipo de evento y se insertan en lote
+    - Las filas inválidas no detienen la carga; se reportan con sus errores
+    
+    **Respuesta:** reporte por fila con `index`, `status` (`created` o `error`) y
+    el `id` creado o los `errors` de validación.
+    - 201: todas las filas se crearon
+    - 207: algunas filas tuvieron errores
+    - 400: ninguna fila se pudo crear
+    """,
+    tags=['Eventos de Trazabilidad'],
+    request={
+        'application/json': {'type': 'array', 'items': {'type': 'object'}},
+        'application/x-ndjson': {'type': 'string'},
+    },
+    responses={
+        201: OpenApiTypes.OBJECT,
+        207: OpenApiTypes.OBJECT,
+        400: OpenApiResponse(description="Cuerpo inválido o ninguna fila válida"),
+    },
+    examples=[
+        OpenApiExample(
+            'Reporte de carga',
+            summary='Carga con una fila inválida',
+            value={
+                'total': 2,
+                'created': 1,
+                'failed': 1,
+                'results': [
+                    {'index': 0, 'status': 'created', 'id': '550e8400-e29b-41d4-a716-446655440010'},
+                    {'index': 1, 'status': 'error', 'errors': {'duracion_minutos': ['Este campo es requerido.']}},
+                ],
+            },
+            response_only=True,
+        ),
+    ],
+)
+class EventBulkCreateView(APIView):
+    """
+    API endpoint para carga masiva de eventos de tipos mezclados.
+    """
+    parser_classes = [JSONParser, NDJSONParser]
+    
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'error': 'Se esperaba un arreglo JSON o NDJSON con eventos.'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            response_serializer = serializer_class(event)
+        if len(rows) > MAX_BULK_EVENTS:
+            return Response(
+                {'error': f'Se permiten como máximo {MAX_BULK_EVENTS} eventos por petición.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        user = request.user if request.user.is_authenticated else None
+        report = BulkEventIngestor(user=user).ingest(rows)
+        
+        if report['failed'] == 0:
+            response_status = status.HTTP_201_CREATED
+        elif report['created'] > 0:
+            response_status = status.HTTP_207_MULTI_STATUS
         else:
-            # Fallback al serializer base
-            event = serializer.save(created_by=request.user if request.user.is_authenticated else None)
-            response_serializer = EventSerializer(event)
+            response_status = status.HTTP_400_BAD_REQUEST
         
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(report, status=response_status)
+
+
+class TypedEventObjectMixin:
+    """
+    Obtiene el evento como instancia de su modelo específico.
+    
+    Resuelve el modelo concreto con `get_typed_event` y guarda el resultado,
+    ya que `get_serializer_class` y el método de la vista llaman a
+    `get_object` por separado.
+    """
+    
+    def get_object(self):
+        if not hasattr(self, '_typed_event'):
+            try:
+                self._typed_event = get_typed_event(self.kwargs[self.lookup_field])
+            except Event.DoesNotExist:
+                raise Http404("Evento no encontrado")
+            self.check_object_permissions(self.request, self._typed_event)
+        return self._typed_event
 
 
 @extend_schema(
@@ -472,7 +587,7 @@ class EventCreateView(generics.CreateAPIView):
         ),
     ],
 )
-class EventDetailView(generics.RetrieveAPIView):
+class EventDetailView(TypedEventObjectMixin, generics.RetrieveAPIView):
     """
     API endpoint para obtener el detalle de un evento específico.
     """
@@ -526,7 +641,7 @@ class EventDetailView(generics.RetrieveAPIView):
         ),
     ],
 )
-class EventUpdateView(generics.UpdateAPIView):
+class EventUpdateView(TypedEventObjectMixin, generics.UpdateAPIView):
     """
     API endpoint para actualizar eventos.
     Soporta PUT (actualización completa) y PATCH (actualización parcial).
@@ -708,10 +823,16 @@ def event_list_view(request):
     if date_to:
         events_list = events_list.filter(timestamp__lte=date_to)
     
-    # Paginación
-    paginator = Paginator(events_list, 20)
-    page_number = request.GET.get('page')
-    events = paginator.get_page(page_number)
+    # Paginación por cursor (el total exacto se puede omitir con ?count=0)
+    try:
+        events = paginate_keyset(
+            events_list,
+            cursor=request.GET.get('cursor'),
+            page_size=20,
+            with_count=parse_count_param(request.GET.get('count')),
+        )
+    except ValueError:
+        events = paginate_keyset(events_list, page_size=20)
     
     # Datos para filtros
     event_types = EventType.objects.filter(is_active=True).order_by('category', 'name')
@@ -729,8 +850,10 @@ def event_list_view(request):
         'selected_campaign': campaign_id,
         'date_from': date_from,
         'date_to': date_to,
-        # Contar eventos con filtros aplicados (no todos los eventos)
-        'total_count': events_list.count(),
+        # Total de eventos con filtros aplicados (None si se omitió el conteo)
+        'total_count': events.total_count,
+        'next_query': build_cursor_query(request.GET, events.next_cursor) if events.has_next else '',
+        'previous_query': build_cursor_query(request.GET, events.previous_cursor) if events.has_previous else '',
     }
     return render(request, 'events/event_list.html', context)
 
@@ -743,8 +866,11 @@ def event_create_view(request):
     form = None
     
     if event_type_id:
-        event_type = get_object_or_404(EventType, pk=event_type_id, is_active=True)
-        FormClass = get_event_form(event_type.name)
+        entry = event_type_registry.get(event_type_id)
+        if entry is None or not entry.event_type.is_active:
+            raise Http404("Tipo de evento no encontrado")
+        event_type = entry.event_type
+        FormClass = entry.form_class
         
         if not FormClass:
             messages.error(request, f'No se encontró formulario para el tipo de evento: {event_type.name}')
@@ -788,7 +914,7 @@ def event_create_view(request):
             messages.error(request, 'Debe seleccionar un tipo de evento.')
     
     # GET request o error - mostrar formulario o selector
-    event_types = EventType.objects.filter(is_active=True).order_by('category', 'name')
+    event_types = event_type_registry.event_types('category', 'name', active_only=True)
     fields = Field.objects.filter(is_active=True).order_by('name')
     campaigns = Campaign.objects.filter(is_active=True).order_by('-start_date')
     
@@ -806,21 +932,11 @@ def event_create_view(request):
 @login_required
 def event_detail_view(request, pk):
     """Vista de detalle de un evento."""
-    # Intentar obtener el evento específico primero
-    event = None
-    for model_class in EVENT_TYPE_MODEL_MAP.values():
-        try:
-            event = model_class.objects.select_related('event_type', 'field', 'campaign', 'created_by').get(pk=pk)
-            break
-        except model_class.DoesNotExist:
-            continue
-    
-    # Si no se encontró en modelos específicos, buscar en Event base
-    if event is None:
-        event = get_object_or_404(
-            Event.objects.select_related('event_type', 'field', 'campaign', 'created_by'),
-            pk=pk
-        )
+    # Cargar el evento directamente desde la tabla de su modelo específico
+    try:
+        event = get_typed_event(pk)
+    except Event.DoesNotExist:
+        raise Http404("Evento no encontrado")
     
     # Obtener adjuntos del evento
     attachments = Attachment.objects.filter(event_id=pk).order_by('-uploaded_at')
@@ -835,11 +951,14 @@ def event_detail_view(request, pk):
 @login_required
 def get_event_type_info(request, pk):
     """API auxiliar para obtener información de un tipo de evento."""
-    event_type = get_object_or_404(EventType, pk=pk)
+    entry = event_type_registry.get(pk)
+    if entry is None:
+        raise Http404("Tipo de evento no encontrado")
     
-    # Obtener el modelo específico asociado
-    model_class = get_event_model(event_type.name)
-    form_class = get_event_form(event_type.name)
+    # Modelo y formulario específicos asociados
+    event_type = entry.event_type
+    model_class = entry.model
+    form_class = entry.form_class
     
     return JsonResponse({
         'id': event_type.id,
@@ -861,9 +980,10 @@ def event_type_list_view(request):
     """Vista para listar tipos de eventos."""
     event_types = EventType.objects.all().order_by('category', 'name')
     
-    # Contar eventos por tipo
+    # Contar eventos por tipo (tabla de conteos diarios, una sola consulta)
+    counts = count_events(group_by=('event_type',))
     for et in event_types:
-        et.event_count = et.events.count()
+        et.event_count = counts.get(et.pk, 0)
     
     context = {
         'event_types': event_types,
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .jobs import delete_report_jobs
+from .models import ReportJob
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('report_type', 'format', 'status', 'progress', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'report_type', 'format', 'created_at')
+    search_fields = ('filename', 'created_by__username')
+    readonly_fields = (
+        'id', 'report_type', 'format', 'parameters', 'status', 'progress', 'file', 'filename',
+        'content_type', 'error', 'created_by', 'created_at', 'started_at', 'finished_at'
+    )
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def delete_model(self, request, obj):
+        delete_report_jobs(ReportJob.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_report_jobs(queryset)
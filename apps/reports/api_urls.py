@@ -6,7 +6,14 @@ from .views import (
     HealthCheckView,
     ReportTypesListView,
     FieldTraceabilityReportView,
-    CampaignTraceabilityReportView
+    CampaignTraceabilityReportView,
+    EventDeltaExportView,
+    PHIComplianceView,
+    ReportJobListView,
+    ReportJobDetailView,
+    ReportJobDownloadView,
+    ReportCacheStatsView,
+    ReportRendererStatsView
 )
 
 urlpatterns = [
@@ -19,4 +26,21 @@ urlpatterns = [
     # Generación de reportes
     path('field-traceability/', FieldTraceabilityReportView.as_view(), name='field-traceability-report'),
     path('campaign-traceability/', CampaignTraceabilityReportView.as_view(), name='campaign-traceability-report'),
+    
+    # Exportación incremental
+    path('events/delta/', EventDeltaExportView.as_view(), name='event-delta-export'),
+    
+    # Cumplimiento de intervalos de seguridad
+    path('compliance/phi/', PHIComplianceView.as_view(), name='phi-compliance'),
+    
+    # Trabajos en segundo plano
+    path('jobs/', ReportJobListView.as_view(), name='report-job-list'),
+    path('jobs/<uuid:pk>/', ReportJobDetailView.as_view(), name='report-job-detail'),
+    path('jobs/<uuid:pk>/download/', ReportJobDownloadView.as_view(), name='report-job-download'),
+    
+    # Caché de reportes PDF
+    path('cache/', ReportCacheStatsView.as_view(), name='report-cache-stats'),
+    
+    # Métricas del renderizador PDF
+    path('renderer/', ReportRendererStatsView.as_view(), name='report-renderer-stats'),
 ]
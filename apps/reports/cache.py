@@ -0,0 +1,345 @@
+"""
+Caché en disco de reportes PDF.
+
+Cada PDF se guarda con el nombre del hash SHA-256 de sus parámetros y de una
+"marca de datos" (último `updated_at` y número de eventos, adjuntos y demás
+registros que incluye el reporte, como las aplicaciones fitosanitarias del
+cumplimiento de intervalos). Si ningún dato del reporte cambió, la clave es la misma y
+el PDF se sirve desde disco sin volver a ejecutar WeasyPrint; cualquier alta,
+modificación o borrado produce una clave nueva.
+
+Al superar `REPORT_CACHE_MAX_BYTES` se eliminan los archivos usados hace más
+tiempo (LRU según la fecha de modificación, que se actualiza en cada acierto).
+La escritura es atómica (archivo temporal + `os.replace`), por lo que varios
+procesos pueden compartir el directorio.
+
+Peticiones idénticas simultáneas (misma clave) generan el PDF una sola vez: el
+primer proceso crea un archivo `<clave>.lock` junto al PDF y lo genera; los
+demás esperan a que el PDF aparezca en la caché y lo leen de ahí. Si quien
+genera falla, el siguiente en espera toma el lock y lo intenta. Un lock con más
+de `REPORT_RENDER_LOCK_TIMEOUT` segundos se considera abandonado (proceso
+terminado) y se elimina, comprobando antes que sea el mismo archivo y no uno
+nuevo creado por otro proceso.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from io import BytesIO
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Intervalo con el que las peticiones en espera revisan si el PDF ya está en caché
+LOCK_POLL_SECONDS = 0.25
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Valor no serializable en la clave de caché: {value!r}")
+
+
+def cache_key(kind, params, watermark):
+    """
+    Clave del reporte.
+
+    Args:
+        kind: Nombre del reporte (p. ej. 'field_traceability')
+        params: Parámetros del reporte (las listas se normalizan ordenadas)
+        watermark: Valores que cambian cuando cambian los datos del reporte
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    normalized = {
+        name: sorted(str(item) for item in value) if isinstance(value, (list, tuple, set)) else value
+        for name, value in params.items()
+    }
+    payload = json.dumps(
+        {'kind': kind, 'params': normalized, 'watermark': watermark},
+        sort_keys=True,
+        default=_json_default,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """
+    Caché de archivos direccionada por contenido con límite de tamaño.
+
+    Los contadores (`hits`, `misses`, `evictions`, `coalesced`) son del
+    proceso actual.
+    """
+
+    suffix = '.pdf'
+
+    def __init__(self, directory, max_bytes, lock_timeout=600):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock_timeout = lock_timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}{self.suffix}'
+
+    def _lock_path(self, key):
+        return self.directory / key[:2] / f'{key}.lock'
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            content = path.read_bytes()
+            os.utime(path)  # Marca el archivo como usado recientemente
+        except FileNotFoundError:
+            return None
+        return BytesIO(content)
+
+    def get(self, key):
+        """
+        Contenido guardado para la clave.
+
+        Returns:
+            BytesIO o None si no está en caché
+        """
+        content = self._read(key)
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return content
+
+    def set(self, key, content):
+        """Guarda el contenido y aplica el límite de tamaño."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        self.evict()
+
+    def get_or_render(self, key, render):
+        """
+        Retorna el reporte desde la caché o lo genera con `render()` y lo guarda.
+
+        Args:
+            key: Clave del reporte
+            render: Función sin argumentos que retorna un BytesIO
+
+        Returns:
+            BytesIO posicionado al inicio
+        """
+        if not self.enabled:
+            return render()
+
+        cached = self.get(key)
+        if cached is not None:
+            logger.info("Reporte servido desde caché (%s)", key[:12])
+            return cached
+
+        lock_path = self._lock_path(key)
+        deadline = time.monotonic() + self.lock_timeout
+        lock = self._acquire_render_lock(lock_path)
+        while lock is None:
+            # Otro proceso genera el mismo reporte: se espera su resultado
+            time.sleep(LOCK_POLL_SECONDS)
+            cached = self._read(key)
+            if cached is not None:
+                with self._lock:
+                    self.coalesced += 1
+                logger.info("Reporte generado por otra petición (%s)", key[:12])
+                return cached
+            if time.monotonic() > deadline:
+                logger.warning("Tiempo de espera agotado para el reporte %s; se genera sin lock", key[:12])
+                return self._render_and_store(key, render)
+            lock = self._acquire_render_lock(lock_path)
+
+        try:
+            # Pudo terminarse entre la consulta inicial y la toma del lock
+            cached = self._read(key)
+            if cached is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return cached
+            return self._render_and_store(key, render)
+        finally:
+            self._remove_lock(lock_path, lock)
+
+    def _render_and_store(self, key, render):
+        buffer = render()
+        try:
+            self.set(key, buffer.getvalue())
+        except OSError:
+            # Un error de disco no debe impedir entregar el reporte
+            logger.exception("No se pudo guardar el reporte en caché")
+        buffer.seek(0)
+        return buffer
+
+    def _acquire_render_lock(self, lock_path):
+        """
+        Crea el archivo de lock de una clave; `O_EXCL` garantiza que solo un
+        proceso lo logra. Elimina el lock si quedó abandonado.
+
+        Returns:
+            os.stat_result: Identidad del lock tomado (para liberarlo), o None
+                si lo tiene otro proceso
+        """
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                current = lock_path.stat()
+            except FileNotFoundError:
+                return None  # Se liberó; se reintenta en la siguiente vuelta
+            if time.time() - current.st_mtime > self.lock_timeout:
+                if self._remove_lock(lock_path, current):
+                    logger.warning("Lock abandonado eliminado: %s", lock_path.name)
+            return None
+        with os.fdopen(fd, 'w') as lock_file:
+            lock_file.write(str(os.getpid()))
+            lock_file.flush()
+            return os.fstat(lock_file.fileno())
+
+    def _remove_lock(self, lock_path, expected):
+        """
+        Elimina el lock solo si sigue siendo el archivo `expected`.
+
+        Entre consultar el lock y eliminarlo, otro proceso pudo eliminarlo y
+        crear uno nuevo; borrarlo por ruta eliminaría ese lock nuevo. Por eso
+        el lock se mueve primero a un nombre único (`os.rename` es atómico y
+        solo un proceso lo logra) y se compara su inodo y fecha de
+        modificación con los de `expected`. Si es otro archivo se restaura con
+        `os.link`, que no reemplaza un lock creado mientras tanto.
+
+        Args:
+            lock_path: Ruta del lock
+            expected: `os.stat_result` del lock que se quiere eliminar
+
+        Returns:
+            bool: True si se eliminó el lock
+        """
+        claimed = lock_path.with_name(f'{lock_path.name}.{uuid4().hex}')
+        try:
+            os.rename(lock_path, claimed)
+        except FileNotFoundError:
+            return False  # Ya lo eliminó otro proceso
+        try:
+            current = claimed.stat()
+            if (current.st_ino, current.st_mtime_ns) == (expected.st_ino, expected.st_mtime_ns):
+                return True
+            try:
+                os.link(claimed, lock_path)
+            except FileExistsError:
+                pass
+            return False
+        finally:
+            claimed.unlink(missing_ok=True)
+
+    def _entries(self):
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob(f'*/*{self.suffix}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """
+        Elimina los archivos menos usados hasta quedar dentro del límite.
+
+        Returns:
+            int: Archivos eliminados
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        if removed:
+            with self._lock:
+                self.evictions += removed
+        return removed
+
+    def clear(self):
+        """
+        Elimina todos los archivos de la caché.
+
+        Returns:
+            int: Archivos eliminados
+        """
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self):
+        """
+        Estadísticas de la caché.
+
+        Returns:
+            dict: Aciertos, fallos y peticiones que esperaron el PDF de otra
+                (`coalesced`) en el proceso, archivos y bytes en disco
+        """
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+            'coalesced': self.coalesced,
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
+
+
+pdf_report_cache = ReportCache(
+    settings.REPORT_CACHE_DIR, settings.REPORT_CACHE_MAX_BYTES, settings.REPORT_RENDER_LOCK_TIMEOUT
+)
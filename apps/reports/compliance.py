@@ -0,0 +1,219 @@
+"""
+Cumplimiento de intervalos de seguridad (plazo de seguridad precosecha).
+
+Una aplicación fitosanitaria con `intervalo_seguridad_dias = N` hecha el día D
+impide cosechar el lote desde D hasta D + N - 1; se puede cosechar a partir de
+D + N. Una cosecha ocupa desde `fecha_inicio` hasta `fecha_fin` (o el día de
+su `timestamp` si no tienen fecha). Hay incumplimiento cuando algún día de
+cosecha cae dentro del plazo de una aplicación del mismo lote.
+
+`phi_compliance()` lee aplicaciones y cosechas con una consulta cada una y las
+cruza por lote con un barrido ordenado por fecha (O(n log n) más el número de
+incumplimientos), sin consultas por cosecha. Las aplicaciones se toman del
+lote sin importar la campaña: una aplicación al final de una campaña puede
+afectar la primera cosecha de la siguiente.
+"""
+import heapq
+from datetime import timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.events.models import Event, HarvestEvent, PhytosanitaryEvent
+
+
+def _local_date(timestamp):
+    return timezone.localtime(timestamp).date()
+
+
+def _overlaps(harvests, applications):
+    """
+    Pares (cosecha, aplicación) de un lote cuyos intervalos se superponen.
+
+    Args:
+        harvests: Lista de (inicio, fin, cosecha)
+        applications: Lista de (inicio, fin, aplicación); fin es el último día
+            en que no se puede cosechar
+
+    Yields:
+        tuple: (cosecha, aplicación)
+    """
+    # Se recorren los intervalos por fecha de inicio; cada intervalo que empieza
+    # se cruza con los del otro tipo que siguen abiertos, de modo que cada par
+    # se reporta una sola vez.
+    intervals = sorted(
+        [(start, 0, end, index, item) for index, (start, end, item) in enumerate(harvests)]
+        + [(start, 1, end, index, item) for index, (start, end, item) in enumerate(applications)],
+        key=lambda interval: interval[:2],
+    )
+    active = ({}, {})  # por tipo: índice -> elemento abierto
+    expiry = ([], [])  # por tipo: heap de (fin, índice)
+    for start, kind, end, index, item in intervals:
+        for open_kind in (0, 1):
+            while expiry[open_kind] and expiry[open_kind][0][0] < start:
+                _, closed = heapq.heappop(expiry[open_kind])
+                del active[open_kind][closed]
+        for open_item in active[1 - kind].values():
+            yield (item, open_item) if kind == 0 else (open_item, item)
+        active[kind][index] = item
+        heapq.heappush(expiry[kind], (end, index))
+
+
+def phi_compliance(field_id=None, campaign_id=None, field_ids=None, date_from=None, date_to=None):
+    """
+    Verifica que ninguna cosecha caiga dentro del intervalo de seguridad de
+    una aplicación fitosanitaria.
+
+    Args:
+        field_id: ID del lote (opcional)
+        campaign_id: ID de la campaña de las cosechas (opcional)
+        field_ids: Lista de IDs de lotes (opcional)
+        date_from: Fecha de inicio de las cosechas (opcional)
+        date_to: Fecha de fin de cosechas y aplicaciones (opcional)
+
+    Returns:
+        dict: {
+            'compliant': True si no hay incumplimientos,
+            'total_harvests', 'non_compliant_harvests', 'total_applications',
+            'applications_without_interval': aplicaciones sin intervalo registrado,
+            'violations': [{cosecha, aplicación, 'safe_from', 'days_early'}, ...]
+                ordenadas por lote y fecha de cosecha,
+            'by_field': [{'field_id', 'field_name', 'harvests', 'non_compliant_harvests',
+                'applications', 'violations', 'safe_harvest_from'}, ...],
+            'by_campaign': [{'campaign_id', 'campaign_name', 'harvests',
+                'non_compliant_harvests', 'violations'}, ...],
+        }
+    """
+    harvest_query = HarvestEvent.objects.all()
+    application_query = PhytosanitaryEvent.objects.all()
+    if field_id:
+        harvest_query = harvest_query.filter(field_id=field_id)
+        application_query = application_query.filter(field_id=field_id)
+    if field_ids:
+        harvest_query = harvest_query.filter(field_id__in=field_ids)
+        application_query = application_query.filter(field_id__in=field_ids)
+    if campaign_id:
+        harvest_query = harvest_query.filter(campaign_id=campaign_id)
+        # Todas las aplicaciones de los lotes de la campaña, de cualquier campaña
+        application_query = application_query.filter(
+            field_id__in=Event.objects.filter(campaign_id=campaign_id).order_by().values('field_id')
+        )
+    if date_from:
+        harvest_query = harvest_query.filter(timestamp__date__gte=date_from)
+        # Aplicaciones anteriores cuyo intervalo puede alcanzar el período
+        longest = application_query.aggregate(days=Max('intervalo_seguridad_dias'))['days'] or 0
+        application_query = application_query.filter(
+            timestamp__date__gte=date_from - timedelta(days=longest)
+        )
+    if date_to:
+        harvest_query = harvest_query.filter(timestamp__date__lte=date_to)
+        application_query = application_query.filter(timestamp__date__lte=date_to)
+
+    harvests_by_field = {}
+    field_names = {}
+    campaign_names = {}
+    for pk, harvest_field_id, field_name, harvest_campaign_id, campaign_name, timestamp, start, end, volume in (
+        harvest_query.order_by().values_list(
+            'pk', 'field_id', 'field__name', 'campaign_id', 'campaign__name',
+            'timestamp', 'fecha_inicio', 'fecha_fin', 'volumen_kg',
+        )
+    ):
+        start = start or _local_date(timestamp)
+        end = max(end or start, start)
+        harvest = {
+            'harvest_id': pk,
+            'field_id': harvest_field_id,
+            'campaign_id': harvest_campaign_id,
+            'harvest_start': start,
+            'harvest_end': end,
+            'volumen_kg': volume,
+        }
+        harvests_by_field.setdefault(harvest_field_id, []).append((start, end, harvest))
+        field_names[harvest_field_id] = field_name
+        campaign_names[harvest_campaign_id] = campaign_name
+
+    applications_by_field = {}
+    application_counts = {}
+    safe_from_by_field = {}
+    without_interval = 0
+    for pk, application_field_id, field_name, timestamp, product, ingredient, days in (
+        application_query.order_by().values_list(
+            'pk', 'field_id', 'field__name', 'timestamp',
+            'producto', 'ingrediente_activo', 'intervalo_seguridad_dias',
+        )
+    ):
+        field_names[application_field_id] = field_name
+        application_counts[application_field_id] = application_counts.get(application_field_id, 0) + 1
+        if days is None:
+            without_interval += 1
+            continue
+        applied = _local_date(timestamp)
+        safe_from = applied + timedelta(days=days)
+        safe_from_by_field[application_field_id] = max(
+            safe_from, safe_from_by_field.get(application_field_id, safe_from)
+        )
+        if days == 0:
+            continue
+        applications_by_field.setdefault(application_field_id, []).append((applied, safe_from - timedelta(days=1), {
+            'application_id': pk,
+            'application_date': applied,
+            'producto': product,
+            'ingrediente_activo': ingredient,
+            'intervalo_seguridad_dias': days,
+            'safe_from': safe_from,
+        }))
+
+    violations = []
+    for harvest_field_id, harvests in harvests_by_field.items():
+        for harvest, application in _overlaps(harvests, applications_by_field.get(harvest_field_id, [])):
+            violations.append({
+                **harvest,
+                'field_name': field_names[harvest_field_id],
+                'campaign_name': campaign_names[harvest['campaign_id']],
+                **application,
+                'days_early': (application['safe_from'] - harvest['harvest_start']).days,
+            })
+    violations.sort(key=lambda item: (item['field_name'], item['harvest_start'], item['application_date']))
+
+    by_field = {}
+    by_campaign = {}
+    for harvest_field_id in sorted(field_names, key=lambda pk: field_names[pk]):
+        harvests = harvests_by_field.get(harvest_field_id, [])
+        by_field[harvest_field_id] = {
+            'field_id': harvest_field_id,
+            'field_name': field_names[harvest_field_id],
+            'harvests': len(harvests),
+            'non_compliant_harvests': 0,
+            'applications': application_counts.get(harvest_field_id, 0),
+            'violations': 0,
+            'safe_harvest_from': safe_from_by_field.get(harvest_field_id),
+        }
+        for _, _, harvest in harvests:
+            summary = by_campaign.setdefault(harvest['campaign_id'], {
+                'campaign_id': harvest['campaign_id'],
+                'campaign_name': campaign_names[harvest['campaign_id']],
+                'harvests': 0,
+                'non_compliant_harvests': 0,
+                'violations': 0,
+            })
+            summary['harvests'] += 1
+
+    non_compliant = set()
+    for violation in violations:
+        by_field[violation['field_id']]['violations'] += 1
+        by_campaign[violation['campaign_id']]['violations'] += 1
+        if violation['harvest_id'] not in non_compliant:
+            non_compliant.add(violation['harvest_id'])
+            by_field[violation['field_id']]['non_compliant_harvests'] += 1
+            by_campaign[violation['campaign_id']]['non_compliant_harvests'] += 1
+
+    return {
+        'compliant': not violations,
+        'total_harvests': sum(len(harvests) for harvests in harvests_by_field.values()),
+        'non_compliant_harvests': len(non_compliant),
+        'total_applications': sum(application_counts.values()),
+        'applications_without_interval': without_interval,
+        'violations': violations,
+        'by_field': list(by_field.values()),
+        'by_campaign': sorted(by_campaign.values(), key=lambda item: item['campaign_name'] or ''),
+    }
@@ -0,0 +1,187 @@
+"""
+Exportación incremental de eventos.
+
+En lugar de descargar todos los eventos en cada sincronización, el cliente
+guarda el cursor de la respuesta anterior y pide solo lo que cambió desde
+entonces:
+
+- `events`: eventos creados o modificados, en orden `(updated_at, id)`.
+- `deleted`: eventos borrados (`EventTombstone`), en orden `(deleted_at, id)`.
+- `cursor`: posición hasta la que el cliente ya recibió todo; se envía como
+  `since` en la siguiente petición. Si `has_more` es verdadero hay más
+  cambios pendientes y se debe pedir de nuevo de inmediato.
+
+Solo se entregan cambios con más de `REPORT_DELTA_LAG_SECONDS` de antigüedad:
+`updated_at` se asigna al guardar y no al confirmar la transacción, de modo que
+un cambio reciente aún sin confirmar podría quedar detrás de un cursor ya
+entregado. Los borrados se conservan `EVENT_TOMBSTONE_RETENTION_DAYS` días; un
+cursor más antiguo ya no garantiza ver todos los borrados y se rechaza.
+
+Los cambios de nombre de lotes, campañas o tipos de evento no modifican los
+eventos y no aparecen en la exportación incremental.
+"""
+import base64
+import binascii
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.events.models import Event, EventTombstone
+from .generators import CSVExporter
+from .typed import typed_column_groups
+
+CURSOR_VERSION = 'd1'
+
+
+class CursorExpired(ValueError):
+    """El cursor es anterior a la retención de borrados."""
+
+
+def encode_delta_cursor(event_mark, tombstone_mark, issued_at):
+    """
+    Codifica la posición de la exportación incremental como cursor opaco.
+
+    Args:
+        event_mark: (updated_at, id) del último evento entregado, o None
+        tombstone_mark: (deleted_at, id) del último borrado entregado, o None
+        issued_at: Momento hasta el que se consultaron los cambios
+
+    Returns:
+        str: Cursor en base64 seguro para URLs
+    """
+    updated_at, event_id = event_mark or (None, None)
+    deleted_at, tombstone_id = tombstone_mark or (None, None)
+    raw = '|'.join([
+        CURSOR_VERSION,
+        updated_at.isoformat() if updated_at else '',
+        str(event_id) if event_id else '',
+        deleted_at.isoformat() if deleted_at else '',
+        str(tombstone_id) if tombstone_id else '',
+        issued_at.isoformat(),
+    ])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_delta_cursor(cursor):
+    """
+    Decodifica un cursor generado por `encode_delta_cursor`.
+
+    Returns:
+        tuple: (event_mark, tombstone_mark, issued_at)
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        version, updated_at, event_id, deleted_at, tombstone_id, issued_at = raw.split('|')
+        if version != CURSOR_VERSION:
+            raise ValueError(version)
+        event_mark = (parse_datetime(updated_at), uuid.UUID(event_id)) if updated_at else None
+        tombstone_mark = (parse_datetime(deleted_at), int(tombstone_id)) if deleted_at else None
+        issued_at = parse_datetime(issued_at)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+    marks = [mark[0] for mark in (event_mark, tombstone_mark) if mark is not None]
+    if issued_at is None or None in marks:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return event_mark, tombstone_mark, issued_at
+
+
+def _after(queryset, field, mark):
+    """Filas posteriores a `mark` en el orden `(field, id)`."""
+    if mark is None:
+        return queryset
+    value, pk = mark
+    return queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+
+
+class EventDeltaExporter(CSVExporter):
+    """
+    Eventos modificados y borrados desde un cursor.
+
+    Las filas de eventos tienen las columnas de la exportación CSV
+    (`event_columns()`) más `actualizado_el`.
+    """
+
+    def _delta_query(self, model, event_mark, horizon, limit):
+        query = _after(model.objects.filter(updated_at__lte=horizon), 'updated_at', event_mark)
+        query = query.order_by('updated_at', 'pk')
+        if model is Event:
+            return query[:limit]
+        # Solo las filas específicas de los eventos de la página
+        page = _after(Event.objects.filter(updated_at__lte=horizon), 'updated_at', event_mark)
+        return query.filter(pk__in=page.order_by('updated_at', 'pk').values('pk')[:limit])
+
+    def delta_columns(self, wide=False):
+        """Encabezados de las filas de eventos."""
+        columns = self.EVENT_COLUMNS + ['actualizado_el']
+        if wide:
+            for group in typed_column_groups():
+                columns += group.columns()
+        return columns
+
+    def export_delta(self, since=None, limit=1000, wide=False):
+        """
+        Cambios desde un cursor.
+
+        Args:
+            since: Cursor de la respuesta anterior (None para empezar desde el inicio)
+            limit: Máximo de eventos y de borrados por respuesta
+            wide: Incluye las columnas específicas de cada tipo de evento
+
+        Returns:
+            dict: {'events', 'deleted', 'cursor', 'has_more'}
+
+        Raises:
+            ValueError: Si el cursor no es válido
+            CursorExpired: Si el cursor es anterior a la retención de borrados
+        """
+        event_mark = tombstone_mark = None
+        now = timezone.now()
+        if since:
+            event_mark, tombstone_mark, issued_at = decode_delta_cursor(since)
+            if issued_at < now - timedelta(days=settings.EVENT_TOMBSTONE_RETENTION_DAYS):
+                raise CursorExpired("El cursor es anterior a la retención de borrados; se requiere una exportación completa")
+        horizon = now - timedelta(seconds=settings.REPORT_DELTA_LAG_SECONDS)
+
+        # Se pide un elemento extra para saber si hay más cambios pendientes
+        fetch = limit + 1
+        updated_at_index = len(self.EVENT_COLUMNS)
+        rows = list(self._rows(
+            lambda model: self._delta_query(model, event_mark, horizon, fetch),
+            self.EVENT_VALUES + ('updated_at',),
+            lambda row_values: self._format_event(row_values[:-1]) + (row_values[-1].isoformat(),),
+            typed_column_groups() if wide else None,
+        ))
+        events_more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            event_mark = (parse_datetime(rows[-1][updated_at_index]), uuid.UUID(rows[-1][0]))
+
+        tombstones = list(
+            _after(EventTombstone.objects.filter(deleted_at__lte=horizon), 'deleted_at', tombstone_mark)
+            .order_by('deleted_at', 'pk')
+            .values_list('pk', 'event_id', 'deleted_at')[:fetch]
+        )
+        deleted_more = len(tombstones) > limit
+        tombstones = tombstones[:limit]
+        if tombstones:
+            tombstone_mark = (tombstones[-1][2], tombstones[-1][0])
+
+        columns = self.delta_columns(wide)
+        return {
+            'events': [dict(zip(columns, row)) for row in rows],
+            'deleted': [
+                {'id': str(event_id), 'deleted_at': deleted_at.isoformat()}
+                for _, event_id, deleted_at in tombstones
+            ],
+            'cursor': encode_delta_cursor(event_mark, tombstone_mark, horizon),
+            'has_more': events_more or deleted_more,
+        }
+
@@ -1,22 +1,41 @@
 """
 Generadores de reportes en diferentes formatos.
 """
-from django.template.loader import render_to_string
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import chain
+from django.conf import settings
+from django.db.models import Count, Max, QuerySet
+from django.template.loader import get_template
 from django.utils import timezone
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
-from io import BytesIO
-from apps.events.models import Event, Attachment
+import csv
+import logging
+import os
+import tempfile
+from apps.events.models import Event, Attachment, PhytosanitaryEvent
+from apps.events.registry import event_type_registry
 from apps.catalogs.models import Field, Campaign
+from .cache import cache_key, pdf_report_cache
+from .compliance import phi_compliance
+from .parallel import render_sections, split_sections
+from .rendering import get_pdf_renderer, stylesheet_path
+from .stats import report_stats
+from .typed import merge_typed_rows, typed_column_groups
+
+logger = logging.getLogger(__name__)
 
 
 class PDFReportGenerator:
     """
     Generador de reportes en formato PDF usando WeasyPrint.
+    
+    La maquetación usa el renderizador del proceso (`rendering.py`), que
+    conserva fuentes, hojas de estilo y templates entre reportes.
     """
     
-    def __init__(self):
-        self.font_config = FontConfiguration()
+    def __init__(self, use_cache=True):
+        self.renderer = get_pdf_renderer()
+        self.use_cache = use_cache
     
     def generate_traceability_report(self, field_id, date_from=None, date_to=None, 
                                     campaign_id=None, event_types=None):
@@ -64,8 +83,25 @@ class PDFReportGenerator:
             except Campaign.DoesNotExist:
                 pass
         
+        params = {
+            'field_id': field_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'campaign_id': campaign_id,
+            'event_types': event_types or [],
+        }
+        return self._cached_pdf(
+            'field_traceability', params, events, 'reports/pdf/traceability_report.html',
+            [field, campaign],
+            lambda data_as_of: self._render_traceability_report(field, campaign, events, params, data_as_of),
+        )
+    
+    def _render_traceability_report(self, field, campaign, events, params, data_as_of):
+        date_from = params['date_from']
+        date_to = params['date_to']
+        
         # Calcular estadísticas
-        stats = self._calculate_stats(events)
+        stats = report_stats(**params)
         
         # Obtener adjuntos
         event_ids = [e.id for e in events]
@@ -81,48 +117,120 @@ class PDFReportGenerator:
             'stats': stats,
             'attachments': attachments,
             'total_attachments': attachments.count(),
-            'generated_at': timezone.now(),
+            'data_as_of': data_as_of,
             'report_title': f'Reporte de Trazabilidad - {field.name}',
         }
         
-        # Renderizar template HTML
-        html_string = render_to_string('reports/pdf/traceability_report.html', context)
-        
-        # Generar PDF
-        html = HTML(string=html_string)
-        pdf_buffer = BytesIO()
-        html.write_pdf(pdf_buffer, font_config=self.font_config)
-        pdf_buffer.seek(0)
-        
-        return pdf_buffer
+        return self.renderer.render('reports/pdf/traceability_report.html', context)
     
-    def _calculate_stats(self, events):
+    def _data_watermark(self, events, template_name, objects):
         """
-        Calcula estadísticas del conjunto de eventos.
+        Valores que cambian cuando cambia cualquier dato incluido en el reporte.
         
         Args:
-            events: QuerySet de eventos
+            events: QuerySet de eventos del reporte
+            template_name: Template del reporte (se incluye la fecha de modificación
+                del template y de su hoja de estilos)
+            objects: Instancias (se usa su `updated_at`) o QuerySets (se usan su
+                `updated_at` más reciente y su número de filas, para detectar
+                borrados)
             
         Returns:
-            dict: Estadísticas calculadas
+            dict: Marca de datos para la clave de caché
+        """
+        event_ids = events.order_by().values('pk')
+        event_marks = events.order_by().aggregate(last_update=Max('updated_at'), total=Count('pk'))
+        attachment_marks = Attachment.objects.filter(event_id__in=event_ids).aggregate(
+            last_upload=Max('uploaded_at'), total=Count('pk')
+        )
+        return {
+            'events': [event_marks['last_update'], event_marks['total']],
+            'attachments': [attachment_marks['last_upload'], attachment_marks['total']],
+            'objects': [
+                self._queryset_marks(obj) if isinstance(obj, QuerySet) else getattr(obj, 'updated_at', None)
+                for obj in objects
+            ],
+            'event_types': max(
+                (entry.event_type.updated_at for entry in event_type_registry.entries()), default=None
+            ),
+            'template': [
+                os.path.getmtime(path)
+                for path in (get_template(template_name).origin.name, stylesheet_path(template_name))
+                if path
+            ],
+        }
+    
+    @staticmethod
+    def _queryset_marks(queryset):
+        marks = queryset.order_by().aggregate(last_update=Max('updated_at'), total=Count('pk'))
+        return [marks['last_update'], marks['total']]
+    
+    @staticmethod
+    def _data_as_of(watermark):
+        """Último cambio en los datos del reporte (eventos, adjuntos, lote/campaña)."""
+        marks = [watermark['events'][0], watermark['attachments'][0]] + [
+            mark[0] if isinstance(mark, list) else mark for mark in watermark['objects']
+        ]
+        return max((mark for mark in marks if mark is not None), default=None)
+    
+    def _cached_pdf(self, kind, params, events, template_name, objects, render):
         """
-        from collections import Counter
+        Retorna el PDF desde la caché en disco o lo genera con `render(data_as_of)`.
         
-        # Contar eventos por tipo
-        event_type_counts = Counter()
-        for event in events:
-            event_type_counts[event.event_type.name] += 1
+        El PDF no incluye la hora en que se generó (una copia de la caché puede
+        tener días) sino `data_as_of`, la fecha del último cambio en sus datos,
+        que es la misma para cualquier PDF con la misma clave.
         
-        stats = {
-            'total': events.count(),
-            'by_type': dict(event_type_counts),
-        }
+        Returns:
+            BytesIO: Buffer con el PDF
+        """
+        watermark = self._data_watermark(events, template_name, objects)
+        data_as_of = self._data_as_of(watermark)
+        if not (self.use_cache and pdf_report_cache.enabled):
+            return render(data_as_of)
+        key = cache_key(kind, params, watermark)
+        return pdf_report_cache.get_or_render(key, lambda: render(data_as_of))
+    
+    def _use_sections(self, field_stats, total_events):
+        """Indica si el reporte de campaña se genera por secciones en paralelo."""
+        return (
+            settings.REPORT_PDF_WORKERS > 1
+            and len(field_stats) > 1
+            and total_events >= settings.REPORT_PDF_PARALLEL_MIN_EVENTS
+        )
+    
+    def _render_campaign_sections(self, context):
+        """
+        Genera el reporte de campaña dividiendo los lotes en secciones que se
+        maquetan en paralelo (ver `parallel.py`).
         
-        return stats
+        Returns:
+            BytesIO: Buffer con el PDF generado
+        """
+        template_name = 'reports/pdf/campaign_traceability_report.html'
+        field_stats = context['field_stats']
+        groups = split_sections(
+            field_stats,
+            [stat['total_events'] + 1 for stat in field_stats],
+            settings.REPORT_PDF_WORKERS,
+        )
+        
+        sections = [self.renderer.render_html(template_name, {**context, 'section': 'cover'})]
+        for index, group in enumerate(groups):
+            sections.append(self.renderer.render_html(template_name, {
+                **context,
+                'section': 'fields',
+                'field_stats': group,
+                'first_section': index == 0,
+                'more_sections': index < len(groups) - 1,
+            }))
+        
+        return render_sections(sections, template_name, settings.REPORT_PDF_WORKERS)
     
     def generate_phytosanitary_report(self, field_id=None, date_from=None, date_to=None):
         """
-        Genera un reporte PDF de aplicaciones fitosanitarias.
+        Genera un reporte PDF de aplicaciones fitosanitarias, con la sección de
+        cumplimiento de intervalos de seguridad de las cosechas del período.
         
         Args:
             field_id: ID del lote (opcional, si no se especifica incluye todos)
@@ -132,7 +240,12 @@ class PDFReportGenerator:
         Returns:
             BytesIO: Buffer con el PDF generado
         """
-        from apps.events.models import PhytosanitaryEvent
+        field = None
+        if field_id:
+            try:
+                field = Field.objects.get(id=field_id)
+            except Field.DoesNotExist:
+                raise ValueError(f"Lote con ID {field_id} no encontrado")
         
         # Construir query
         query = PhytosanitaryEvent.objects.select_related(
@@ -146,11 +259,14 @@ class PDFReportGenerator:
         if date_to:
             query = query.filter(timestamp__lte=date_to)
         
-        applications = query.order_by('timestamp')
+        applications = list(query.order_by('timestamp'))
         
         # Preparar contexto
         context = {
+            'field': field,
             'applications': applications,
+            'total_applications': len(applications),
+            'compliance': phi_compliance(field_id=field_id, date_from=date_from, date_to=date_to),
             'date_from': date_from,
             'date_to': date_to,
             'generated_at': timezone.now(),
@@ -158,13 +274,7 @@ class PDFReportGenerator:
         }
         
         # Renderizar y generar PDF
-        html_string = render_to_string('reports/pdf/phytosanitary_report.html', context)
-        html = HTML(string=html_string)
-        pdf_buffer = BytesIO()
-        html.write_pdf(pdf_buffer, font_config=self.font_config)
-        pdf_buffer.seek(0)
-        
-        return pdf_buffer
+        return self.renderer.render('reports/pdf/phytosanitary_report.html', context)
 
 
     def generate_campaign_traceability_report(self, campaign_id, field_ids=None, event_types=None):
@@ -198,27 +308,62 @@ class PDFReportGenerator:
         
         events = events_query.order_by('field__name', 'timestamp')
         
+        params = {
+            'campaign_id': campaign_id,
+            'field_ids': field_ids or [],
+            'event_types': event_types or [],
+        }
+        fields = Field.objects.filter(id__in=field_ids if field_ids else events.order_by().values('field_id'))
+        objects = [campaign, fields]
+        if not event_types:
+            # El cumplimiento de intervalos considera aplicaciones de otras campañas
+            objects.append(PhytosanitaryEvent.objects.filter(field__in=fields))
+        return self._cached_pdf(
+            'campaign_traceability', params, events, 'reports/pdf/campaign_traceability_report.html',
+            objects,
+            lambda data_as_of: self._render_campaign_traceability_report(
+                campaign, events, field_ids, event_types, data_as_of
+            ),
+        )
+    
+    def _render_campaign_traceability_report(self, campaign, events, field_ids, event_types, data_as_of):
+        # Estadísticas por lote y tipo de evento
+        stats = report_stats(campaign_id=campaign.pk, field_ids=field_ids, event_types=event_types)
+        stats_by_field = {item['field_id']: item for item in stats['by_field']}
+        
         # Obtener lotes involucrados
         if field_ids:
             fields = Field.objects.filter(id__in=field_ids).order_by('name')
         else:
             # Obtener todos los lotes que tienen eventos en esta campaña
-            field_ids_with_events = events.values_list('field_id', flat=True).distinct()
-            fields = Field.objects.filter(id__in=field_ids_with_events).order_by('name')
+            fields = Field.objects.filter(id__in=stats_by_field).order_by('name')
+        
+        # Agrupar eventos por lote en una sola consulta
+        events_by_field = {}
+        for event in events:
+            events_by_field.setdefault(event.field_id, []).append(event)
         
         # Calcular estadísticas por lote
         field_stats = []
         for field in fields:
-            field_events = events.filter(field=field)
+            field_summary = stats_by_field.get(field.pk, {})
             field_stats.append({
                 'field': field,
-                'total_events': field_events.count(),
-                'by_type': self._calculate_stats(field_events)['by_type'],
-                'events': field_events,
+                'total_events': field_summary.get('total', 0),
+                'by_type': field_summary.get('by_type', {}),
+                'events': events_by_field.get(field.pk, []),
             })
         
         # Calcular estadísticas generales
-        general_stats = self._calculate_stats(events)
+        general_stats = {
+            'total': stats['total'],
+            'by_type': stats['by_type'],
+        }
+        
+        # Cumplimiento de intervalos de seguridad (solo en el reporte sin filtro de tipos)
+        compliance = None
+        if not event_types:
+            compliance = phi_compliance(campaign_id=campaign.pk, field_ids=field_ids)
         
         # Preparar contexto para el template
         context = {
@@ -227,76 +372,304 @@ class PDFReportGenerator:
             'field_stats': field_stats,
             'events': events,
             'general_stats': general_stats,
-            'total_fields': fields.count(),
-            'generated_at': timezone.now(),
+            'compliance': compliance,
+            'total_fields': len(fields),
+            'data_as_of': data_as_of,
             'report_title': f'Reporte de Trazabilidad - Campaña {campaign.name}',
         }
         
-        # Renderizar template HTML
-        html_string = render_to_string('reports/pdf/campaign_traceability_report.html', context)
-        
-        # Generar PDF
-        html = HTML(string=html_string)
-        pdf_buffer = BytesIO()
-        html.write_pdf(pdf_buffer, font_config=self.font_config)
-        pdf_buffer.seek(0)
+        if self._use_sections(field_stats, general_stats['total']):
+            try:
+                return self._render_campaign_sections(context)
+            except BrokenProcessPool:
+                logger.exception("Falló el renderizado en paralelo; se genera en un solo proceso")
         
-        return pdf_buffer
+        return self.renderer.render('reports/pdf/campaign_traceability_report.html', context)
 
 
 class CSVExporter:
     """
     Exportador de datos a formato CSV.
+    
+    Las filas se leen con `values_list()` y `.iterator()` (cursor del lado del
+    servidor en PostgreSQL), sin instanciar modelos; `stream_events()` y
+    `stream_campaign_events()` generan el archivo por bloques para enviarlo
+    con `StreamingHttpResponse` sin cargarlo completo en memoria.
+    
+    Con `wide=True` se agregan las columnas específicas de cada tipo de
+    evento (ver `typed.py`).
     """
     
-    def export_events(self, field_id=None, date_from=None, date_to=None, 
-                     event_types=None):
+    # Filas leídas del cursor por cada viaje a la base de datos
+    chunk_size = 2000
+    
+    # Filas CSV por cada bloque enviado al cliente
+    rows_per_block = 500
+    
+    EVENT_COLUMNS = [
+        'id', 'tipo_evento', 'lote', 'campana', 'fecha_hora',
+        'observaciones', 'creado_por', 'creado_el',
+    ]
+    
+    CAMPAIGN_EVENT_COLUMNS = [
+        'id', 'campana', 'lote', 'tipo_evento', 'categoria', 'fecha_hora',
+        'observaciones', 'creado_por', 'creado_el',
+    ]
+    
+    # Valores leídos de la base de datos para formar cada fila
+    EVENT_VALUES = (
+        'id', 'event_type__name', 'field__name', 'campaign__name', 'timestamp',
+        'observations', 'created_by__first_name', 'created_by__last_name', 'created_at',
+    )
+    
+    CAMPAIGN_EVENT_VALUES = (
+        'id', 'campaign__name', 'field__name', 'event_type__name', 'event_type__category',
+        'timestamp', 'observations', 'created_by__first_name', 'created_by__last_name', 'created_at',
+    )
+    
+    def _events_query(self, field_id=None, date_from=None, date_to=None, event_types=None, model=Event):
+        query = model.objects.all()
+        
+        if field_id:
+            query = query.filter(field_id=field_id)
+        if date_from:
+            query = query.filter(timestamp__gte=date_from)
+        if date_to:
+            query = query.filter(timestamp__lte=date_to)
+        if event_types:
+            query = query.filter(event_type_id__in=event_types)
+        
+        # El ID desempata: las columnas específicas se combinan siguiendo este orden
+        return query.order_by('timestamp', 'pk')
+    
+    def _campaign_events_query(self, campaign_id, field_ids=None, event_types=None, model=Event):
+        query = model.objects.filter(campaign_id=campaign_id)
+        
+        if field_ids:
+            query = query.filter(field_id__in=field_ids)
+        if event_types:
+            query = query.filter(event_type_id__in=event_types)
+        
+        return query.order_by('field__name', 'timestamp', 'pk')
+    
+    def _format_event(self, values):
+        (event_id, type_name, field_name, campaign_name, timestamp,
+         observations, first_name, last_name, created_at) = values
+        return (
+            str(event_id),
+            type_name,
+            field_name,
+            campaign_name or '',
+            timestamp.strftime('%Y-%m-%d %H:%M'),
+            observations or '',
+            _full_name(first_name, last_name),
+            created_at.strftime('%Y-%m-%d %H:%M'),
+        )
+    
+    def _format_campaign_event(self, values):
+        (event_id, campaign_name, field_name, type_name, category, timestamp,
+         observations, first_name, last_name, created_at) = values
+        return (
+            str(event_id),
+            campaign_name or '',
+            field_name,
+            type_name,
+            category,
+            timestamp.strftime('%Y-%m-%d %H:%M'),
+            observations or '',
+            _full_name(first_name, last_name),
+            created_at.strftime('%Y-%m-%d %H:%M'),
+        )
+    
+    def _rows(self, query, values, format_row, groups=None):
         """
-        Exporta eventos a formato CSV.
+        Filas formateadas de los eventos.
+        
+        Args:
+            query: Función que recibe un modelo de evento y retorna el QuerySet
+                filtrado y ordenado
+            values: Campos a leer (`EVENT_VALUES` o `CAMPAIGN_EVENT_VALUES`)
+            format_row: Función que convierte los valores en la fila base
+            groups: Columnas específicas a agregar (TypedColumns, opcional)
+            
+        Yields:
+            tuple: Valores de una fila
+        """
+        if groups is None:
+            for row_values in query(Event).values_list(*values).iterator(chunk_size=self.chunk_size):
+                yield format_row(row_values)
+            return
+        
+        base_rows = (
+            (row_values[0], row_values[-1], format_row(row_values[:-1]))
+            for row_values in query(Event).values_list(*values, 'event_type_id').iterator(chunk_size=self.chunk_size)
+        )
+        yield from merge_typed_rows(
+            base_rows,
+            groups,
+            lambda group, ids: group.model.objects.filter(pk__in=ids).values_list('pk', *group.names),
+            self.chunk_size,
+        )
+    
+    def _rows_by_type(self, query, values, format_row, event_types):
+        """
+        Filas de cada tipo de evento con sus columnas específicas (una consulta por tipo).
+        
+        Yields:
+            tuple: (TypedColumns, iterador de filas)
+        """
+        count = len(values)
+        for group in typed_column_groups(event_types, include_base=True):
+            rows = (
+                query(group.model)
+                .filter(event_type_id=group.event_type.pk)
+                .values_list(*values, *group.names)
+                .iterator(chunk_size=self.chunk_size)
+            )
+            yield group, (format_row(row_values[:count]) + row_values[count:] for row_values in rows)
+    
+    def event_columns(self, event_types=None, wide=False):
+        """
+        Encabezados del CSV de eventos.
+        
+        Args:
+            event_types: Lista de tipos de evento (opcional)
+            wide: Incluye las columnas específicas de cada tipo de evento
+            
+        Returns:
+            list: Nombres de columna
+        """
+        columns = list(self.EVENT_COLUMNS)
+        if wide:
+            for group in typed_column_groups(event_types):
+                columns += group.columns()
+        return columns
+    
+    def campaign_event_columns(self, event_types=None, wide=False):
+        """Encabezados del CSV de eventos de campaña (ver `event_columns()`)."""
+        columns = list(self.CAMPAIGN_EVENT_COLUMNS)
+        if wide:
+            for group in typed_column_groups(event_types):
+                columns += group.columns()
+        return columns
+    
+    def iter_events(self, field_id=None, date_from=None, date_to=None, event_types=None, wide=False):
+        """
+        Recorre los eventos a exportar como filas en el orden de `EVENT_COLUMNS`.
         
         Args:
             field_id: ID del lote (opcional)
             date_from: Fecha de inicio (opcional)
             date_to: Fecha de fin (opcional)
             event_types: Lista de tipos de evento (opcional)
+            wide: Agrega las columnas específicas de cada tipo de evento
+                (en el orden de `event_columns(event_types, wide=True)`)
             
-        Returns:
-            list: Lista de diccionarios con los datos
+        Yields:
+            tuple: Valores de una fila
         """
-        # Construir query
-        query = Event.objects.select_related(
-            'event_type', 'field', 'campaign', 'created_by'
-        )
+        query = partial(self._events_query, field_id, date_from, date_to, event_types)
+        groups = typed_column_groups(event_types) if wide else None
+        return self._rows(query, self.EVENT_VALUES, self._format_event, groups)
+    
+    def iter_campaign_events(self, campaign_id, field_ids=None, event_types=None, wide=False):
+        """
+        Recorre los eventos de una campaña como filas en el orden de
+        `CAMPAIGN_EVENT_COLUMNS`.
         
-        if field_id:
-            query = query.filter(field_id=field_id)
-        if date_from:
-            query = query.filter(timestamp__gte=date_from)
-        if date_to:
-            query = query.filter(timestamp__lte=date_to)
-        if event_types:
-            query = query.filter(event_type_id__in=event_types)
+        Args:
+            campaign_id: ID de la campaña
+            field_ids: Lista de IDs de lotes (opcional)
+            event_types: Lista de tipos de evento (opcional)
+            wide: Agrega las columnas específicas de cada tipo de evento
+            
+        Yields:
+            tuple: Valores de una fila
+        """
+        query = partial(self._campaign_events_query, campaign_id, field_ids, event_types)
+        groups = typed_column_groups(event_types) if wide else None
+        return self._rows(query, self.CAMPAIGN_EVENT_VALUES, self._format_campaign_event, groups)
+    
+    def iter_events_by_type(self, field_id=None, date_from=None, date_to=None, event_types=None):
+        """
+        Recorre los eventos agrupados por tipo, con las columnas de `EVENT_COLUMNS`
+        seguidas de las columnas específicas del tipo.
         
-        events = query.order_by('timestamp')
+        Yields:
+            tuple: (TypedColumns, iterador de filas)
+        """
+        query = partial(self._events_query, field_id, date_from, date_to, event_types)
+        return self._rows_by_type(query, self.EVENT_VALUES, self._format_event, event_types)
+    
+    def iter_campaign_events_by_type(self, campaign_id, field_ids=None, event_types=None):
+        """Igual que `iter_events_by_type()` para los eventos de una campaña."""
+        query = partial(self._campaign_events_query, campaign_id, field_ids, event_types)
+        return self._rows_by_type(query, self.CAMPAIGN_EVENT_VALUES, self._format_campaign_event, event_types)
+    
+    def stream(self, columns, rows):
+        """
+        Genera un CSV (con BOM para Excel) por bloques de texto.
         
-        # Convertir a lista de diccionarios
-        data = []
-        for event in events:
-            data.append({
-                'id': str(event.id),
-                'tipo_evento': event.event_type.name,
-                'lote': event.field.name,
-                'campana': event.campaign.name if event.campaign else '',
-                'fecha_hora': event.timestamp.strftime('%Y-%m-%d %H:%M'),
-                'observaciones': event.observations or '',
-                'creado_por': event.created_by.get_full_name() if event.created_by else '',
-                'creado_el': event.created_at.strftime('%Y-%m-%d %H:%M'),
-            })
+        Args:
+            columns: Encabezados
+            rows: Iterable de filas
+            
+        Yields:
+            str: Bloques del archivo
+        """
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        
+        writer.writerow(columns)
+        yield '\ufeff' + buffer.flush()
+        
+        pending = 0
+        for row in rows:
+            writer.writerow(row)
+            pending += 1
+            if pending == self.rows_per_block:
+                yield buffer.flush()
+                pending = 0
+        if pending:
+            yield buffer.flush()
+    
+    def stream_events(self, field_id=None, date_from=None, date_to=None, event_types=None, wide=False):
+        """Genera por bloques el CSV de `export_events()`."""
+        return self.stream(
+            self.event_columns(event_types, wide),
+            self.iter_events(field_id, date_from, date_to, event_types, wide),
+        )
+    
+    def stream_campaign_events(self, campaign_id, field_ids=None, event_types=None, wide=False):
+        """Genera por bloques el CSV de `export_campaign_events()`."""
+        return self.stream(
+            self.campaign_event_columns(event_types, wide),
+            self.iter_campaign_events(campaign_id, field_ids, event_types, wide),
+        )
+    
+    def export_events(self, field_id=None, date_from=None, date_to=None, 
+                     event_types=None, wide=False):
+        """
+        Exporta eventos a formato CSV.
         
-        return data
+        Args:
+            field_id: ID del lote (opcional)
+            date_from: Fecha de inicio (opcional)
+            date_to: Fecha de fin (opcional)
+            event_types: Lista de tipos de evento (opcional)
+            wide: Incluye las columnas específicas de cada tipo de evento
+            
+        Returns:
+            list: Lista de diccionarios con los datos
+        """
+        columns = self.event_columns(event_types, wide)
+        return [
+            dict(zip(columns, row))
+            for row in self.iter_events(field_id, date_from, date_to, event_types, wide)
+        ]
 
 
-    def export_campaign_events(self, campaign_id, field_ids=None, event_types=None):
+    def export_campaign_events(self, campaign_id, field_ids=None, event_types=None, wide=False):
         """
         Exporta eventos de una campaña a formato CSV.
         
@@ -304,119 +677,181 @@ class CSVExporter:
             campaign_id: ID de la campaña
             field_ids: Lista de IDs de lotes (opcional)
             event_types: Lista de tipos de evento (opcional)
+            wide: Incluye las columnas específicas de cada tipo de evento
             
         Returns:
             list: Lista de diccionarios con los datos
         """
-        # Construir query
-        query = Event.objects.filter(campaign_id=campaign_id).select_related(
-            'event_type', 'field', 'campaign', 'created_by'
-        )
-        
-        if field_ids:
-            query = query.filter(field_id__in=field_ids)
-        if event_types:
-            query = query.filter(event_type_id__in=event_types)
-        
-        events = query.order_by('field__name', 'timestamp')
-        
-        # Convertir a lista de diccionarios
-        data = []
-        for event in events:
-            data.append({
-                'id': str(event.id),
-                'campana': event.campaign.name if event.campaign else '',
-                'lote': event.field.name,
-                'tipo_evento': event.event_type.name,
-                'categoria': event.event_type.category,
-                'fecha_hora': event.timestamp.strftime('%Y-%m-%d %H:%M'),
-                'observaciones': event.observations or '',
-                'creado_por': event.created_by.get_full_name() if event.created_by else '',
-                'creado_el': event.created_at.strftime('%Y-%m-%d %H:%M'),
-            })
-        
-        return data
+        columns = self.campaign_event_columns(event_types, wide)
+        return [
+            dict(zip(columns, row))
+            for row in self.iter_campaign_events(campaign_id, field_ids, event_types, wide)
+        ]
 
 
 class ExcelExporter:
     """
     Exportador de datos a formato Excel (XLSX).
+    
+    Usa un workbook de solo escritura de openpyxl: las filas se agregan
+    conforme se leen del cursor de la base de datos (sin crear un objeto por
+    celda) y el archivo se guarda en un `SpooledTemporaryFile`, que pasa a
+    disco al superar `spool_max_size`.
+    
+    Con `wide=True` la hoja de eventos incluye las columnas específicas de
+    cada tipo de evento; con `sheet_per_type=True` se genera una hoja por tipo
+    de evento, cada una con sus propias columnas.
     """
     
-    def export_events(self, field_id=None, date_from=None, date_to=None, 
-                     event_types=None):
+    # Tamaño máximo (bytes) del archivo generado que se mantiene en memoria
+    spool_max_size = 5 * 1024 * 1024
+    
+    EVENT_HEADERS = ['ID', 'Tipo Evento', 'Lote', 'Campaña', 'Fecha/Hora', 
+                     'Observaciones', 'Creado Por', 'Creado El']
+    
+    CAMPAIGN_EVENT_HEADERS = ['ID', 'Campaña', 'Lote', 'Tipo Evento', 'Categoría', 
+                              'Fecha/Hora', 'Observaciones', 'Creado Por', 'Creado El']
+    
+    def _cell(self, ws, value, **style):
+        from openpyxl.cell import WriteOnlyCell
+        
+        cell = WriteOnlyCell(ws, value=value)
+        for attr, attr_value in style.items():
+            setattr(cell, attr, attr_value)
+        return cell
+    
+    def _title_row(self, ws, title):
+        from openpyxl.styles import Font
+        
+        return [self._cell(ws, title, font=Font(bold=True, size=14))]
+    
+    def _write_table(self, ws, headers, rows, width):
         """
-        Exporta eventos a formato Excel con múltiples hojas.
+        Escribe encabezados con estilo y filas en una hoja de solo escritura.
         
-        Args:
-            field_id: ID del lote (opcional)
-            date_from: Fecha de inicio (opcional)
-            date_to: Fecha de fin (opcional)
-            event_types: Lista de tipos de evento (opcional)
-            
         Returns:
-            BytesIO: Buffer con el archivo Excel generado
+            int: Número de filas escritas
         """
-        from openpyxl import Workbook
         from openpyxl.styles import Font, PatternFill, Alignment
+        from openpyxl.utils import get_column_letter
         
-        # Crear workbook
-        wb = Workbook()
-        
-        # Hoja 1: Eventos
-        ws_events = wb.active
-        ws_events.title = "Eventos"
-        
-        # Encabezados
-        headers = ['ID', 'Tipo Evento', 'Lote', 'Campaña', 'Fecha/Hora', 
-                  'Observaciones', 'Creado Por', 'Creado El']
+        # Los anchos deben definirse antes de escribir filas
+        for col in range(1, len(headers) + 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
         
-        # Aplicar estilo a encabezados
         header_font = Font(bold=True, color="FFFFFF")
         header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        ws.append([
+            self._cell(ws, header, font=header_font, fill=header_fill, alignment=header_alignment)
+            for header in headers
+        ])
+        
+        total = 0
+        for row in rows:
+            ws.append(row)
+            total += 1
+        return total
+    
+    def _typed_headers(self, headers, event_types, wide):
+        """Encabezados base seguidos de los de cada tipo de evento si `wide`."""
+        headers = list(headers)
+        if wide:
+            for group in typed_column_groups(event_types):
+                headers += group.headers()
+        return headers
+    
+    def _write_sheets_by_type(self, wb, sheets, headers, width):
+        """
+        Escribe una hoja por tipo de evento (solo los tipos con eventos).
         
-        for col, header in enumerate(headers, 1):
-            cell = ws_events.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Obtener datos usando CSVExporter
-        csv_exporter = CSVExporter()
-        data = csv_exporter.export_events(field_id, date_from, date_to, event_types)
-        
-        # Escribir datos
-        for row_idx, event_data in enumerate(data, 2):
-            ws_events.cell(row=row_idx, column=1, value=event_data['id'])
-            ws_events.cell(row=row_idx, column=2, value=event_data['tipo_evento'])
-            ws_events.cell(row=row_idx, column=3, value=event_data['lote'])
-            ws_events.cell(row=row_idx, column=4, value=event_data['campana'])
-            ws_events.cell(row=row_idx, column=5, value=event_data['fecha_hora'])
-            ws_events.cell(row=row_idx, column=6, value=event_data['observaciones'])
-            ws_events.cell(row=row_idx, column=7, value=event_data['creado_por'])
-            ws_events.cell(row=row_idx, column=8, value=event_data['creado_el'])
-        
-        # Ajustar ancho de columnas
-        for col in range(1, len(headers) + 1):
-            ws_events.column_dimensions[ws_events.cell(row=1, column=col).column_letter].width = 20
+        Args:
+            wb: Workbook de solo escritura
+            sheets: Iterable de (TypedColumns, filas), ver `CSVExporter.iter_events_by_type()`
+            headers: Encabezados de las columnas base
+            width: Ancho de las columnas
+            
+        Returns:
+            int: Total de filas escritas
+        """
+        total = 0
+        for group, rows in sheets:
+            rows = iter(rows)
+            first = next(rows, None)
+            if first is None:
+                continue
+            ws = wb.create_sheet(_sheet_title(group.event_type.name))
+            total += self._write_table(ws, headers + group.headers(prefixed=False), chain([first], rows), width)
+        return total
+    
+    def _save(self, wb):
+        """Guarda el workbook en un archivo temporal posicionado al inicio."""
+        output = tempfile.SpooledTemporaryFile(max_size=self.spool_max_size)
+        wb.save(output)
+        output.seek(0)
+        return output
+    
+    def build_events_workbook(self, rows=None, headers=None, sheets=None):
+        """
+        Genera el Excel de eventos a partir de filas en el orden de
+        `CSVExporter.EVENT_COLUMNS`.
+        
+        Args:
+            rows: Iterable de filas (se consume una sola vez)
+            headers: Encabezados (por defecto `EVENT_HEADERS`)
+            sheets: En lugar de `rows`, filas por tipo de evento para escribir
+                una hoja por tipo (ver `CSVExporter.iter_events_by_type()`)
+            
+        Returns:
+            SpooledTemporaryFile: Archivo Excel generado, posicionado al inicio
+        """
+        from openpyxl import Workbook
+        
+        wb = Workbook(write_only=True)
+        
+        if sheets is not None:
+            # Una hoja por tipo de evento
+            total = self._write_sheets_by_type(wb, sheets, self.EVENT_HEADERS, width=20)
+        else:
+            # Hoja 1: Eventos
+            ws_events = wb.create_sheet("Eventos")
+            total = self._write_table(ws_events, headers or self.EVENT_HEADERS, rows, width=20)
         
         # Hoja 2: Resumen
         ws_summary = wb.create_sheet("Resumen")
-        ws_summary.cell(row=1, column=1, value="Resumen de Exportación").font = Font(bold=True, size=14)
-        ws_summary.cell(row=3, column=1, value="Total de eventos:")
-        ws_summary.cell(row=3, column=2, value=len(data))
-        ws_summary.cell(row=4, column=1, value="Fecha de generación:")
-        ws_summary.cell(row=4, column=2, value=timezone.now().strftime('%Y-%m-%d %H:%M'))
-        
-        # Guardar en buffer
-        excel_buffer = BytesIO()
-        wb.save(excel_buffer)
-        excel_buffer.seek(0)
-        
-        return excel_buffer
+        ws_summary.append(self._title_row(ws_summary, "Resumen de Exportación"))
+        ws_summary.append([])
+        ws_summary.append(["Total de eventos:", total])
+        ws_summary.append(["Fecha de generación:", timezone.now().strftime('%Y-%m-%d %H:%M')])
+        
+        return self._save(wb)
+    
+    def export_events(self, field_id=None, date_from=None, date_to=None, 
+                     event_types=None, wide=False, sheet_per_type=False):
+        """
+        Exporta eventos a formato Excel con múltiples hojas.
+        
+        Args:
+            field_id: ID del lote (opcional)
+            date_from: Fecha de inicio (opcional)
+            date_to: Fecha de fin (opcional)
+            event_types: Lista de tipos de evento (opcional)
+            wide: Incluye las columnas específicas de cada tipo de evento
+            sheet_per_type: Una hoja por tipo de evento con sus columnas específicas
+            
+        Returns:
+            SpooledTemporaryFile: Archivo Excel generado, posicionado al inicio
+        """
+        exporter = CSVExporter()
+        if sheet_per_type:
+            sheets = exporter.iter_events_by_type(field_id, date_from, date_to, event_types)
+            return self.build_events_workbook(sheets=sheets)
+        rows = exporter.iter_events(field_id, date_from, date_to, event_types, wide)
+        return self.build_events_workbook(rows, self._typed_headers(self.EVENT_HEADERS, event_types, wide))
 
 
-    def export_campaign_events(self, campaign_id, field_ids=None, event_types=None):
+    def export_campaign_events(self, campaign_id, field_ids=None, event_types=None,
+                               wide=False, sheet_per_type=False):
         """
         Exporta eventos de una campaña a formato Excel con múltiples hojas.
         
@@ -424,95 +859,81 @@ class ExcelExporter:
             campaign_id: ID de la campaña
             field_ids: Lista de IDs de lotes (opcional)
             event_types: Lista de tipos de evento (opcional)
+            wide: Incluye las columnas específicas de cada tipo de evento
+            sheet_per_type: Una hoja por tipo de evento con sus columnas específicas
             
         Returns:
-            BytesIO: Buffer con el archivo Excel generado
+            SpooledTemporaryFile: Archivo Excel generado, posicionado al inicio
         """
         from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment
-        
-        # Crear workbook
-        wb = Workbook()
+        from openpyxl.styles import Font
         
         # Obtener campaña
         campaign = Campaign.objects.get(id=campaign_id)
         
-        # Hoja 1: Eventos
-        ws_events = wb.active
-        ws_events.title = "Eventos"
+        wb = Workbook(write_only=True)
         
-        # Encabezados
-        headers = ['ID', 'Campaña', 'Lote', 'Tipo Evento', 'Categoría', 
-                  'Fecha/Hora', 'Observaciones', 'Creado Por', 'Creado El']
-        
-        # Aplicar estilo a encabezados
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        exporter = CSVExporter()
+        if sheet_per_type:
+            # Una hoja por tipo de evento
+            sheets = exporter.iter_campaign_events_by_type(campaign_id, field_ids, event_types)
+            self._write_sheets_by_type(wb, sheets, self.CAMPAIGN_EVENT_HEADERS, width=18)
+        else:
+            # Hoja 1: Eventos
+            rows = exporter.iter_campaign_events(campaign_id, field_ids, event_types, wide)
+            ws_events = wb.create_sheet("Eventos")
+            headers = self._typed_headers(self.CAMPAIGN_EVENT_HEADERS, event_types, wide)
+            self._write_table(ws_events, headers, rows, width=18)
         
-        for col, header in enumerate(headers, 1):
-            cell = ws_events.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Obtener datos usando CSVExporter
-        csv_exporter = CSVExporter()
-        data = csv_exporter.export_campaign_events(campaign_id, field_ids, event_types)
-        
-        # Escribir datos
-        for row_idx, event_data in enumerate(data, 2):
-            ws_events.cell(row=row_idx, column=1, value=event_data['id'])
-            ws_events.cell(row=row_idx, column=2, value=event_data['campana'])
-            ws_events.cell(row=row_idx, column=3, value=event_data['lote'])
-            ws_events.cell(row=row_idx, column=4, value=event_data['tipo_evento'])
-            ws_events.cell(row=row_idx, column=5, value=event_data['categoria'])
-            ws_events.cell(row=row_idx, column=6, value=event_data['fecha_hora'])
-            ws_events.cell(row=row_idx, column=7, value=event_data['observaciones'])
-            ws_events.cell(row=row_idx, column=8, value=event_data['creado_por'])
-            ws_events.cell(row=row_idx, column=9, value=event_data['creado_el'])
-        
-        # Ajustar ancho de columnas
-        for col in range(1, len(headers) + 1):
-            ws_events.column_dimensions[ws_events.cell(row=1, column=col).column_letter].width = 18
+        stats = report_stats(campaign_id=campaign_id, field_ids=field_ids, event_types=event_types)
         
         # Hoja 2: Resumen por Lote
         ws_summary = wb.create_sheet("Resumen por Lote")
-        ws_summary.cell(row=1, column=1, value="Resumen de Eventos por Lote").font = Font(bold=True, size=14)
-        
-        # Calcular estadísticas por lote
-        from collections import Counter
-        field_counter = Counter()
-        for event in data:
-            field_counter[event['lote']] += 1
-        
-        ws_summary.cell(row=3, column=1, value="Lote").font = Font(bold=True)
-        ws_summary.cell(row=3, column=2, value="Total Eventos").font = Font(bold=True)
-        
-        row = 4
-        for field_name, count in sorted(field_counter.items()):
-            ws_summary.cell(row=row, column=1, value=field_name)
-            ws_summary.cell(row=row, column=2, value=count)
-            row += 1
+        ws_summary.append(self._title_row(ws_summary, "Resumen de Eventos por Lote"))
+        ws_summary.append([])
+        ws_summary.append([
+            self._cell(ws_summary, "Lote", font=Font(bold=True)),
+            self._cell(ws_summary, "Total Eventos", font=Font(bold=True)),
+        ])
+        for field_summary in stats['by_field']:
+            ws_summary.append([field_summary['field_name'], field_summary['total']])
         
         # Hoja 3: Información de la Campaña
         ws_info = wb.create_sheet("Información")
-        ws_info.cell(row=1, column=1, value="Información de la Campaña").font = Font(bold=True, size=14)
-        ws_info.cell(row=3, column=1, value="Campaña:")
-        ws_info.cell(row=3, column=2, value=campaign.name)
-        ws_info.cell(row=4, column=1, value="Fecha Inicio:")
-        ws_info.cell(row=4, column=2, value=campaign.start_date.strftime('%Y-%m-%d') if campaign.start_date else '')
-        ws_info.cell(row=5, column=1, value="Fecha Fin:")
-        ws_info.cell(row=5, column=2, value=campaign.end_date.strftime('%Y-%m-%d') if campaign.end_date else 'Activa')
-        ws_info.cell(row=6, column=1, value="Estado:")
-        ws_info.cell(row=6, column=2, value='Activa' if campaign.is_active else 'Finalizada')
-        ws_info.cell(row=7, column=1, value="Total de eventos:")
-        ws_info.cell(row=7, column=2, value=len(data))
-        ws_info.cell(row=8, column=1, value="Fecha de generación:")
-        ws_info.cell(row=8, column=2, value=timezone.now().strftime('%Y-%m-%d %H:%M'))
-        
-        # Guardar en buffer
-        excel_buffer = BytesIO()
-        wb.save(excel_buffer)
-        excel_buffer.seek(0)
-        
-        return excel_buffer
+        ws_info.append(self._title_row(ws_info, "Información de la Campaña"))
+        ws_info.append([])
+        ws_info.append(["Campaña:", campaign.name])
+        ws_info.append(["Fecha Inicio:", campaign.start_date.strftime('%Y-%m-%d') if campaign.start_date else ''])
+        ws_info.append(["Fecha Fin:", campaign.end_date.strftime('%Y-%m-%d') if campaign.end_date else 'Activa'])
+        ws_info.append(["Estado:", 'Activa' if campaign.is_active else 'Finalizada'])
+        ws_info.append(["Total de eventos:", stats['total']])
+        ws_info.append(["Fecha de generación:", timezone.now().strftime('%Y-%m-%d %H:%M')])
+        
+        return self._save(wb)
+
+
+class _LineBuffer:
+    """Destino de `csv.writer` que acumula el texto escrito hasta `flush()`."""
+    
+    def __init__(self):
+        self._parts = []
+    
+    def write(self, value):
+        self._parts.append(value)
+    
+    def flush(self):
+        text = ''.join(self._parts)
+        self._parts = []
+        return text
+
+
+def _sheet_title(name):
+    """Nombre válido para una hoja de Excel (sin `[]:*?/\\`, hasta 31 caracteres)."""
+    for char in '[]:*?/\\':
+        name = name.replace(char, '-')
+    return name[:31]
+
+
+def _full_name(first_name, last_name):
+    """Equivalente a `User.get_full_name()` a partir de los valores de la fila."""
+    return f"{first_name or ''} {last_name or ''}".strip()
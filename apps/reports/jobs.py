@@ -0,0 +1,319 @@
+"""
+Generación de reportes y trabajos en segundo plano.
+
+`render_report()` genera cualquier reporte de la API (PDF, Excel o CSV) y lo
+usan tanto las vistas síncronas como el worker; `stream_csv_report()` entrega
+el CSV por bloques para `StreamingHttpResponse`. Los trabajos (`ReportJob`) se
+encolan desde la API y los procesa `python manage.py run_report_worker`, que
+ejecuta `run_report_job()` en un pool de procesos. El worker también marca como
+fallidos los trabajos que quedaron "en proceso" tras detenerse un worker
+(`fail_stale_jobs()`) y elimina los trabajos antiguos con sus archivos
+(`purge_report_jobs()`).
+"""
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.catalogs.models import Field, Campaign
+from .generators import PDFReportGenerator, CSVExporter, ExcelExporter
+from .models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+EXTENSIONS = {
+    'pdf': 'pdf',
+    'excel': 'xlsx',
+    'csv': 'csv',
+}
+
+
+def _to_date(value):
+    """Acepta fechas o cadenas ISO (los parámetros de un trabajo se guardan como JSON)."""
+    if isinstance(value, str):
+        return parse_date(value)
+    return value
+
+
+def _report_target(report_type, params):
+    """
+    Valida el lote o la campaña del reporte y arma los filtros de los generadores.
+    
+    Returns:
+        tuple: (filtros, nombre usado en el archivo)
+    
+    Raises:
+        ValueError: Si el tipo de reporte no es válido o el lote/campaña no existe
+    """
+    event_types = params.get('event_types') or None
+    
+    if report_type == 'field_traceability':
+        field = Field.objects.filter(id=params['field_id']).first()
+        if field is None:
+            raise ValueError(f"Lote con ID {params['field_id']} no encontrado")
+        filters = {
+            'field_id': params['field_id'],
+            'date_from': _to_date(params.get('date_from')),
+            'date_to': _to_date(params.get('date_to')),
+            'event_types': event_types,
+        }
+        return filters, field.code
+    
+    if report_type == 'campaign_traceability':
+        campaign = Campaign.objects.filter(id=params['campaign_id']).first()
+        if campaign is None:
+            raise ValueError(f"Campaña con ID {params['campaign_id']} no encontrada")
+        filters = {
+            'campaign_id': params['campaign_id'],
+            'field_ids': params.get('field_ids') or None,
+            'event_types': event_types,
+        }
+        return filters, f"campana_{campaign.name.replace(' ', '_')}"
+    
+    raise ValueError(f"Tipo de reporte no soportado: {report_type}")
+
+
+def _filename(prefix, export_format):
+    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+    return f"{prefix}_{timestamp}.{EXTENSIONS[export_format]}"
+
+
+def stream_csv_report(report_type, params):
+    """
+    Prepara un reporte CSV para enviarse por bloques.
+    
+    El lote/campaña se valida al llamar a la función; las consultas de eventos
+    se ejecutan conforme se consume el generador.
+    
+    Returns:
+        tuple: (generador de bloques de texto, nombre de archivo, tipo MIME)
+    
+    Raises:
+        ValueError: Si el tipo de reporte no es válido o el lote/campaña no existe
+    """
+    filters, name = _report_target(report_type, params)
+    exporter = CSVExporter()
+    wide = bool(params.get('wide'))
+    if report_type == 'field_traceability':
+        chunks = exporter.stream_events(**filters, wide=wide)
+    else:
+        chunks = exporter.stream_campaign_events(**filters, wide=wide)
+    return chunks, _filename(f"eventos_{name}", 'csv'), CONTENT_TYPES['csv']
+
+
+def render_report(report_type, export_format, params):
+    """
+    Genera un reporte de trazabilidad.
+
+    Args:
+        report_type: 'field_traceability' o 'campaign_traceability'
+        export_format: 'pdf', 'excel' o 'csv'
+        params: Parámetros del reporte (IDs como texto, fechas como date o ISO;
+            `wide` y `sheet_per_type` definen las columnas de CSV/Excel)
+
+    Returns:
+        tuple: (archivo binario posicionado al inicio, nombre de archivo, tipo MIME).
+            Quien lo recibe debe cerrarlo (`report_file_response()` lo hace).
+
+    Raises:
+        ValueError: Si el tipo de reporte o el formato no son válidos, o si el
+            lote/campaña no existe
+    """
+    if export_format not in CONTENT_TYPES:
+        raise ValueError(f"Formato no soportado: {export_format}")
+
+    if export_format == 'csv':
+        chunks, filename, content_type = stream_csv_report(report_type, params)
+        output = tempfile.SpooledTemporaryFile(max_size=ExcelExporter.spool_max_size)
+        for chunk in chunks:
+            output.write(chunk.encode('utf-8'))
+        output.seek(0)
+        return output, filename, content_type
+
+    filters, name = _report_target(report_type, params)
+    if export_format == 'pdf':
+        generator = PDFReportGenerator()
+        if report_type == 'field_traceability':
+            output = generator.generate_traceability_report(campaign_id=params.get('campaign_id'), **filters)
+        else:
+            output = generator.generate_campaign_traceability_report(**filters)
+        prefix = f"trazabilidad_{name}"
+    else:
+        exporter = ExcelExporter()
+        options = {
+            'wide': bool(params.get('wide')),
+            'sheet_per_type': bool(params.get('sheet_per_type')),
+        }
+        if report_type == 'field_traceability':
+            output = exporter.export_events(**filters, **options)
+        else:
+            output = exporter.export_campaign_events(**filters, **options)
+        prefix = f"eventos_{name}"
+
+    return output, _filename(prefix, export_format), CONTENT_TYPES[export_format]
+
+
+def enqueue_report_job(report_type, export_format, params, user=None):
+    """
+    Registra un trabajo de reporte pendiente.
+
+    Args:
+        report_type: Tipo de reporte
+        export_format: Formato de salida
+        params: Parámetros del reporte (deben ser serializables a JSON)
+        user: Usuario que lo solicita
+
+    Returns:
+        ReportJob
+    """
+    return ReportJob.objects.create(
+        report_type=report_type,
+        format=export_format,
+        parameters=params,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_pending_jobs(limit):
+    """
+    Marca como "en proceso" hasta `limit` trabajos pendientes (los más antiguos).
+
+    El cambio de estado es un UPDATE condicional, por lo que varios workers
+    pueden ejecutarse a la vez sin tomar el mismo trabajo.
+
+    Returns:
+        list: IDs de los trabajos tomados
+    """
+    claimed = []
+    pending = (
+        ReportJob.objects.filter(status=ReportJob.STATUS_PENDING)
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+    for job_id in list(pending):
+        taken = ReportJob.objects.filter(pk=job_id, status=ReportJob.STATUS_PENDING).update(
+            status=ReportJob.STATUS_RUNNING,
+            progress=0,
+            started_at=timezone.now(),
+        )
+        if taken:
+            claimed.append(job_id)
+    return claimed
+
+
+def fail_stale_jobs(timeout_minutes):
+    """
+    Marca como fallidos los trabajos "en proceso" desde hace más de `timeout_minutes`.
+
+    Un trabajo queda así si el worker que lo tomó se detuvo o perdió su pool
+    antes de terminarlo. Se marcan como fallidos en lugar de volver a encolarse
+    para no repetir indefinidamente un reporte que detiene al worker.
+
+    Returns:
+        int: Trabajos marcados como fallidos
+    """
+    cutoff = timezone.now() - timedelta(minutes=timeout_minutes)
+    return ReportJob.objects.filter(status=ReportJob.STATUS_RUNNING, started_at__lt=cutoff).update(
+        status=ReportJob.STATUS_FAILED,
+        error=f'El trabajo no terminó en {timeout_minutes} minutos (el worker se detuvo o reinició)',
+        finished_at=timezone.now(),
+    )
+
+
+def delete_report_jobs(jobs):
+    """
+    Elimina trabajos y sus archivos en MEDIA_ROOT.
+
+    Args:
+        jobs: QuerySet de ReportJob
+
+    Returns:
+        int: Trabajos eliminados
+    """
+    for job in jobs.exclude(file='').only('pk', 'file').iterator():
+        job.file.delete(save=False)
+    deleted, _ = jobs.delete()
+    return deleted
+
+
+def purge_report_jobs(retention_days):
+    """
+    Elimina los trabajos terminados hace más de `retention_days` días y sus archivos.
+
+    Returns:
+        int: Trabajos eliminados
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    return delete_report_jobs(ReportJob.objects.filter(
+        status__in=[ReportJob.STATUS_COMPLETED, ReportJob.STATUS_FAILED],
+        finished_at__lt=cutoff,
+    ))
+
+
+def fail_report_job(job_id, error):
+    """Marca un trabajo como fallido."""
+    ReportJob.objects.filter(pk=job_id).update(
+        status=ReportJob.STATUS_FAILED,
+        error=str(error),
+        finished_at=timezone.now(),
+    )
+
+
+def _set_progress(job_id, progress):
+    ReportJob.objects.filter(pk=job_id).update(progress=progress)
+
+
+def run_report_job(job_id):
+    """
+    Ejecuta un trabajo ya tomado por el worker (se llama en un proceso del pool).
+
+    Los errores se registran en el propio trabajo. Si el trabajo dejó de estar
+    "en proceso" mientras se generaba (lo marcó como fallido `fail_stale_jobs()`
+    o se eliminó), el archivo generado se elimina y el trabajo no cambia.
+
+    Returns:
+        str: Estado final del trabajo
+    """
+    close_old_connections()
+    job = ReportJob.objects.get(pk=job_id)
+
+    try:
+        _set_progress(job_id, 10)
+        output, filename, content_type = render_report(job.report_type, job.format, job.parameters)
+        _set_progress(job_id, 90)
+
+        with output:
+            job.file.save(filename, File(output), save=False)
+        # Solo si sigue "en proceso": `fail_stale_jobs()` pudo marcarlo como
+        # fallido (y una descarga o la purga actuar en consecuencia) mientras
+        # se generaba
+        completed = ReportJob.objects.filter(pk=job_id, status=ReportJob.STATUS_RUNNING).update(
+            file=job.file.name,
+            filename=filename,
+            content_type=content_type,
+            status=ReportJob.STATUS_COMPLETED,
+            progress=100,
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.exception("Error al generar el reporte del trabajo %s", job_id)
+        fail_report_job(job_id, e)
+        return ReportJob.STATUS_FAILED
+
+    if not completed:
+        job.file.delete(save=False)
+        logger.warning("El trabajo de reporte %s ya no estaba en proceso; se descarta el archivo", job_id)
+        return ReportJob.STATUS_FAILED
+
+    logger.info("Trabajo de reporte %s completado (%s bytes)", job_id, job.file.size)
+    return ReportJob.STATUS_COMPLETED
@@ -0,0 +1,114 @@
+"""
+Comando de Django para medir la memoria de la exportación a Excel.
+
+Genera filas sintéticas con el formato de `CSVExporter.iter_events()` y las
+escribe con `ExcelExporter.build_events_workbook()`. Cada medición corre en un
+proceso nuevo para que el pico de memoria residente (RSS) sea solo el suyo.
+
+Uso:
+    python manage.py benchmark_excel_export
+    python manage.py benchmark_excel_export --rows 100000 1000000
+    python manage.py benchmark_excel_export --rows 100000 --baseline
+"""
+import multiprocessing
+import resource
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import django
+from django.core.management.base import BaseCommand
+
+
+def _synthetic_rows(count):
+    """Filas en el orden de `CSVExporter.EVENT_COLUMNS`."""
+    start = datetime(2024, 1, 1, 6, 0)
+    for i in range(count):
+        moment = (start + timedelta(minutes=17 * i)).strftime('%Y-%m-%d %H:%M')
+        yield (
+            str(uuid.uuid4()),
+            'Aplicación de Riego',
+            f'Lote {i % 40:02d}',
+            'Primavera 2024',
+            moment,
+            'Riego normal, sin incidencias' if i % 3 else '',
+            'Juan Pérez',
+            moment,
+        )
+
+
+def _build_baseline(rows):
+    """Workbook normal celda por celda, como referencia de comparación."""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    for row_idx, row in enumerate(rows, 2):
+        for col_idx, value in enumerate(row, 1):
+            ws.cell(row=row_idx, column=col_idx, value=value)
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+def _measure(rows, baseline):
+    """
+    Genera el Excel en el proceso actual.
+
+    Returns:
+        tuple: (segundos, tamaño en bytes, pico de RSS en MB)
+    """
+    from apps.reports.generators import ExcelExporter
+
+    start = time.perf_counter()
+    if baseline:
+        output = _build_baseline(_synthetic_rows(rows))
+    else:
+        output = ExcelExporter().build_events_workbook(_synthetic_rows(rows))
+    elapsed = time.perf_counter() - start
+
+    output.seek(0, 2)
+    size = output.tell()
+    output.close()
+
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return elapsed, size, peak_mb
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y pico de memoria (RSS) de la exportación a Excel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[100000, 1000000],
+            help='Número de filas a exportar (por defecto 100000 y 1000000)',
+        )
+        parser.add_argument(
+            '--baseline',
+            action='store_true',
+            help='Mide también un workbook normal (celda por celda) para comparar',
+        )
+
+    def handle(self, *args, **options):
+        modes = [False, True] if options['baseline'] else [False]
+        context = multiprocessing.get_context('spawn')
+
+        for rows in options['rows']:
+            for baseline in modes:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=django.setup) as pool:
+                    elapsed, size, peak_mb = pool.submit(_measure, rows, baseline).result()
+
+                label = 'workbook normal' if baseline else 'solo escritura'
+                self.stdout.write(
+                    f'{rows:>9,} filas ({label}): {elapsed:7.1f}s, '
+                    f'{size / (1024 * 1024):6.1f} MB, pico RSS {peak_mb:7.1f} MB'
+                )
@@ -0,0 +1,478 @@
+"""
+Comando de Django para medir cómo escalan los reportes y exportaciones.
+
+Crea lotes, campañas y eventos sintéticos de los 10 tipos de evento (con sus
+columnas específicas) y mide cada método de `PDFReportGenerator`,
+`CSVExporter` y `ExcelExporter` con volúmenes crecientes. Cada medición corre
+en un proceso nuevo para que el pico de memoria residente (RSS) sea solo el
+suyo; se registran tiempo, número de consultas, pico de RSS y tamaño del
+resultado.
+
+Los datos sintéticos se identifican por el código de lote `BENCH-` y se
+eliminan al terminar (salvo con `--keep`). Las escalas se recorren de menor a
+mayor agregando solo los eventos faltantes. Con `--baseline` el comando
+termina con error si alguna medición empeora respecto a un JSON anterior, para
+usarlo en CI.
+
+Uso:
+    python manage.py benchmark_reports
+    python manage.py benchmark_reports --events 10000 100000 1000000 --output bench.json
+    python manage.py benchmark_reports --events 10000 --baseline bench.json --tolerance 0.3
+    python manage.py benchmark_reports --events 100000 --only 'csv.*' 'excel.*' --keep
+    python manage.py benchmark_reports --clean
+"""
+import fnmatch
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connection, models, router, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.catalogs.models import Campaign, Field
+from apps.events.bulk import _insert_local_rows
+from apps.events.models import Event, EventDailyCount
+from apps.events.registry import event_type_registry
+from apps.events.rollups import record_events_created
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_CODE_PREFIX = 'BENCH-'
+BENCH_CAMPAIGN_PREFIX = 'BENCH '
+
+# Eventos por transacción al crear los datos sintéticos
+SEED_BATCH_SIZE = 5000
+
+# Diferencias menores a estas no cuentan como regresión (ruido de medición)
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_DELTA_MB = 5
+
+# (nombre, tipo de reporte, método, argumentos adicionales)
+# El tipo define con qué datos se llama: 'field' con el primer lote sintético,
+# 'campaign' con la primera campaña sintética y 'all' sin filtros.
+CASES = [
+    ('pdf.generate_traceability_report', 'field', 'generate_traceability_report', {}),
+    ('pdf.generate_campaign_traceability_report', 'campaign', 'generate_campaign_traceability_report', {}),
+    ('pdf.generate_phytosanitary_report', 'field', 'generate_phytosanitary_report', {}),
+    ('csv.export_events', 'all', 'export_events', {}),
+    ('csv.stream_events', 'all', 'stream_events', {}),
+    ('csv.stream_events[wide]', 'all', 'stream_events', {'wide': True}),
+    ('csv.export_campaign_events', 'campaign', 'export_campaign_events', {}),
+    ('csv.stream_campaign_events', 'campaign', 'stream_campaign_events', {}),
+    ('csv.stream_campaign_events[wide]', 'campaign', 'stream_campaign_events', {'wide': True}),
+    ('excel.export_events', 'all', 'export_events', {}),
+    ('excel.export_events[wide]', 'all', 'export_events', {'wide': True}),
+    ('excel.export_events[sheet_per_type]', 'all', 'export_events', {'sheet_per_type': True}),
+    ('excel.export_campaign_events', 'campaign', 'export_campaign_events', {}),
+    ('excel.export_campaign_events[sheet_per_type]', 'campaign', 'export_campaign_events', {'sheet_per_type': True}),
+]
+
+
+def _peak_rss_mb():
+    """Pico de RSS del proceso actual en MB (None si no está disponible)."""
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _output_size(output):
+    """Tamaño del resultado de un método (bytes o filas)."""
+    if isinstance(output, list):
+        return len(json.dumps(output, default=str).encode('utf-8'))
+    if hasattr(output, 'seek'):
+        output.seek(0, 2)
+        size = output.tell()
+        output.close()
+        return size
+    # Generador de bloques CSV: se consume completo
+    return sum(len(chunk.encode('utf-8')) for chunk in output)
+
+
+def _measure(case_name, target):
+    """
+    Ejecuta un caso en el proceso actual.
+
+    Args:
+        case_name: Nombre del caso en `CASES`
+        target: dict con 'field_id' y 'campaign_id' de los datos sintéticos
+
+    Returns:
+        dict: Resultado de la medición
+    """
+    from apps.reports.generators import CSVExporter, ExcelExporter, PDFReportGenerator
+
+    _, kind, method_name, extra = next(case for case in CASES if case[0] == case_name)
+    family = case_name.split('.', 1)[0]
+    if family == 'pdf':
+        # El renderizador se carga al crear el generador, como en un worker ya iniciado
+        instance = PDFReportGenerator(use_cache=False)
+    elif family == 'csv':
+        instance = CSVExporter()
+    else:
+        instance = ExcelExporter()
+
+    if kind == 'field':
+        kwargs = {'field_id': target['field_id']}
+    elif kind == 'campaign':
+        kwargs = {'campaign_id': target['campaign_id']}
+    else:
+        kwargs = {}
+    kwargs.update(extra)
+
+    connection.ensure_connection()
+    rss_before = _peak_rss_mb()
+    result = {'status': 'ok'}
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        try:
+            result['output_bytes'] = _output_size(getattr(instance, method_name)(**kwargs))
+        except Exception as e:
+            result.update(status='error', error=f'{type(e).__name__}: {e}')
+        result['seconds'] = round(time.perf_counter() - start, 4)
+
+    peak = _peak_rss_mb()
+    result['queries'] = len(queries)
+    result['peak_rss_mb'] = round(peak, 1) if peak is not None else None
+    result['rss_delta_mb'] = round(peak - rss_before, 1) if peak is not None else None
+    return result
+
+
+def _clamp(field, value):
+    """Ajusta un valor a los validadores de mínimo y máximo del campo."""
+    for validator in field.validators:
+        if isinstance(validator, MinValueValidator):
+            value = max(value, validator.limit_value)
+        elif isinstance(validator, MaxValueValidator):
+            value = min(value, validator.limit_value)
+    return value
+
+
+def _field_value(field, index, moment):
+    """Valor sintético válido para un campo específico de un tipo de evento."""
+    if field.choices:
+        choices = [value for value, _ in field.flatchoices]
+        return choices[index % len(choices)]
+    if isinstance(field, models.BooleanField):
+        return index % 2 == 0
+    if isinstance(field, models.IntegerField):
+        return _clamp(field, 1 + index % 120)
+    if isinstance(field, models.DecimalField):
+        limit = Decimal(10) ** (field.max_digits - field.decimal_places) - 1
+        value = min(Decimal(index % 97) + Decimal('0.5'), limit)
+        return Decimal(_clamp(field, value)).quantize(Decimal(1).scaleb(-field.decimal_places))
+    if isinstance(field, models.DateTimeField):
+        return moment
+    if isinstance(field, models.DateField):
+        return moment.date() + timedelta(days=index % 30)
+    if isinstance(field, (models.CharField, models.TextField)):
+        text = f'{field.verbose_name} {index % 10}'
+        return text[:field.max_length] if field.max_length else text
+    if field.null:
+        return None
+    raise CommandError(f'No se puede generar un valor para {field.model.__name__}.{field.name}')
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo, consultas y pico de memoria de reportes y exportaciones con datos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events',
+            type=int,
+            nargs='+',
+            default=[10000],
+            help='Número de eventos sintéticos de cada escala (por defecto 10000)',
+        )
+        parser.add_argument(
+            '--fields',
+            type=int,
+            default=20,
+            help='Lotes sintéticos (por defecto 20)',
+        )
+        parser.add_argument(
+            '--campaigns',
+            type=int,
+            default=4,
+            help='Campañas sintéticas (por defecto 4)',
+        )
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            default=None,
+            help="Casos a medir, con comodines (p. ej. 'csv.*')",
+        )
+        parser.add_argument(
+            '--pdf-max-events',
+            type=int,
+            default=20000,
+            help='Omite los PDF con más eventos que este límite (por defecto 20000)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Archivo JSON donde guardar los resultados',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON de una ejecución anterior con el cual comparar',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Aumento relativo permitido de tiempo y memoria (por defecto 0.25)',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Conserva los datos sintéticos al terminar',
+        )
+        parser.add_argument(
+            '--clean',
+            action='store_true',
+            help='Solo elimina los datos sintéticos de ejecuciones anteriores',
+        )
+
+    def handle(self, *args, **options):
+        if options['clean']:
+            deleted = self._delete_bench_data()
+            self.stdout.write(self.style.SUCCESS(f'Eventos sintéticos eliminados: {deleted}'))
+            return
+
+        baseline = self._load_baseline(options['baseline']) if options['baseline'] else None
+        cases = [
+            case[0] for case in CASES
+            if not options['only'] or any(fnmatch.fnmatchcase(case[0], pattern) for pattern in options['only'])
+        ]
+        if not cases:
+            raise CommandError('Ningún caso coincide con --only.')
+
+        entries = list(event_type_registry.entries())
+        if len(entries) < 10:
+            raise CommandError(
+                f'Se esperaban 10 tipos de evento y hay {len(entries)}. Ejecute setup_event_types primero.'
+            )
+
+        fields, campaigns = self._seed_catalogs(max(1, options['fields']), max(1, options['campaigns']))
+        target = {'field_id': fields[0].pk, 'campaign_id': campaigns[0].pk}
+        results = []
+        context = multiprocessing.get_context('spawn')
+
+        try:
+            for scale in sorted(set(options['events'])):
+                self._seed_events(scale, fields, campaigns, entries)
+                sizes = {
+                    'field': Event.objects.filter(field_id=target['field_id']).count(),
+                    'campaign': Event.objects.filter(campaign_id=target['campaign_id']).count(),
+                    'all': Event.objects.count(),
+                }
+                self.stdout.write(
+                    f'\nEscala {scale:,} eventos (lote {sizes["field"]:,}, '
+                    f'campaña {sizes["campaign"]:,}, total {sizes["all"]:,})'
+                )
+
+                for case_name in cases:
+                    kind = next(case[1] for case in CASES if case[0] == case_name)
+                    record = {'scale': scale, 'name': case_name, 'events': sizes[kind]}
+                    if case_name.startswith('pdf.') and sizes[kind] > options['pdf_max_events']:
+                        record['status'] = 'skipped'
+                    else:
+                        with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=django.setup) as pool:
+                            record.update(pool.submit(_measure, case_name, target).result())
+                    results.append(record)
+                    self._write_record(record)
+        finally:
+            if not options['keep']:
+                self._delete_bench_data()
+
+        report = {'meta': self._meta(options), 'results': results}
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, default=str)
+            self.stdout.write(f'\nResultados guardados en {options["output"]}')
+
+        if baseline is not None:
+            regressions = self._compare(baseline, results, options['tolerance'])
+            if regressions:
+                for line in regressions:
+                    self.stderr.write(line)
+                raise CommandError(f'{len(regressions)} regresiones respecto a {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la línea base'))
+
+    def _write_record(self, record):
+        if record['status'] == 'skipped':
+            self.stdout.write(f'  {record["name"]:<48} omitido ({record["events"]:,} eventos)')
+            return
+        if record['status'] == 'error':
+            self.stdout.write(self.style.WARNING(f'  {record["name"]:<48} error: {record["error"]}'))
+            return
+        peak = f'{record["peak_rss_mb"]:7.1f} MB' if record['peak_rss_mb'] is not None else '      n/d'
+        self.stdout.write(
+            f'  {record["name"]:<48} {record["seconds"]:8.2f}s {record["queries"]:5d} consultas '
+            f'pico RSS {peak} {record["output_bytes"] / (1024 * 1024):8.1f} MB'
+        )
+
+    def _meta(self, options):
+        return {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'cpu_count': multiprocessing.cpu_count(),
+            'fields': options['fields'],
+            'campaigns': options['campaigns'],
+            'tolerance': options['tolerance'],
+        }
+
+    def _load_baseline(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'No se pudo leer la línea base {path}: {e}')
+
+    def _compare(self, baseline, results, tolerance):
+        """
+        Compara los resultados con una ejecución anterior.
+
+        Se considera regresión: más tiempo o más pico de RSS que el anterior
+        por encima de la tolerancia, cualquier consulta adicional, o un caso
+        que antes funcionaba y ahora falla.
+
+        Returns:
+            list: Descripción de cada regresión
+        """
+        previous = {(record['scale'], record['name']): record for record in baseline.get('results', [])}
+        regressions = []
+        for record in results:
+            before = previous.get((record['scale'], record['name']))
+            if before is None or before['status'] != 'ok' or record['status'] == 'skipped':
+                continue
+            label = f'{record["name"]} ({record["scale"]:,} eventos)'
+            if record['status'] != 'ok':
+                regressions.append(f'{label}: falla ({record.get("error")})')
+                continue
+            if (record['seconds'] > before['seconds'] * (1 + tolerance)
+                    and record['seconds'] - before['seconds'] > MIN_SECONDS_DELTA):
+                regressions.append(f'{label}: tiempo {before["seconds"]:.2f}s -> {record["seconds"]:.2f}s')
+            if record['queries'] > before['queries']:
+                regressions.append(f'{label}: consultas {before["queries"]} -> {record["queries"]}')
+            if (record['peak_rss_mb'] is not None and before.get('peak_rss_mb') is not None
+                    and record['peak_rss_mb'] > before['peak_rss_mb'] * (1 + tolerance) + MIN_RSS_DELTA_MB):
+                regressions.append(
+                    f'{label}: pico RSS {before["peak_rss_mb"]:.1f} MB -> {record["peak_rss_mb"]:.1f} MB'
+                )
+        return regressions
+
+    def _seed_catalogs(self, field_count, campaign_count):
+        """Lotes y campañas sintéticos (se reutilizan si ya existen)."""
+        fields = []
+        for i in range(1, field_count + 1):
+            field, _ = Field.objects.get_or_create(
+                code=f'{BENCH_CODE_PREFIX}{i:03d}',
+                defaults={'name': f'Lote Benchmark {i:03d}', 'surface_ha': Decimal('1.5000')},
+            )
+            fields.append(field)
+
+        campaigns = []
+        year = timezone.localdate().year - campaign_count
+        for i in range(1, campaign_count + 1):
+            campaign, _ = Campaign.objects.get_or_create(
+                name=f'{BENCH_CAMPAIGN_PREFIX}Campaña {i}',
+                defaults={
+                    'season': f'Temporada {year + i}',
+                    'start_date': date(year + i, 1, 1),
+                    'end_date': date(year + i, 12, 31),
+                },
+            )
+            campaigns.append(campaign)
+        return fields, campaigns
+
+    def _seed_events(self, total, fields, campaigns, entries):
+        """
+        Completa `total` eventos sintéticos repartidos entre lotes, campañas y
+        tipos de evento.
+        """
+        existing = Event.objects.filter(field__code__startswith=BENCH_CODE_PREFIX).count()
+        if existing >= total:
+            return
+
+        self.stdout.write(f'Creando {total - existing:,} eventos sintéticos...')
+        using = router.db_for_write(Event)
+        start = time.perf_counter()
+        for batch_start in range(existing, total, SEED_BATCH_SIZE):
+            by_model = {}
+            for index in range(batch_start, min(batch_start + SEED_BATCH_SIZE, total)):
+                entry = entries[index % len(entries)]
+                event = self._build_event(index, entry, fields, campaigns)
+                by_model.setdefault(entry.model, []).append(event)
+
+            all_events = [event for events in by_model.values() for event in events]
+            with transaction.atomic(using=using):
+                _insert_local_rows(Event, all_events, using)
+                for model, events in by_model.items():
+                    if model is Event:
+                        continue
+                    parent_link = model._meta.get_ancestor_link(Event)
+                    for event in events:
+                        setattr(event, parent_link.attname, event.id)
+                    _insert_local_rows(model, events, using)
+                record_events_created(all_events, using)
+        self.stdout.write(f'Eventos creados en {time.perf_counter() - start:.1f}s')
+
+    def _build_event(self, index, entry, fields, campaigns):
+        field = fields[index % len(fields)]
+        campaign = campaigns[(index // len(fields)) % len(campaigns)]
+        # Eventos repartidos a lo largo del año de la campaña, a distintas horas
+        moment = timezone.make_aware(
+            datetime.combine(campaign.start_date, datetime.min.time())
+            + timedelta(minutes=(index * 37) % (364 * 24 * 60))
+        )
+        values = {
+            typed_field.name: _field_value(typed_field, index, moment)
+            for typed_field in entry.model._meta.local_concrete_fields
+            if not typed_field.primary_key
+        } if entry.model is not Event else {}
+        return entry.model(
+            id=uuid.uuid4(),
+            event_type=entry.event_type,
+            field=field,
+            campaign=campaign,
+            timestamp=moment,
+            observations=f'Evento sintético {index}' if index % 3 else '',
+            **values,
+        )
+
+    def _delete_bench_data(self):
+        """
+        Elimina los datos sintéticos con DELETE directos (sin señales, de modo
+        que no quedan registros de borrado para la exportación incremental).
+
+        Returns:
+            int: Eventos eliminados
+        """
+        bench_events = {'field__code__startswith': BENCH_CODE_PREFIX}
+        with transaction.atomic():
+            for entry in event_type_registry.entries():
+                if entry.model is not Event:
+                    entry.model._base_manager.filter(**bench_events)._raw_delete(entry.model._base_manager.db)
+            deleted = Event._base_manager.filter(**bench_events)._raw_delete(Event._base_manager.db)
+            EventDailyCount.objects.filter(**bench_events)._raw_delete(EventDailyCount.objects.db)
+            Field.objects.filter(code__startswith=BENCH_CODE_PREFIX).delete()
+            Campaign.objects.filter(name__startswith=BENCH_CAMPAIGN_PREFIX).delete()
+        return deleted
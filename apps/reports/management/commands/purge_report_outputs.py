@@ -0,0 +1,31 @@
+"""
+Comando de Django para depurar los reportes entregados desde disco.
+
+Elimina de `REPORT_OUTPUT_DIR` los archivos más antiguos que
+`REPORT_OUTPUT_MAX_AGE_MINUTES`. Los workers ya lo hacen al generar reportes;
+este comando sirve para programarlo (cron) en servidores con poco tráfico.
+
+Uso:
+    python manage.py purge_report_outputs
+    python manage.py purge_report_outputs --minutes 10
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.reports.output import cleanup_report_outputs, output_dir
+
+
+class Command(BaseCommand):
+    help = 'Elimina los reportes generados más antiguos que la retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            default=settings.REPORT_OUTPUT_MAX_AGE_MINUTES,
+            help=f'Antigüedad máxima en minutos (por defecto {settings.REPORT_OUTPUT_MAX_AGE_MINUTES})',
+        )
+
+    def handle(self, *args, **options):
+        removed = cleanup_report_outputs(max(0, options['minutes']))
+        self.stdout.write(self.style.SUCCESS(f'✓ {removed} reportes eliminados de {output_dir()}'))
@@ -0,0 +1,44 @@
+"""
+Comando de Django para administrar la caché en disco de reportes PDF.
+
+Uso:
+    python manage.py report_cache           # Muestra archivos y tamaño
+    python manage.py report_cache --evict   # Aplica el límite de tamaño
+    python manage.py report_cache --clear   # Elimina todos los reportes en caché
+"""
+from django.core.management.base import BaseCommand
+
+from apps.reports.cache import pdf_report_cache
+
+
+class Command(BaseCommand):
+    help = 'Muestra o limpia la caché en disco de reportes PDF'
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            '--evict',
+            action='store_true',
+            help='Elimina los reportes menos usados hasta quedar dentro del límite',
+        )
+        group.add_argument(
+            '--clear',
+            action='store_true',
+            help='Elimina todos los reportes en caché',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            removed = pdf_report_cache.clear()
+            self.stdout.write(self.style.SUCCESS(f'✓ {removed} reportes eliminados de la caché'))
+        elif options['evict']:
+            removed = pdf_report_cache.evict()
+            self.stdout.write(self.style.SUCCESS(f'✓ {removed} reportes eliminados por límite de tamaño'))
+
+        stats = pdf_report_cache.stats()
+        self.stdout.write(f'Directorio: {pdf_report_cache.directory}')
+        self.stdout.write(f'Estado: {"activa" if stats["enabled"] else "desactivada"}')
+        self.stdout.write(
+            f'Reportes en caché: {stats["entries"]} '
+            f'({stats["size_bytes"] / (1024 * 1024):.1f} MB de {stats["max_bytes"] / (1024 * 1024):.0f} MB)'
+        )
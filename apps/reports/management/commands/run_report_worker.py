@@ -0,0 +1,133 @@
+"""
+Comando de Django que procesa los trabajos de reportes en segundo plano.
+
+Toma los trabajos pendientes (`ReportJob`) y genera cada reporte en un pool de
+procesos, de modo que las peticiones web solo encolan el trabajo y responden
+de inmediato. Al iniciar y cada minuto marca como fallidos los trabajos "en
+proceso" desde hace más de `REPORT_JOB_TIMEOUT_MINUTES` (un worker que se
+detuvo) y elimina los trabajos terminados hace más de
+`REPORT_JOB_RETENTION_DAYS` días junto con sus archivos.
+
+Uso:
+    python manage.py run_report_worker
+    python manage.py run_report_worker --processes 4 --poll-interval 1
+    python manage.py run_report_worker --once  # Procesa lo pendiente y termina
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.reports.jobs import (
+    claim_pending_jobs,
+    fail_report_job,
+    fail_stale_jobs,
+    purge_report_jobs,
+    run_report_job,
+)
+from apps.reports.rendering import init_report_process
+
+# Segundos entre revisiones de trabajos perdidos y antiguos
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = 'Procesa los trabajos de reportes pendientes en un pool de procesos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=max(1, min(4, os.cpu_count() or 1)),
+            help='Número de procesos generadores (por defecto hasta 4)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Segundos entre consultas de trabajos pendientes (por defecto 2)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa los trabajos pendientes y termina',
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        poll_interval = max(0.1, options['poll_interval'])
+        once = options['once']
+
+        self.stdout.write(self.style.SUCCESS(f'🧾 Worker de reportes iniciado ({processes} procesos)'))
+        self._maintenance()
+
+        try:
+            while True:
+                finished = self._run_pool(processes, poll_interval, once)
+                if finished:
+                    break
+                self.stdout.write(self.style.WARNING('⚠ Un proceso del pool terminó inesperadamente; reiniciando'))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nWorker detenido'))
+
+    def _run_pool(self, processes, poll_interval, once):
+        """
+        Ejecuta trabajos hasta terminar (`--once`) o hasta que el pool se rompa.
+
+        Returns:
+            bool: False si el pool se rompió y debe recrearse
+        """
+        # Los procesos se crean con "spawn" para no heredar las conexiones a la
+        # base de datos del proceso principal; cada uno precarga el renderizador PDF
+        context = multiprocessing.get_context('spawn')
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=init_report_process) as pool:
+            while True:
+                for future in [future for future in running if future.done()]:
+                    job_id = running.pop(future)
+                    try:
+                        job_status = future.result()
+                    except BrokenProcessPool as e:
+                        fail_report_job(job_id, f'El proceso generador terminó inesperadamente: {e}')
+                        for other_job_id in running.values():
+                            fail_report_job(other_job_id, 'El proceso generador terminó inesperadamente')
+                        return False
+                    except Exception as e:
+                        fail_report_job(job_id, e)
+                        job_status = 'failed'
+                    self.stdout.write(f'   • Trabajo {job_id}: {job_status}')
+
+                if time.monotonic() - self._last_maintenance >= MAINTENANCE_INTERVAL:
+                    self._maintenance()
+
+                claimed = []
+                if len(running) < processes:
+                    claimed = claim_pending_jobs(processes - len(running))
+                    for job_id in claimed:
+                        running[pool.submit(run_report_job, job_id)] = job_id
+
+                if once and not running and not claimed:
+                    return True
+
+                # No mantener la conexión abierta entre consultas
+                connections.close_all()
+                time.sleep(poll_interval)
+
+    def _maintenance(self):
+        """Marca como fallidos los trabajos perdidos y elimina los antiguos."""
+        self._last_maintenance = time.monotonic()
+        stale = fail_stale_jobs(settings.REPORT_JOB_TIMEOUT_MINUTES)
+        if stale:
+            self.stdout.write(self.style.WARNING(
+                f'⚠ {stale} trabajos en proceso por más de {settings.REPORT_JOB_TIMEOUT_MINUTES} '
+                'minutos marcados como fallidos'
+            ))
+        purged = purge_report_jobs(settings.REPORT_JOB_RETENTION_DAYS)
+        if purged:
+            self.stdout.write(f'   • {purged} trabajos antiguos eliminados')
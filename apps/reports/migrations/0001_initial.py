@@ -0,0 +1,139 @@
+# Generated by Django 4.2.17 on 2026-10-17 02:40
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "report_type",
+                    models.CharField(
+                        choices=[
+                            ("field_traceability", "Trazabilidad por Lote"),
+                            ("campaign_traceability", "Trazabilidad por Campaña"),
+                        ],
+                        max_length=50,
+                        verbose_name="Tipo de Reporte",
+                    ),
+                ),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[("pdf", "PDF"), ("excel", "Excel"), ("csv", "CSV")],
+                        default="pdf",
+                        max_length=10,
+                        verbose_name="Formato",
+                    ),
+                ),
+                (
+                    "parameters",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Parámetros"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pendiente"),
+                            ("running", "En proceso"),
+                            ("completed", "Completado"),
+                            ("failed", "Fallido"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0,
+                        validators=[
+                            django.core.validators.MinValueValidator(0),
+                            django.core.validators.MaxValueValidator(100),
+                        ],
+                        verbose_name="Progreso (%)",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, upload_to="reports/%Y/%m/", verbose_name="Archivo"
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name="Nombre del Archivo"
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Tipo MIME"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Inicio"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Fin"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="report_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Solicitado Por",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Trabajo de Reporte",
+                "verbose_name_plural": "Trabajos de Reportes",
+                "db_table": "report_jobs",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="report_jobs_status_a52eae_idx",
+                    ),
+                    models.Index(
+                        fields=["created_by", "-created_at"],
+                        name="report_jobs_created_534561_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import models
+from django.conf import settings
+from django.core.validators import MinValueValidator, MaxValueValidator
+import uuid
+
+
+class ReportJob(models.Model):
+    """Trabajo de generación de reporte en segundo plano."""
+    REPORT_TYPES = [
+        ('field_traceability', 'Trazabilidad por Lote'),
+        ('campaign_traceability', 'Trazabilidad por Campaña'),
+    ]
+
+    FORMATS = [
+        ('pdf', 'PDF'),
+        ('excel', 'Excel'),
+        ('csv', 'CSV'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    STATUSES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_RUNNING, 'En proceso'),
+        (STATUS_COMPLETED, 'Completado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report_type = models.CharField(max_length=50, choices=REPORT_TYPES, verbose_name="Tipo de Reporte")
+    format = models.CharField(max_length=10, choices=FORMATS, default='pdf', verbose_name="Formato")
+    parameters = models.JSONField(default=dict, blank=True, verbose_name="Parámetros")
+    status = models.CharField(max_length=20, choices=STATUSES, default=STATUS_PENDING, verbose_name="Estado")
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+        verbose_name="Progreso (%)"
+    )
+    file = models.FileField(upload_to='reports/%Y/%m/', blank=True, verbose_name="Archivo")
+    filename = models.CharField(max_length=255, blank=True, verbose_name="Nombre del Archivo")
+    content_type = models.CharField(max_length=100, blank=True, verbose_name="Tipo MIME")
+    error = models.TextField(blank=True, verbose_name="Error")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs',
+        verbose_name="Solicitado Por"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Inicio")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Fin")
+
+    class Meta:
+        db_table = 'report_jobs'
+        ordering = ['-created_at']
+        verbose_name = "Trabajo de Reporte"
+        verbose_name_plural = "Trabajos de Reportes"
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['created_by', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} ({self.format}) - {self.get_status_display()}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
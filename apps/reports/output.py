@@ -0,0 +1,164 @@
+"""
+Entrega de reportes generados desde disco.
+
+Los reportes (PDF y Excel) se escriben en `REPORT_OUTPUT_DIR` y la respuesta
+lee el archivo por bloques, de modo que el worker no conserva el reporte en
+memoria mientras el cliente lo descarga (conexiones lentas en campo). Con un
+proxy delante (`REPORT_SENDFILE`) la respuesta solo lleva la cabecera
+`X-Sendfile` (Apache, lighttpd) o `X-Accel-Redirect` (nginx) y el proxy envía
+el archivo; el worker queda libre de inmediato.
+
+Para nginx, `REPORT_SENDFILE_URL` debe apuntar a una location interna con
+alias al directorio de salida, p. ej.::
+
+    location /_reports/ {
+        internal;
+        alias /app/cache/report_output/;
+    }
+
+Los archivos se eliminan cuando tienen más de `REPORT_OUTPUT_MAX_AGE_MINUTES`
+minutos: al guardar un reporte (como máximo una vez por minuto por proceso) y
+con `python manage.py purge_report_outputs`. No se eliminan al terminar la
+respuesta porque con `REPORT_SENDFILE` el proxy los lee después, y en Windows
+no se puede borrar un archivo abierto.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+logger = logging.getLogger(__name__)
+
+SENDFILE_HEADERS = {
+    'x-sendfile': 'X-Sendfile',
+    'x-accel-redirect': 'X-Accel-Redirect',
+}
+
+# Segundos mínimos entre limpiezas automáticas del directorio en un proceso
+CLEANUP_INTERVAL_SECONDS = 60
+
+_last_cleanup = 0.0
+_cleanup_lock = threading.Lock()
+
+
+def output_dir():
+    return Path(settings.REPORT_OUTPUT_DIR)
+
+
+def save_report_output(output, suffix=''):
+    """
+    Escribe un reporte en el directorio de salida y cierra el original.
+
+    Args:
+        output: Archivo binario o BytesIO posicionado al inicio
+        suffix: Extensión del archivo (p. ej. '.pdf')
+
+    Returns:
+        Path: Ruta del archivo guardado
+    """
+    directory = output_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{uuid.uuid4().hex}{suffix}'
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp, output:
+            shutil.copyfileobj(output, tmp)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    _maybe_cleanup()
+    return path
+
+
+def report_file_response(output, filename, content_type):
+    """
+    Guarda un reporte en disco y lo entrega como descarga.
+
+    Args:
+        output: Archivo binario o BytesIO posicionado al inicio (se cierra)
+        filename: Nombre del archivo para el cliente
+        content_type: Tipo MIME
+
+    Returns:
+        HttpResponse con la cabecera del proxy o FileResponse que lee el
+        archivo por bloques
+
+    Raises:
+        ImproperlyConfigured: Si `REPORT_SENDFILE` no es un modo válido
+    """
+    path = save_report_output(output, Path(filename).suffix)
+    mode = settings.REPORT_SENDFILE.lower()
+
+    if not mode:
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+
+    if mode not in SENDFILE_HEADERS:
+        raise ImproperlyConfigured(
+            f"REPORT_SENDFILE debe ser vacío, 'x-sendfile' o 'x-accel-redirect' (no {settings.REPORT_SENDFILE!r})"
+        )
+    response_obj = HttpResponse(content_type=content_type)
+    if mode == 'x-accel-redirect':
+        response_obj[SENDFILE_HEADERS[mode]] = settings.REPORT_SENDFILE_URL.rstrip('/') + '/' + path.name
+    else:
+        response_obj[SENDFILE_HEADERS[mode]] = str(path)
+    response_obj['Content-Disposition'] = content_disposition_header(True, filename)
+    return response_obj
+
+
+def cleanup_report_outputs(max_age_minutes=None):
+    """
+    Elimina los reportes más antiguos que `max_age_minutes`.
+
+    Args:
+        max_age_minutes: Antigüedad máxima (por defecto `REPORT_OUTPUT_MAX_AGE_MINUTES`)
+
+    Returns:
+        int: Archivos eliminados
+    """
+    if max_age_minutes is None:
+        max_age_minutes = settings.REPORT_OUTPUT_MAX_AGE_MINUTES
+    directory = output_dir()
+    if not directory.exists():
+        return 0
+
+    limit = time.time() - max_age_minutes * 60
+    removed = 0
+    for path in directory.iterdir():
+        try:
+            if path.is_file() and path.stat().st_mtime < limit:
+                path.unlink()
+                removed += 1
+        except (FileNotFoundError, PermissionError):
+            # Ya eliminado por otro proceso, o todavía abierto (Windows)
+            continue
+    if removed:
+        logger.info("%s reportes antiguos eliminados de %s", removed, directory)
+    return removed
+
+
+def _maybe_cleanup():
+    global _last_cleanup
+    now = time.monotonic()
+    with _cleanup_lock:
+        if now - _last_cleanup < CLEANUP_INTERVAL_SECONDS:
+            return
+        _last_cleanup = now
+    try:
+        cleanup_report_outputs()
+    except OSError:
+        logger.exception("No se pudo limpiar el directorio de reportes")
@@ -0,0 +1,166 @@
+"""
+Renderizado de reportes PDF por secciones en paralelo.
+
+WeasyPrint maqueta un documento en un solo núcleo. Para reportes grandes el
+HTML se divide en secciones (portada/resumen y grupos de lotes), cada sección
+se convierte a PDF en un pool de procesos y los PDF se unen con pypdf. Las
+secciones se generan sin número de página; al final se estampa
+"Página X de Y" continuo sobre el documento unido, con una capa de números
+generada también con WeasyPrint (páginas vacías, rápida de maquetar).
+
+El pool se crea al primer uso y se reutiliza durante la vida del proceso.
+Cada proceso del pool carga su renderizador (`rendering.py`) al iniciar. Los
+procesos del pool no acceden a la base de datos: reciben HTML ya renderizado y
+retornan bytes.
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from .rendering import get_pdf_renderer, init_report_process
+
+# Debe coincidir con la regla @page de las hojas de estilo de los reportes
+PAGE_NUMBER_CSS = """
+@page {
+    size: A4;
+    margin: 2cm;
+    @bottom-right {
+        content: "Página " counter(page) " de " counter(pages);
+        font-size: 9pt;
+        color: #666;
+    }
+}
+"""
+
+# Quita el número de página de cada sección (se estampa después de unirlas)
+NO_PAGE_NUMBER_CSS = "@page { @bottom-right { content: none } }"
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _render_section(html_string, template_name, base_url):
+    """Convierte una sección a PDF (se ejecuta en un proceso del pool)."""
+    return get_pdf_renderer().write_pdf(
+        html_string, template_name, extra_css=[NO_PAGE_NUMBER_CSS], base_url=base_url
+    )
+
+
+def _shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def get_pool(workers):
+    """
+    Pool de procesos de renderizado del proceso actual.
+
+    Args:
+        workers: Número de procesos
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # "spawn" evita heredar conexiones a la base de datos y el estado
+            # de hilos del servidor web
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_report_process,
+            )
+            _pool_workers = workers
+        return _pool
+
+
+atexit.register(_shutdown_pool)
+
+
+def split_sections(items, weights, count):
+    """
+    Divide `items` en hasta `count` grupos contiguos de peso similar.
+
+    Args:
+        items: Lista a dividir (se conserva el orden)
+        weights: Peso de cada elemento (p. ej. número de eventos)
+        count: Número máximo de grupos
+
+    Returns:
+        list: Lista de grupos (listas no vacías)
+    """
+    count = max(1, min(count, len(items)))
+    total = sum(weights)
+    groups = []
+    current = []
+    accumulated = 0
+    for index, (item, weight) in enumerate(zip(items, weights)):
+        current.append(item)
+        accumulated += weight
+        groups_left = count - len(groups) - 1
+        items_left = len(items) - index - 1
+        if groups_left and items_left and (
+            accumulated >= total * (len(groups) + 1) / count or items_left == groups_left
+        ):
+            groups.append(current)
+            current = []
+    groups.append(current)
+    return groups
+
+
+def _page_number_layer(total_pages):
+    """PDF de `total_pages` páginas vacías con solo el número de página."""
+    breaks = '<div style="break-before: page"></div>' * (total_pages - 1)
+    return get_pdf_renderer().write_pdf(
+        f'<html><body><div></div>{breaks}</body></html>', extra_css=[PAGE_NUMBER_CSS]
+    )
+
+
+def render_sections(html_sections, template_name, workers, base_url=None):
+    """
+    Convierte secciones HTML a PDF en paralelo y las une en un solo documento.
+
+    Args:
+        html_sections: Lista de documentos HTML completos, en orden
+        template_name: Template de las secciones (define las hojas de estilo)
+        workers: Número de procesos
+        base_url: URL base para recursos relativos
+
+    Returns:
+        BytesIO: PDF unido con numeración de páginas continua
+
+    Raises:
+        BrokenProcessPool: Si un proceso del pool terminó inesperadamente
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    pool = get_pool(workers)
+    futures = [pool.submit(_render_section, html, template_name, base_url) for html in html_sections]
+
+    writer = PdfWriter()
+    try:
+        for future in futures:
+            writer.append(PdfReader(BytesIO(future.result())))
+    except BrokenProcessPool:
+        # Un proceso terminó inesperadamente; el siguiente uso crea un pool nuevo
+        _shutdown_pool()
+        raise
+
+    numbers = PdfReader(BytesIO(_page_number_layer(len(writer.pages))))
+    for page, number_page in zip(writer.pages, numbers.pages):
+        page.merge_page(number_page)
+
+    output = BytesIO()
+    writer.write(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,240 @@
+"""
+Motor de renderizado PDF reutilizable.
+
+Crear un `FontConfiguration` y volver a interpretar el CSS de los templates en
+cada reporte es un costo fijo que domina en los reportes pequeños. Cada proceso
+(worker web, worker de reportes o proceso del pool de `parallel.py`) mantiene
+un solo `PDFRenderer` que, al crearse, carga las fuentes, interpreta las hojas
+de estilo y compila los templates; después cada reporte solo renderiza el HTML,
+lo maqueta y escribe el PDF.
+
+Los estilos de cada template están en un archivo `.css` con el mismo nombre
+junto al template (p. ej. `traceability_report.css`). Si el archivo cambia se
+vuelve a interpretar en el siguiente reporte.
+
+El renderizador registra el tiempo de cada fase (`html`, `layout`, `write`);
+`stats()` los resume para el proceso actual.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+# Templates que se compilan y cuyos estilos se interpretan al crear el renderizador
+REPORT_TEMPLATES = [
+    'reports/pdf/traceability_report.html',
+    'reports/pdf/campaign_traceability_report.html',
+    'reports/pdf/phytosanitary_report.html',
+]
+
+PHASES = ('html', 'layout', 'write')
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def stylesheet_path(template_name):
+    """
+    Ruta del archivo de estilos de un template.
+
+    Returns:
+        Path o None si el template no tiene archivo `.css`
+    """
+    path = Path(get_template(template_name).origin.name).with_suffix('.css')
+    return path if path.exists() else None
+
+
+class PDFRenderer:
+    """
+    Renderizador de PDF con fuentes, hojas de estilo y templates precargados.
+
+    Es seguro usarlo desde varios hilos: el estado compartido (hojas de estilo
+    y métricas) se protege con un lock y WeasyPrint no modifica los objetos
+    `CSS` ni `FontConfiguration` al maquetar.
+    """
+
+    def __init__(self, templates=REPORT_TEMPLATES):
+        from weasyprint.text.fonts import FontConfiguration
+
+        start = time.perf_counter()
+        self.font_config = FontConfiguration()
+        self._stylesheets = {}  # template -> (mtime, [CSS])
+        self._inline = {}  # texto CSS -> CSS
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.metrics = {phase: {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0} for phase in PHASES}
+
+        for template_name in templates:
+            get_template(template_name)  # Queda compilado en el cargador de templates
+            self.stylesheets(template_name)
+        self.warmup_seconds = time.perf_counter() - start
+        logger.info("Renderizador PDF listo en %.3fs (pid %s)", self.warmup_seconds, os.getpid())
+
+    def stylesheets(self, template_name):
+        """
+        Hojas de estilo interpretadas del template.
+
+        Returns:
+            list: Objetos `CSS` (vacía si el template no tiene archivo `.css`)
+        """
+        from weasyprint import CSS
+
+        path = stylesheet_path(template_name)
+        if path is None:
+            return []
+
+        mtime = path.stat().st_mtime
+        cached = self._stylesheets.get(template_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        parsed = [CSS(filename=str(path), font_config=self.font_config)]
+        with self._lock:
+            self._stylesheets[template_name] = (mtime, parsed)
+        return parsed
+
+    def inline_stylesheet(self, css_string):
+        """Objeto `CSS` de un texto fijo, interpretado una sola vez."""
+        from weasyprint import CSS
+
+        parsed = self._inline.get(css_string)
+        if parsed is None:
+            parsed = CSS(string=css_string, font_config=self.font_config)
+            with self._lock:
+                self._inline[css_string] = parsed
+        return parsed
+
+    @contextmanager
+    def _timed(self, phase):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            metric = self.metrics[phase]
+            metric['count'] += 1
+            metric['total'] += elapsed
+            metric['last'] = elapsed
+            metric['max'] = max(metric['max'], elapsed)
+
+    def render_html(self, template_name, context):
+        """
+        Renderiza el template del reporte.
+
+        Returns:
+            str: Documento HTML
+        """
+        with self._timed('html'):
+            return get_template(template_name).render(context)
+
+    def write_pdf(self, html_string, template_name=None, extra_css=(), base_url=None):
+        """
+        Maqueta el HTML con las hojas de estilo del template y escribe el PDF.
+
+        Args:
+            html_string: Documento HTML
+            template_name: Template de origen (define las hojas de estilo)
+            extra_css: Textos CSS adicionales, aplicados después de los del template
+            base_url: URL base para recursos relativos
+
+        Returns:
+            bytes: Contenido del PDF
+        """
+        from weasyprint import HTML
+
+        stylesheets = self.stylesheets(template_name) if template_name else []
+        stylesheets = stylesheets + [self.inline_stylesheet(css) for css in extra_css]
+
+        with self._timed('layout'):
+            document = HTML(string=html_string, base_url=base_url).render(
+                stylesheets=stylesheets, font_config=self.font_config
+            )
+        with self._timed('write'):
+            pdf = document.write_pdf()
+        with self._lock:
+            self.renders += 1
+        return pdf
+
+    def render(self, template_name, context):
+        """
+        Genera el PDF de un template.
+
+        Args:
+            template_name: Template del reporte
+            context: Contexto del template
+
+        Returns:
+            BytesIO: Buffer con el PDF generado
+        """
+        html_string = self.render_html(template_name, context)
+        pdf_buffer = BytesIO(self.write_pdf(html_string, template_name))
+        self._log_last(template_name)
+        return pdf_buffer
+
+    def _log_last(self, template_name):
+        logger.debug(
+            "PDF %s: html %.3fs, maquetación %.3fs, escritura %.3fs",
+            template_name,
+            self.metrics['html']['last'],
+            self.metrics['layout']['last'],
+            self.metrics['write']['last'],
+        )
+
+    def stats(self):
+        """
+        Tiempos de renderizado del proceso actual.
+
+        Returns:
+            dict: Reportes generados, tiempo de precarga y, por fase, número de
+                mediciones, total, promedio, máximo y último (en segundos)
+        """
+        with self._lock:
+            phases = {
+                phase: {
+                    'count': metric['count'],
+                    'total_seconds': round(metric['total'], 4),
+                    'avg_seconds': round(metric['total'] / metric['count'], 4) if metric['count'] else None,
+                    'max_seconds': round(metric['max'], 4),
+                    'last_seconds': round(metric['last'], 4),
+                }
+                for phase, metric in self.metrics.items()
+            }
+            return {
+                'pid': os.getpid(),
+                'renders': self.renders,
+                'warmup_seconds': round(self.warmup_seconds, 4),
+                'stylesheets': sorted(self._stylesheets),
+                'phases': phases,
+            }
+
+
+def get_pdf_renderer():
+    """
+    Renderizador PDF del proceso actual (se crea en el primer uso).
+
+    Returns:
+        PDFRenderer
+    """
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = PDFRenderer()
+    return _renderer
+
+
+def init_report_process():
+    """
+    Inicializador de los procesos de los pools de reportes: configura Django y
+    crea el renderizador antes de recibir el primer trabajo.
+    """
+    import django
+
+    django.setup()
+    get_pdf_renderer()
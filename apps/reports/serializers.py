@@ -1,8 +1,11 @@
 """
 Serializers for Reports API.
 """
+from django.urls import reverse
 from rest_framework import serializers
 
+from .models import ReportJob
+
 
 class FieldTraceabilityReportSerializer(serializers.Serializer):
     """Serializer para parámetros del reporte de trazabilidad por lote."""
@@ -37,6 +40,18 @@ class FieldTraceabilityReportSerializer(serializers.Serializer):
         default='pdf',
         help_text="Formato de exportación: pdf, excel o csv"
     )
+    background = serializers.BooleanField(
+        default=False,
+        help_text="Generar en segundo plano (202 con el trabajo); por defecto retorna el archivo directamente"
+    )
+    wide = serializers.BooleanField(
+        default=False,
+        help_text="Excel/CSV: incluir las columnas específicas de cada tipo de evento (riego, cosecha, etc.)"
+    )
+    sheet_per_type = serializers.BooleanField(
+        default=False,
+        help_text="Excel: una hoja por tipo de evento, cada una con sus columnas específicas"
+    )
 
 
 class CampaignTraceabilityReportSerializer(serializers.Serializer):
@@ -63,6 +78,74 @@ class CampaignTraceabilityReportSerializer(serializers.Serializer):
         default='pdf',
         help_text="Formato de exportación: pdf, excel o csv"
     )
+    background = serializers.BooleanField(
+        default=False,
+        help_text="Generar en segundo plano (202 con el trabajo); por defecto retorna el archivo directamente"
+    )
+    wide = serializers.BooleanField(
+        default=False,
+        help_text="Excel/CSV: incluir las columnas específicas de cada tipo de evento (riego, cosecha, etc.)"
+    )
+    sheet_per_type = serializers.BooleanField(
+        default=False,
+        help_text="Excel: una hoja por tipo de evento, cada una con sus columnas específicas"
+    )
+
+
+class EventDeltaQuerySerializer(serializers.Serializer):
+    """Serializer para los parámetros de la exportación incremental de eventos."""
+    
+    since = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Cursor de la respuesta anterior (vacío para empezar desde el inicio)"
+    )
+    limit = serializers.IntegerField(
+        default=1000,
+        min_value=1,
+        max_value=10000,
+        help_text="Máximo de eventos y de borrados por respuesta (1-10000)"
+    )
+    wide = serializers.BooleanField(
+        default=False,
+        help_text="Incluir las columnas específicas de cada tipo de evento"
+    )
+
+
+class PHIComplianceQuerySerializer(serializers.Serializer):
+    """Serializer para los parámetros del cumplimiento de intervalos de seguridad."""
+    
+    field_id = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text="ID del lote (opcional)"
+    )
+    campaign_id = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text="ID de la campaña de las cosechas (opcional)"
+    )
+    field_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=True,
+        help_text="IDs de lotes (opcional, se repite el parámetro: field_ids=...&field_ids=...)"
+    )
+    date_from = serializers.DateField(
+        required=False,
+        allow_null=True,
+        help_text="Fecha de inicio de las cosechas (opcional, formato: YYYY-MM-DD)"
+    )
+    date_to = serializers.DateField(
+        required=False,
+        allow_null=True,
+        help_text="Fecha de fin de cosechas y aplicaciones (opcional, formato: YYYY-MM-DD)"
+    )
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError({'date_to': 'Debe ser posterior a date_from'})
+        return attrs
 
 
 class ReportMetadataSerializer(serializers.Serializer):
@@ -75,3 +158,45 @@ class ReportMetadataSerializer(serializers.Serializer):
         help_text="Formatos disponibles"
     )
     endpoint = serializers.CharField(help_text="Endpoint de la API")
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Serializer para el estado de un trabajo de reporte en segundo plano."""
+    
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_url = serializers.SerializerMethodField(help_text="URL para consultar el estado")
+    download_url = serializers.SerializerMethodField(
+        help_text="URL de descarga (null mientras el reporte no esté listo)"
+    )
+    
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'report_type',
+            'format',
+            'parameters',
+            'status',
+            'status_display',
+            'progress',
+            'filename',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'status_url',
+            'download_url',
+        ]
+        read_only_fields = fields
+    
+    def _absolute_url(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_status_url(self, obj) -> str:
+        return self._absolute_url(reverse('reports-api:report-job-detail', args=[obj.pk]))
+    
+    def get_download_url(self, obj) -> str:
+        if obj.status != ReportJob.STATUS_COMPLETED:
+            return None
+        return self._absolute_url(reverse('reports-api:report-job-download', args=[obj.pk]))
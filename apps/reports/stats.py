@@ -0,0 +1,114 @@
+"""
+Estadísticas de reportes.
+
+`report_stats()` calcula en una sola consulta GROUP BY (por lote y tipo de
+evento) todos los conteos que muestran los reportes PDF y Excel para un
+conjunto de filtros. Sin filtros de fecha la consulta se hace sobre la tabla de
+resumen `EventDailyCount`; con filtros de fecha, sobre `events`, para respetar
+la hora exacta de los límites.
+"""
+from collections import Counter
+
+from django.db.models import Count, Sum
+
+from apps.events.models import Event, EventDailyCount
+from apps.events.registry import event_type_registry
+
+
+def counts_by_type_name(counts):
+    """
+    Convierte conteos por ID de tipo de evento en conteos por nombre.
+
+    Args:
+        counts: dict {event_type_id: total}
+
+    Returns:
+        dict: {nombre del tipo: total}, en el orden de los tipos de evento
+    """
+    by_type = {}
+    for entry in event_type_registry.entries():
+        if counts.get(entry.event_type.pk):
+            by_type[entry.event_type.name] = counts[entry.event_type.pk]
+    return by_type
+
+
+def _filters(field_id, campaign_id, field_ids, event_types):
+    filters = {}
+    if field_id:
+        filters['field_id'] = field_id
+    if campaign_id:
+        filters['campaign_id'] = campaign_id
+    if field_ids:
+        filters['field_id__in'] = field_ids
+    if event_types:
+        filters['event_type_id__in'] = event_types
+    return filters
+
+
+def _grouped_rows(filters, date_from, date_to):
+    """Filas (field_id, nombre del lote, event_type_id, total)."""
+    columns = ('field_id', 'field__name', 'event_type_id')
+
+    if date_from or date_to:
+        events = Event.objects.filter(**filters)
+        if date_from:
+            events = events.filter(timestamp__gte=date_from)
+        if date_to:
+            events = events.filter(timestamp__lte=date_to)
+        return events.order_by().values_list(*columns).annotate(total=Count('pk'))
+
+    return (
+        EventDailyCount.objects.filter(**filters)
+        .order_by()
+        .values_list(*columns)
+        .annotate(total=Sum('count'))
+    )
+
+
+def report_stats(field_id=None, campaign_id=None, field_ids=None, event_types=None,
+                 date_from=None, date_to=None):
+    """
+    Calcula las estadísticas de un reporte con una sola consulta.
+
+    Args:
+        field_id: ID del lote (opcional)
+        campaign_id: ID de la campaña (opcional)
+        field_ids: Lista de IDs de lotes (opcional)
+        event_types: Lista de tipos de evento (opcional)
+        date_from: Fecha/hora de inicio (opcional)
+        date_to: Fecha/hora de fin (opcional)
+
+    Returns:
+        dict: {
+            'total': total de eventos,
+            'by_type': {nombre del tipo: total},
+            'by_field': [{'field_id', 'field_name', 'total', 'by_type'}, ...]
+                ordenado por nombre del lote,
+        }
+    """
+    rows = _grouped_rows(_filters(field_id, campaign_id, field_ids, event_types), date_from, date_to)
+
+    type_counts = Counter()
+    field_names = {}
+    field_type_counts = {}
+    for row_field_id, field_name, event_type_id, total in rows:
+        type_counts[event_type_id] += total
+        field_names[row_field_id] = field_name
+        field_type_counts.setdefault(row_field_id, Counter())[event_type_id] += total
+
+    by_field = [
+        {
+            'field_id': row_field_id,
+            'field_name': field_names[row_field_id],
+            'total': sum(counts.values()),
+            'by_type': counts_by_type_name(counts),
+        }
+        for row_field_id, counts in field_type_counts.items()
+    ]
+    by_field.sort(key=lambda item: item['field_name'])
+
+    return {
+        'total': sum(type_counts.values()),
+        'by_type': counts_by_type_name(type_counts),
+        'by_field': by_field,
+    }
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from .typed import merge_typed_rows
+
+
+def _group(event_type_id, *names):
+    return SimpleNamespace(
+        event_type=SimpleNamespace(pk=event_type_id),
+        fields=[SimpleNamespace(name=name) for name in names],
+    )
+
+
+class MergeTypedRowsTests(SimpleTestCase):
+    """Combinación de las filas base con las columnas de cada tipo."""
+
+    def setUp(self):
+        self.irrigation = _group('riego', 'metodo')
+        self.harvest = _group('cosecha', 'kg', 'calidad')
+        self.typed = {
+            'riego': {'a': ('goteo',), 'b': ('aspersion',), 'c': ('goteo',), 'd': ('surco',)},
+            'cosecha': {'h': (120, 'A')},
+        }
+        self.fetched = []
+
+    def fetch(self, group, ids):
+        self.fetched.append((group.event_type.pk, list(ids)))
+        rows = self.typed[group.event_type.pk]
+        return [(event_id, *rows[event_id]) for event_id in ids if event_id in rows]
+
+    def merge(self, rows, chunk_size=2000):
+        return list(merge_typed_rows(rows, [self.irrigation, self.harvest], self.fetch, chunk_size))
+
+    def test_typed_columns_follow_their_event(self):
+        rows = [('a', 'riego', ('A',)), ('h', 'cosecha', ('H',)), ('x', 'nota', ('X',))]
+
+        self.assertEqual(self.merge(rows), [
+            ('A', 'goteo', None, None),
+            ('H', None, 120, 'A'),
+            ('X', None, None, None),
+        ])
+
+    def test_child_row_missing_from_base_does_not_stall_later_rows(self):
+        # 'b' se creó después de leer las filas base
+        rows = [('a', 'riego', ('A',)), ('c', 'riego', ('C',)), ('d', 'riego', ('D',))]
+
+        self.assertEqual(self.merge(rows, chunk_size=2), [
+            ('A', 'goteo', None, None),
+            ('C', 'goteo', None, None),
+            ('D', 'surco', None, None),
+        ])
+
+    def test_base_row_without_child_row_exports_blank_columns(self):
+        # 'z' se borró después de leer las filas base
+        rows = [('a', 'riego', ('A',)), ('z', 'riego', ('Z',)), ('d', 'riego', ('D',))]
+
+        self.assertEqual(self.merge(rows), [
+            ('A', 'goteo', None, None),
+            ('Z', None, None, None),
+            ('D', 'surco', None, None),
+        ])
+
+    def test_child_rows_are_read_per_chunk_and_type(self):
+        rows = [('a', 'riego', ('A',)), ('h', 'cosecha', ('H',)), ('c', 'riego', ('C',))]
+
+        self.merge(rows, chunk_size=2)
+
+        self.assertEqual(self.fetched, [('riego', ['a']), ('cosecha', ['h']), ('riego', ['c'])])
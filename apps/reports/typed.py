@@ -0,0 +1,140 @@
+"""
+Columnas específicas de cada tipo de evento para las exportaciones.
+
+Cada tipo de evento con modelo propio (`IrrigationEvent`, `HarvestEvent`,
+etc.) guarda sus datos agronómicos en una tabla hija. Las exportaciones
+"anchas" agregan esas columnas a las columnas base de `Event`:
+
+- Un solo listado (CSV o una hoja de Excel): el cursor base se recorre en
+  bloques y, por cada bloque, se leen de cada tabla hija solo las filas de sus
+  IDs (`pk__in`) y se combinan por ID (`merge_typed_rows()`). Cada bloque se
+  resuelve por separado, así que un evento creado o borrado mientras se
+  exporta solo afecta a su propia fila; nada se carga completo en memoria.
+- Una hoja de Excel por tipo: cada hoja se llena con una consulta sobre el
+  modelo del tipo.
+
+Los valores se exportan sin formato (números, fechas, códigos de opción y
+True/False).
+"""
+from itertools import islice
+
+from apps.events.models import Event
+from apps.events.registry import event_type_registry
+
+
+class TypedColumns:
+    """
+    Columnas específicas de un tipo de evento.
+
+    Attributes:
+        event_type: Instancia de EventType
+        model: Modelo del tipo (Event si el tipo no tiene modelo propio)
+        fields: Campos propios del modelo (sin el enlace a Event)
+    """
+
+    def __init__(self, event_type, model):
+        self.event_type = event_type
+        self.model = model
+        self.fields = [] if model is Event else [
+            field for field in model._meta.local_concrete_fields if not field.primary_key
+        ]
+
+    def __repr__(self):
+        return f'<TypedColumns {self.event_type.name}: {len(self.fields)} columnas>'
+
+    @property
+    def prefix(self):
+        """Prefijo de las columnas en el listado ancho (p. ej. 'irrigation')."""
+        return self.model._meta.model_name.removesuffix('event')
+
+    @property
+    def names(self):
+        """Nombres de los campos, para `values_list()`."""
+        return [field.name for field in self.fields]
+
+    def columns(self):
+        """Nombres de columna CSV del listado ancho (p. ej. 'irrigation_metodo')."""
+        return [f'{self.prefix}_{field.name}' for field in self.fields]
+
+    def headers(self, prefixed=True):
+        """
+        Encabezados de Excel.
+
+        Args:
+            prefixed: Antepone el nombre del tipo de evento (listado ancho)
+
+        Returns:
+            list: p. ej. 'Aplicación de Riego: Método de Riego'
+        """
+        if not prefixed:
+            return [str(field.verbose_name) for field in self.fields]
+        return [f'{self.event_type.name}: {field.verbose_name}' for field in self.fields]
+
+
+def typed_column_groups(event_types=None, include_base=False):
+    """
+    Grupos de columnas de los tipos de evento, en el orden del registro.
+
+    Args:
+        event_types: IDs de tipos de evento a incluir (opcional, todos si no se especifica)
+        include_base: Incluye los tipos sin modelo propio (sin columnas)
+
+    Returns:
+        list: Instancias de TypedColumns
+    """
+    selected = {str(event_type) for event_type in event_types} if event_types else None
+    groups = []
+    for entry in event_type_registry.entries():
+        if selected is not None and str(entry.event_type.pk) not in selected:
+            continue
+        if entry.model is Event and not include_base:
+            continue
+        groups.append(TypedColumns(entry.event_type, entry.model))
+    return groups
+
+
+def merge_typed_rows(rows, groups, fetch, chunk_size=2000):
+    """
+    Agrega a cada fila base las columnas específicas de su tipo.
+
+    Args:
+        rows: Iterable de (event_id, event_type_id, fila base)
+        groups: Lista de TypedColumns
+        fetch: Función que recibe un TypedColumns y una lista de IDs y retorna
+            un iterable de (event_id, *valores) de esos eventos
+        chunk_size: Filas base por bloque
+
+    Yields:
+        tuple: Fila base seguida de las columnas de todos los grupos, en el
+            orden de `groups` (vacías si no son del tipo del evento o si la
+            fila del tipo ya no existe)
+    """
+    width = 0
+    offsets = {}
+    for group in groups:
+        offsets[group.event_type.pk] = (group, width)
+        width += len(group.fields)
+
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        ids_by_type = {}
+        for event_id, event_type_id, _ in chunk:
+            if event_type_id in offsets:
+                ids_by_type.setdefault(event_type_id, []).append(event_id)
+
+        typed_values = {}
+        for event_type_id, ids in ids_by_type.items():
+            group, _ = offsets[event_type_id]
+            for event_id, *values in fetch(group, ids):
+                typed_values[event_id] = values
+
+        for event_id, event_type_id, row in chunk:
+            typed = [None] * width
+            values = typed_values.get(event_id)
+            if values is not None:
+                offset = offsets[event_type_id][1]
+                typed[offset:offset + len(values)] = values
+            yield row + tuple(typed)
@@ -1,26 +1,42 @@
 from rest_framework import views, response, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse, FileResponse
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from datetime import datetime
-import csv
 import io
 
 from apps.catalogs.models import Field, Campaign
-from apps.events.models import EventType
+from apps.events.registry import event_type_registry
+from .cache import pdf_report_cache
+from .compliance import phi_compliance
+from .delta import CursorExpired, EventDeltaExporter
 from .generators import PDFReportGenerator, CSVExporter, ExcelExporter
+from .jobs import enqueue_report_job, render_report, stream_csv_report
+from .models import ReportJob
+from .output import report_file_response
+from .rendering import get_pdf_renderer
 from .serializers import (
     FieldTraceabilityReportSerializer,
     CampaignTraceabilityReportSerializer,
-    ReportMetadataSerializer
+    EventDeltaQuerySerializer,
+    PHIComplianceQuerySerializer,
+    ReportMetadataSerializer,
+    ReportJobSerializer
 )
 
 
+def _streaming_csv_response(chunks, filename):
+    """Respuesta que envía un CSV por bloques conforme se genera."""
+    response_obj = StreamingHttpResponse(chunks, content_type='text/csv; charset=utf-8')
+    response_obj['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response_obj
+
+
 @extend_schema(
     summary="Health Check",
     description="""
@@ -99,7 +115,7 @@ def reports_dashboard_view(request):
         'page_title': 'Sistema de Reportes',
         'fields': Field.objects.filter(is_active=True).order_by('name'),
         'campaigns': Campaign.objects.all().order_by('-start_date'),
-        'event_types': EventType.objects.all().order_by('name'),
+        'event_types': event_type_registry.event_types('name'),
     }
     return render(request, 'reports/dashboard.html', context)
 
@@ -117,7 +133,7 @@ def traceability_report_view(request):
             'page_title': 'Reporte de Trazabilidad',
             'fields': Field.objects.filter(is_active=True).order_by('name'),
             'campaigns': Campaign.objects.all().order_by('-start_date'),
-            'event_types': EventType.objects.all().order_by('name'),
+            'event_types': event_type_registry.event_types('name'),
         }
         return render(request, 'reports/traceability_form.html', context)
     
@@ -135,7 +151,7 @@ def traceability_report_view(request):
             'page_title': 'Reporte de Trazabilidad',
             'fields': Field.objects.filter(is_active=True).order_by('name'),
             'campaigns': Campaign.objects.all().order_by('-start_date'),
-            'event_types': EventType.objects.all().order_by('name'),
+            'event_types': event_type_registry.event_types('name'),
             'error': 'Debe seleccionar un lote'
         }
         return render(request, 'reports/traceability_form.html', context)
@@ -162,14 +178,12 @@ def traceability_report_view(request):
             field = Field.objects.get(id=field_id)
             filename = f"trazabilidad_{field.code}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.pdf"
             
-            response = FileResponse(pdf_buffer, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            return report_file_response(pdf_buffer, filename, 'application/pdf')
             
         elif export_format == 'csv':
             # Generar CSV
             exporter = CSVExporter()
-            data = exporter.export_events(
+            chunks = exporter.stream_events(
                 field_id=field_id,
                 date_from=date_from_obj,
                 date_to=date_to_obj,
@@ -179,15 +193,7 @@ def traceability_report_view(request):
             field = Field.objects.get(id=field_id)
             filename = f"eventos_{field.code}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
             
-            response = HttpResponse(content_type='text/csv; charset=utf-8')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            response.write('\ufeff')  # BOM para Excel
-            
-            writer = csv.DictWriter(response, fieldnames=data[0].keys() if data else [])
-            writer.writeheader()
-            writer.writerows(data)
-            
-            return response
+            return _streaming_csv_response(chunks, filename)
             
         elif export_format == 'excel':
             # Generar Excel
@@ -202,19 +208,18 @@ def traceability_report_view(request):
             field = Field.objects.get(id=field_id)
             filename = f"eventos_{field.code}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             
-            response = FileResponse(
+            return report_file_response(
                 excel_buffer,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                filename,
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
             )
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
     
     except Exception as e:
         context = {
             'page_title': 'Reporte de Trazabilidad',
             'fields': Field.objects.filter(is_active=True).order_by('name'),
             'campaigns': Campaign.objects.all().order_by('-start_date'),
-            'event_types': EventType.objects.all().order_by('name'),
+            'event_types': event_type_registry.event_types('name'),
             'error': f'Error al generar el reporte: {str(e)}'
         }
         return render(request, 'reports/traceability_form.html', context)
@@ -230,6 +235,9 @@ def export_events_view(request):
     field_id = request.GET.get('field_id')
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
+    # Columnas específicas de cada tipo de evento (?wide=1) / hoja por tipo en Excel (?sheet_per_type=1)
+    wide = request.GET.get('wide') == '1'
+    sheet_per_type = request.GET.get('sheet_per_type') == '1'
     
     # Convertir parámetros (IDs son UUIDs, no convertir a int)
     field_id_val = field_id if field_id else None
@@ -239,41 +247,34 @@ def export_events_view(request):
     try:
         if export_format == 'csv':
             exporter = CSVExporter()
-            data = exporter.export_events(
+            chunks = exporter.stream_events(
                 field_id=field_id_val,
                 date_from=date_from_obj,
-                date_to=date_to_obj
+                date_to=date_to_obj,
+                wide=wide
             )
             
             filename = f"eventos_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
             
-            response = HttpResponse(content_type='text/csv; charset=utf-8')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            response.write('\ufeff')  # BOM para Excel
-            
-            if data:
-                writer = csv.DictWriter(response, fieldnames=data[0].keys())
-                writer.writeheader()
-                writer.writerows(data)
-            
-            return response
+            return _streaming_csv_response(chunks, filename)
             
         elif export_format == 'excel':
             exporter = ExcelExporter()
             excel_buffer = exporter.export_events(
                 field_id=field_id_val,
                 date_from=date_from_obj,
-                date_to=date_to_obj
+                date_to=date_to_obj,
+                wide=wide,
+                sheet_per_type=sheet_per_type
             )
             
             filename = f"eventos_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             
-            response = FileResponse(
+            return report_file_response(
                 excel_buffer,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                filename,
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
             )
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
             
     except Exception as e:
         return HttpResponse(f'Error al exportar datos: {str(e)}', status=500)
@@ -292,7 +293,7 @@ def campaign_traceability_report_view(request):
             'page_title': 'Reporte de Trazabilidad por Campaña',
             'fields': Field.objects.filter(is_active=True).order_by('name'),
             'campaigns': Campaign.objects.all().order_by('-start_date'),
-            'event_types': EventType.objects.all().order_by('name'),
+            'event_types': event_type_registry.event_types('name'),
         }
         return render(request, 'reports/campaign_traceability_form.html', context)
     
@@ -308,7 +309,7 @@ def campaign_traceability_report_view(request):
             'page_title': 'Reporte de Trazabilidad por Campaña',
             'fields': Field.objects.filter(is_active=True).order_by('name'),
             'campaigns': Campaign.objects.all().order_by('-start_date'),
-            'event_types': EventType.objects.all().order_by('name'),
+            'event_types': event_type_registry.event_types('name'),
             'error': 'Debe seleccionar una campaña'
         }
         return render(request, 'reports/campaign_traceability_form.html', context)
@@ -330,14 +331,12 @@ def campaign_traceability_report_view(request):
             campaign = Campaign.objects.get(id=campaign_id)
             filename = f"trazabilidad_campana_{campaign.name.replace(' ', '_')}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.pdf"
             
-            response = FileResponse(pdf_buffer, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            return report_file_response(pdf_buffer, filename, 'application/pdf')
             
         elif export_format == 'csv':
             # Generar CSV
             exporter = CSVExporter()
-            data = exporter.export_campaign_events(
+            chunks = exporter.stream_campaign_events(
                 campaign_id=campaign_id,
                 field_ids=field_ids_list,
                 event_types=event_types_list
@@ -346,15 +345,7 @@ def campaign_traceability_report_view(request):
             campaign = Campaign.objects.get(id=campaign_id)
             filename = f"eventos_campana_{campaign.name.replace(' ', '_')}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
             
-            response = HttpResponse(content_type='text/csv; charset=utf-8')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            response.write('\ufeff')  # BOM para Excel
-            
-            writer = csv.DictWriter(response, fieldnames=data[0].keys() if data else [])
-            writer.writeheader()
-            writer.writerows(data)
-            
-            return response
+            return _streaming_csv_response(chunks, filename)
             
         elif export_format == 'excel':
             # Generar Excel
@@ -368,19 +359,18 @@ def campaign_traceability_report_view(request):
             campaign = Campaign.objects.get(id=campaign_id)
             filename = f"eventos_campana_{campaign.name.replace(' ', '_')}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             
-            response = FileResponse(
+            return report_file_response(
                 excel_buffer,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                filename,
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
             )
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
     
     except Exception as e:
         context = {
             'page_title': 'Reporte de Trazabilidad por Campaña',
             'fields': Field.objects.filter(is_active=True).order_by('name'),
             'campaigns': Campaign.objects.all().order_by('-start_date'),
-            'event_types': EventType.objects.all().order_by('name'),
+            'event_types': event_type_registry.event_types('name'),
             'error': f'Error al generar el reporte: {str(e)}'
         }
         return render(request, 'reports/campaign_traceability_form.html', context)
@@ -388,6 +378,39 @@ def campaign_traceability_report_view(request):
 
 # ==================== VISTAS API ====================
 
+def _report_response(request, report_type, export_format, params, background):
+    """
+    Encola el reporte (202 con el trabajo) o lo genera dentro de la petición.
+    
+    Args:
+        request: Petición de la API
+        report_type: Tipo de reporte
+        export_format: Formato de salida
+        params: Parámetros del reporte (serializables a JSON)
+        background: Si se genera en segundo plano
+    
+    Returns:
+        Response con el trabajo encolado o la descarga del archivo (ver `output.py`)
+    """
+    if background:
+        job = enqueue_report_job(report_type, export_format, params, user=request.user)
+        serializer = ReportJobSerializer(job, context={'request': request})
+        return response.Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+    
+    try:
+        if export_format == 'csv':
+            chunks, filename, _ = stream_csv_report(report_type, params)
+            return _streaming_csv_response(chunks, filename)
+        output, filename, content_type = render_report(report_type, export_format, params)
+    except Exception as e:
+        return response.Response(
+            {'error': f'Error al generar el reporte: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    return report_file_response(output, filename, content_type)
+
+
 @extend_schema(
     summary="Listar tipos de reportes disponibles",
     description="""
@@ -467,7 +490,11 @@ class ReportTypesListView(views.APIView):
     - **Excel**: Múltiples hojas con datos, estadísticas y gráficos
     - **CSV**: Datos tabulares simples para importación
     
-    **Nota:** La respuesta será un archivo binario del formato seleccionado.
+    **Generación en segundo plano:** por defecto la respuesta es directamente
+    el archivo binario del formato seleccionado. Con `"background": true` la
+    petición solo registra el trabajo y responde 202 con su ID y `status_url`;
+    el worker (`python manage.py run_report_worker`) genera el archivo y, cuando
+    el estado es `completed`, se descarga desde `download_url`.
     """,
     tags=['Reportes API'],
     request=FieldTraceabilityReportSerializer,
@@ -476,6 +503,10 @@ class ReportTypesListView(views.APIView):
             description="Archivo del reporte en el formato solicitado",
             response=OpenApiTypes.BINARY
         ),
+        202: OpenApiResponse(
+            response=ReportJobSerializer,
+            description="Reporte encolado; consultar status_url y descargar desde download_url"
+        ),
         400: OpenApiResponse(
             description="Parámetros inválidos",
             response={
@@ -540,78 +571,20 @@ class FieldTraceabilityReportView(views.APIView):
             )
         
         data = serializer.validated_data
-        field_id = str(data['field_id'])
-        date_from = data.get('date_from')
-        date_to = data.get('date_to')
-        campaign_id = str(data['campaign_id']) if data.get('campaign_id') else None
-        event_types = [str(et) for et in data.get('event_types', [])] if data.get('event_types') else None
-        export_format = data.get('format', 'pdf')
+        params = {
+            'field_id': str(data['field_id']),
+            'date_from': data['date_from'].isoformat() if data.get('date_from') else None,
+            'date_to': data['date_to'].isoformat() if data.get('date_to') else None,
+            'campaign_id': str(data['campaign_id']) if data.get('campaign_id') else None,
+            'event_types': [str(et) for et in data.get('event_types', [])] or None,
+            'wide': data['wide'],
+            'sheet_per_type': data['sheet_per_type'],
+        }
         
         # Verificar que el lote existe
-        field = get_object_or_404(Field, id=field_id)
+        get_object_or_404(Field, id=params['field_id'])
         
-        try:
-            if export_format == 'pdf':
-                generator = PDFReportGenerator()
-                pdf_buffer = generator.generate_traceability_report(
-                    field_id=field_id,
-                    date_from=date_from,
-                    date_to=date_to,
-                    campaign_id=campaign_id,
-                    event_types=event_types
-                )
-                
-                filename = f"trazabilidad_{field.code}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                
-                response_obj = FileResponse(pdf_buffer, content_type='application/pdf')
-                response_obj['Content-Disposition'] = f'attachment; filename="{filename}"'
-                return response_obj
-                
-            elif export_format == 'csv':
-                exporter = CSVExporter()
-                data = exporter.export_events(
-                    field_id=field_id,
-                    date_from=date_from,
-                    date_to=date_to,
-                    event_types=event_types
-                )
-                
-                filename = f"eventos_{field.code}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                
-                response_obj = HttpResponse(content_type='text/csv; charset=utf-8')
-                response_obj['Content-Disposition'] = f'attachment; filename="{filename}"'
-                response_obj.write('\ufeff')  # BOM para Excel
-                
-                if data:
-                    writer = csv.DictWriter(response_obj, fieldnames=data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(data)
-                
-                return response_obj
-                
-            elif export_format == 'excel':
-                exporter = ExcelExporter()
-                excel_buffer = exporter.export_events(
-                    field_id=field_id,
-                    date_from=date_from,
-                    date_to=date_to,
-                    event_types=event_types
-                )
-                
-                filename = f"eventos_{field.code}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                
-                response_obj = FileResponse(
-                    excel_buffer,
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response_obj['Content-Disposition'] = f'attachment; filename="{filename}"'
-                return response_obj
-                
-        except Exception as e:
-            return response.Response(
-                {'error': f'Error al generar el reporte: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return _report_response(request, 'field_traceability', data['format'], params, data['background'])
 
 
 @extend_schema(
@@ -637,7 +610,11 @@ class FieldTraceabilityReportView(views.APIView):
     - **Excel**: Múltiples hojas con análisis detallado
     - **CSV**: Datos consolidados en formato tabular
     
-    **Nota:** La respuesta será un archivo binario del formato seleccionado.
+    **Generación en segundo plano:** por defecto la respuesta es directamente
+    el archivo binario del formato seleccionado. Con `"background": true` la
+    petición solo registra el trabajo y responde 202 con su ID y `status_url`;
+    el worker (`python manage.py run_report_worker`) genera el archivo y, cuando
+    el estado es `completed`, se descarga desde `download_url`.
     """,
     tags=['Reportes API'],
     request=CampaignTraceabilityReportSerializer,
@@ -646,6 +623,10 @@ class FieldTraceabilityReportView(views.APIView):
             description="Archivo del reporte en el formato solicitado",
             response=OpenApiTypes.BINARY
         ),
+        202: OpenApiResponse(
+            response=ReportJobSerializer,
+            description="Reporte encolado; consultar status_url y descargar desde download_url"
+        ),
         400: OpenApiResponse(
             description="Parámetros inválidos",
             response={
@@ -710,69 +691,399 @@ class CampaignTraceabilityReportView(views.APIView):
             )
         
         data = serializer.validated_data
-        campaign_id = str(data['campaign_id'])
-        field_ids = [str(fid) for fid in data.get('field_ids', [])] if data.get('field_ids') else None
-        event_types = [str(et) for et in data.get('event_types', [])] if data.get('event_types') else None
-        export_format = data.get('format', 'pdf')
+        params = {
+            'campaign_id': str(data['campaign_id']),
+            'field_ids': [str(fid) for fid in data.get('field_ids', [])] or None,
+            'event_types': [str(et) for et in data.get('event_types', [])] or None,
+            'wide': data['wide'],
+            'sheet_per_type': data['sheet_per_type'],
+        }
         
         # Verificar que la campaña existe
-        campaign = get_object_or_404(Campaign, id=campaign_id)
+        get_object_or_404(Campaign, id=params['campaign_id'])
+        
+        return _report_response(request, 'campaign_traceability', data['format'], params, data['background'])
+
+
+@extend_schema(
+    summary="Exportación incremental de eventos",
+    description="""
+    Retorna solo los eventos creados o modificados y los eventos borrados desde
+    el cursor `since`, para sincronizar un sistema externo sin descargar todos
+    los eventos en cada ocasión.
+    
+    **Uso:**
+    1. Primera llamada sin `since`: entrega todos los eventos (por páginas de `limit`)
+    2. Guardar `cursor` y enviarlo como `since` en la siguiente llamada
+    3. Mientras `has_more` sea `true`, volver a llamar de inmediato con el nuevo cursor
+    4. Aplicar `events` (insertar/actualizar por `id`) y después `deleted` (borrar por `id`)
+    
+    Solo se incluyen cambios con más de `REPORT_DELTA_LAG_SECONDS` segundos de
+    antigüedad. Un cursor anterior a la retención de borrados
+    (`EVENT_TOMBSTONE_RETENTION_DAYS`) responde 410 y requiere una exportación completa.
+    """,
+    tags=['Reportes API'],
+    parameters=[EventDeltaQuerySerializer],
+    responses={
+        200: OpenApiResponse(
+            description="Cambios desde el cursor",
+            response={
+                'type': 'object',
+                'properties': {
+                    'events': {
+                        'type': 'array',
+                        'items': {'type': 'object', 'additionalProperties': True},
+                        'description': 'Columnas de la exportación CSV más actualizado_el',
+                    },
+                    'deleted': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'id': {'type': 'string', 'format': 'uuid'},
+                                'deleted_at': {'type': 'string', 'format': 'date-time'},
+                            }
+                        }
+                    },
+                    'cursor': {'type': 'string', 'example': 'ZDF8MjAyNC0xMC0yN1QxMDozMDowMCswMDowMHw...'},
+                    'has_more': {'type': 'boolean', 'example': False},
+                }
+            }
+        ),
+        400: OpenApiResponse(description="Parámetros o cursor inválidos"),
+        410: OpenApiResponse(description="Cursor expirado; se requiere una exportación completa"),
+    },
+)
+class EventDeltaExportView(views.APIView):
+    """
+    Exportación incremental de eventos.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        serializer = EventDeltaQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return response.Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         
+        data = serializer.validated_data
         try:
-            if export_format == 'pdf':
-                generator = PDFReportGenerator()
-                pdf_buffer = generator.generate_campaign_traceability_report(
-                    campaign_id=campaign_id,
-                    field_ids=field_ids,
-                    event_types=event_types
-                )
-                
-                filename = f"trazabilidad_campana_{campaign.name.replace(' ', '_')}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                
-                response_obj = FileResponse(pdf_buffer, content_type='application/pdf')
-                response_obj['Content-Disposition'] = f'attachment; filename="{filename}"'
-                return response_obj
-                
-            elif export_format == 'csv':
-                exporter = CSVExporter()
-                data = exporter.export_campaign_events(
-                    campaign_id=campaign_id,
-                    field_ids=field_ids,
-                    event_types=event_types
-                )
-                
-                filename = f"eventos_campana_{campaign.name.replace(' ', '_')}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                
-                response_obj = HttpResponse(content_type='text/csv; charset=utf-8')
-                response_obj['Content-Disposition'] = f'attachment; filename="{filename}"'
-                response_obj.write('\ufeff')  # BOM para Excel
-                
-                if data:
-                    writer = csv.DictWriter(response_obj, fieldnames=data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(data)
-                
-                return response_obj
-                
-            elif export_format == 'excel':
-                exporter = ExcelExporter()
-                excel_buffer = exporter.export_campaign_events(
-                    campaign_id=campaign_id,
-                    field_ids=field_ids,
-                    event_types=event_types
-                )
-                
-                filename = f"eventos_campana_{campaign.name.replace(' ', '_')}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                
-                response_obj = FileResponse(
-                    excel_buffer,
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response_obj['Content-Disposition'] = f'attachment; filename="{filename}"'
-                return response_obj
-                
-        except Exception as e:
+            delta = EventDeltaExporter().export_delta(data.get('since') or None, data['limit'], data['wide'])
+        except CursorExpired as e:
+            return response.Response({'error': str(e)}, status=status.HTTP_410_GONE)
+        except ValueError as e:
+            return response.Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return response.Response(delta, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="Cumplimiento de intervalos de seguridad",
+    description="""
+    Verifica que ninguna cosecha se haya hecho dentro del intervalo de
+    seguridad (`intervalo_seguridad_dias`) de una aplicación fitosanitaria del
+    mismo lote.
+    
+    Una aplicación del día D con intervalo N permite cosechar a partir de
+    D + N. Una cosecha ocupa de `fecha_inicio` a `fecha_fin` (o el día del
+    evento si no tiene fechas); si algún día cae dentro del plazo se reporta
+    el par cosecha/aplicación con los días de anticipación (`days_early`).
+    
+    Se consideran las aplicaciones del lote de cualquier campaña (una
+    aplicación al final de una campaña puede afectar la siguiente). Sin
+    filtros se verifican todos los lotes y campañas.
+    
+    **Respuesta:**
+    - `compliant`: true si no hay incumplimientos
+    - `violations`: pares cosecha/aplicación fuera de plazo
+    - `by_field`: resumen por lote, con `safe_harvest_from` (primer día en que
+      se puede cosechar según todas las aplicaciones del lote)
+    - `by_campaign`: resumen por campaña de las cosechas
+    """,
+    tags=['Reportes API'],
+    parameters=[PHIComplianceQuerySerializer],
+    responses={
+        200: OpenApiResponse(
+            description="Resultado de la verificación",
+            response={
+                'type': 'object',
+                'properties': {
+                    'compliant': {'type': 'boolean', 'example': False},
+                    'total_harvests': {'type': 'integer', 'example': 42},
+                    'non_compliant_harvests': {'type': 'integer', 'example': 1},
+                    'total_applications': {'type': 'integer', 'example': 130},
+                    'applications_without_interval': {'type': 'integer', 'example': 3},
+                    'violations': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'harvest_id': {'type': 'string', 'format': 'uuid'},
+                                'field_id': {'type': 'string', 'format': 'uuid'},
+                                'field_name': {'type': 'string', 'example': 'Lote Norte'},
+                                'campaign_id': {'type': 'string', 'format': 'uuid', 'nullable': True},
+                                'campaign_name': {'type': 'string', 'nullable': True},
+                                'harvest_start': {'type': 'string', 'format': 'date'},
+                                'harvest_end': {'type': 'string', 'format': 'date'},
+                                'volumen_kg': {'type': 'string', 'example': '1200.00'},
+                                'application_id': {'type': 'string', 'format': 'uuid'},
+                                'application_date': {'type': 'string', 'format': 'date'},
+                                'producto': {'type': 'string', 'example': 'Abamectina 1.8 CE'},
+                                'ingrediente_activo': {'type': 'string', 'nullable': True},
+                                'intervalo_seguridad_dias': {'type': 'integer', 'example': 14},
+                                'safe_from': {'type': 'string', 'format': 'date'},
+                                'days_early': {'type': 'integer', 'example': 5},
+                            }
+                        }
+                    },
+                    'by_field': {'type': 'array', 'items': {'type': 'object', 'additionalProperties': True}},
+                    'by_campaign': {'type': 'array', 'items': {'type': 'object', 'additionalProperties': True}},
+                }
+            }
+        ),
+        400: OpenApiResponse(description="Parámetros inválidos"),
+    },
+)
+class PHIComplianceView(views.APIView):
+    """
+    Cumplimiento de intervalos de seguridad precosecha.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        serializer = PHIComplianceQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return response.Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        result = phi_compliance(
+            field_id=data.get('field_id'),
+            campaign_id=data.get('campaign_id'),
+            field_ids=data.get('field_ids') or None,
+            date_from=data.get('date_from'),
+            date_to=data.get('date_to'),
+        )
+        return response.Response(result, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="Listar trabajos de reportes",
+    description="""
+    Lista los trabajos de reportes en segundo plano del usuario autenticado
+    (los superusuarios ven todos), del más reciente al más antiguo.
+    
+    **Query Parameters:**
+    - `status`: Filtrar por estado (pending, running, completed, failed)
+    """,
+    tags=['Reportes API'],
+    parameters=[
+        OpenApiParameter(
+            name='status',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description='Filtrar por estado',
+            enum=[choice for choice, _ in ReportJob.STATUSES],
+        ),
+    ],
+    responses={
+        200: OpenApiResponse(
+            response=ReportJobSerializer(many=True),
+            description="Últimos 50 trabajos de reportes"
+        ),
+    },
+)
+class ReportJobListView(views.APIView):
+    """
+    Lista los trabajos de reportes del usuario.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @extend_schema(operation_id='reports_jobs_list')
+    def get(self, request):
+        jobs = _user_report_jobs(request.user)
+        job_status = request.query_params.get('status')
+        if job_status:
+            jobs = jobs.filter(status=job_status)
+        
+        serializer = ReportJobSerializer(jobs[:50], many=True, context={'request': request})
+        return response.Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="Estado de un trabajo de reporte",
+    description="""
+    Obtiene el estado y el progreso (0-100) de un trabajo de reporte.
+    
+    **Estados:**
+    - `pending`: En cola, esperando al worker
+    - `running`: Generándose
+    - `completed`: Listo; `download_url` contiene la URL de descarga
+    - `failed`: Error al generar; ver `error`
+    """,
+    tags=['Reportes API'],
+    responses={
+        200: OpenApiResponse(response=ReportJobSerializer, description="Estado del trabajo"),
+        404: OpenApiResponse(description="Trabajo no encontrado"),
+    },
+)
+class ReportJobDetailView(views.APIView):
+    """
+    Consulta el estado de un trabajo de reporte.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        job = get_object_or_404(_user_report_jobs(request.user), pk=pk)
+        serializer = ReportJobSerializer(job, context={'request': request})
+        return response.Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="Descargar el archivo de un trabajo de reporte",
+    description="""
+    Descarga el archivo generado por un trabajo de reporte completado.
+    
+    Si el trabajo aún no termina (o falló) responde 409 con su estado actual.
+    """,
+    tags=['Reportes API'],
+    responses={
+        200: OpenApiResponse(
+            description="Archivo del reporte",
+            response=OpenApiTypes.BINARY
+        ),
+        404: OpenApiResponse(description="Trabajo no encontrado"),
+        409: OpenApiResponse(
+            description="El reporte aún no está disponible",
+            response={
+                'type': 'object',
+                'properties': {
+                    'error': {'type': 'string', 'example': 'El reporte aún no está disponible'},
+                    'status': {'type': 'string', 'example': 'running'},
+                    'progress': {'type': 'integer', 'example': 10},
+                }
+            }
+        ),
+    },
+)
+class ReportJobDownloadView(views.APIView):
+    """
+    Descarga el archivo de un trabajo de reporte completado.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        job = get_object_or_404(_user_report_jobs(request.user), pk=pk)
+        
+        if job.status != ReportJob.STATUS_COMPLETED or not job.file:
             return response.Response(
-                {'error': f'Error al generar el reporte: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {
+                    'error': 'El reporte aún no está disponible',
+                    'status': job.status,
+                    'progress': job.progress,
+                },
+                status=status.HTTP_409_CONFLICT
             )
+        
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=job.filename,
+            content_type=job.content_type
+        )
+
+
+def _user_report_jobs(user):
+    """Trabajos de reportes visibles para el usuario."""
+    jobs = ReportJob.objects.all()
+    if not user.is_superuser:
+        jobs = jobs.filter(created_by=user)
+    return jobs
+
+
+@extend_schema(
+    summary="Estadísticas de la caché de reportes PDF",
+    description="""
+    Estado de la caché en disco de reportes PDF (solo administradores).
+    
+    - `hits` / `misses` / `hit_ratio` / `evictions`: contadores del proceso que atiende la petición
+    - `coalesced`: peticiones que esperaron el mismo PDF que generaba otra petición en lugar de generarlo
+    - `entries` / `size_bytes`: archivos y bytes en disco (compartidos por todos los procesos)
+    - `max_bytes`: límite configurado con `REPORT_CACHE_MAX_MB`
+    """,
+    tags=['Reportes API'],
+    responses={
+        200: OpenApiResponse(
+            description="Estadísticas de la caché",
+            response={
+                'type': 'object',
+                'properties': {
+                    'enabled': {'type': 'boolean', 'example': True},
+                    'hits': {'type': 'integer', 'example': 42},
+                    'misses': {'type': 'integer', 'example': 8},
+                    'hit_ratio': {'type': 'number', 'nullable': True, 'example': 0.84},
+                    'evictions': {'type': 'integer', 'example': 0},
+                    'coalesced': {'type': 'integer', 'example': 3},
+                    'entries': {'type': 'integer', 'example': 8},
+                    'size_bytes': {'type': 'integer', 'example': 2457600},
+                    'max_bytes': {'type': 'integer', 'example': 536870912},
+                }
+            }
+        ),
+    },
+)
+class ReportCacheStatsView(views.APIView):
+    """
+    Estadísticas de la caché de reportes PDF.
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return response.Response(pdf_report_cache.stats(), status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="Métricas del renderizador PDF",
+    description="""
+    Tiempos de generación de PDF del proceso que atiende la petición (solo administradores).
+    
+    - `warmup_seconds`: carga inicial de fuentes, hojas de estilo y templates
+    - `phases.html`: renderizado del template HTML
+    - `phases.layout`: maquetación con WeasyPrint
+    - `phases.write`: escritura del PDF
+    """,
+    tags=['Reportes API'],
+    responses={
+        200: OpenApiResponse(
+            description="Métricas del renderizador",
+            response={
+                'type': 'object',
+                'properties': {
+                    'pid': {'type': 'integer', 'example': 4312},
+                    'renders': {'type': 'integer', 'example': 25},
+                    'warmup_seconds': {'type': 'number', 'example': 0.412},
+                    'stylesheets': {'type': 'array', 'items': {'type': 'string'}},
+                    'phases': {
+                        'type': 'object',
+                        'additionalProperties': {
+                            'type': 'object',
+                            'properties': {
+                                'count': {'type': 'integer', 'example': 25},
+                                'total_seconds': {'type': 'number', 'example': 3.21},
+                                'avg_seconds': {'type': 'number', 'nullable': True, 'example': 0.128},
+                                'max_seconds': {'type': 'number', 'example': 0.9},
+                                'last_seconds': {'type': 'number', 'example': 0.11},
+                            }
+                        }
+                    },
+                }
+            }
+        ),
+    },
+)
+class ReportRendererStatsView(views.APIView):
+    """
+    Métricas del renderizador PDF del proceso.
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return response.Response(get_pdf_renderer().stats(), status=status.HTTP_200_OK)
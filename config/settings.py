@@ -135,6 +135,68 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Trabajos de reportes en segundo plano: minutos tras los cuales un trabajo
+# "en proceso" se da por perdido (worker detenido) y días que se conservan los
+# trabajos terminados y sus archivos en MEDIA_ROOT/reports
+REPORT_JOB_TIMEOUT_MINUTES = env.int('REPORT_JOB_TIMEOUT_MINUTES', default=60)
+REPORT_JOB_RETENTION_DAYS = env.int('REPORT_JOB_RETENTION_DAYS', default=7)
+
+# Caché en disco de reportes PDF (0 MB la desactiva)
+REPORT_CACHE_DIR = env('REPORT_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'reports'))
+REPORT_CACHE_MAX_BYTES = env.int('REPORT_CACHE_MAX_MB', default=512) * 1024 * 1024
+# Segundos que una petición espera el mismo PDF que genera otra antes de
+# generarlo por su cuenta (y antigüedad a partir de la cual un lock se descarta)
+REPORT_RENDER_LOCK_TIMEOUT = env.int('REPORT_RENDER_LOCK_TIMEOUT', default=600)
+
+# Reportes generados que se entregan desde disco (se eliminan pasados los minutos
+# indicados). REPORT_SENDFILE: '' (Django lee el archivo por bloques),
+# 'x-sendfile' (Apache/lighttpd) o 'x-accel-redirect' (nginx, con una location
+# interna en REPORT_SENDFILE_URL que apunte a REPORT_OUTPUT_DIR)
+REPORT_OUTPUT_DIR = env('REPORT_OUTPUT_DIR', default=str(BASE_DIR / 'cache' / 'report_output'))
+REPORT_OUTPUT_MAX_AGE_MINUTES = env.int('REPORT_OUTPUT_MAX_AGE_MINUTES', default=60)
+REPORT_SENDFILE = env('REPORT_SENDFILE', default='')
+REPORT_SENDFILE_URL = env('REPORT_SENDFILE_URL', default='/_reports/')
+
+# Reportes PDF de campaña por secciones en paralelo (procesos; 1 lo desactiva)
+REPORT_PDF_WORKERS = env.int('REPORT_PDF_WORKERS', default=min(4, os.cpu_count() or 1))
+REPORT_PDF_PARALLEL_MIN_EVENTS = env.int('REPORT_PDF_PARALLEL_MIN_EVENTS', default=1500)
+
+# Precarga del renderizador PDF (fuentes, estilos y templates) al iniciar cada worker WSGI
+REPORT_PDF_WARMUP = env.bool('REPORT_PDF_WARMUP', default=True)
+
+# Exportación incremental de eventos: antigüedad mínima de los cambios entregados
+# (transacciones aún sin confirmar) y días que se conservan los borrados
+REPORT_DELTA_LAG_SECONDS = env.int('REPORT_DELTA_LAG_SECONDS', default=30)
+EVENT_TOMBSTONE_RETENTION_DAYS = env.int('EVENT_TOMBSTONE_RETENTION_DAYS', default=90)
+
+# ThingSpeak: canal por defecto de `get_thingspeak_service()` y segundos entre
+# consultas de `ingest_thingspeak` (el canal de cada estación se configura en Station)
+THINGSPEAK_BASE_URL = env('THINGSPEAK_BASE_URL', default='https://api.thingspeak.com')
+THINGSPEAK_CHANNEL_ID = env('THINGSPEAK_CHANNEL_ID', default='3142831')
+THINGSPEAK_API_KEY = env('THINGSPEAK_API_KEY', default='FQR4GTLHXXO0I3K2')
+THINGSPEAK_POLL_INTERVAL = env.int('THINGSPEAK_POLL_INTERVAL', default=60)
+# Cliente HTTP: segundos de espera por petición, reintentos con espera
+# exponencial (backoff * 2^n segundos) y canales consultados en paralelo
+THINGSPEAK_TIMEOUT = env.float('THINGSPEAK_TIMEOUT', default=10.0)
+THINGSPEAK_RETRIES = env.int('THINGSPEAK_RETRIES', default=3)
+THINGSPEAK_BACKOFF = env.float('THINGSPEAK_BACKOFF', default=0.5)
+THINGSPEAK_MAX_WORKERS = env.int('THINGSPEAK_MAX_WORKERS', default=32)
+
+# Caché en memoria de las respuestas de sensores: segundos de vigencia (0 la
+# desactiva), segundos que una respuesta vencida se sigue entregando mientras
+# se actualiza en segundo plano y máximo de respuestas guardadas por proceso
+SENSOR_CACHE_TTL = env.int('SENSOR_CACHE_TTL', default=10)
+SENSOR_CACHE_MAX_STALE = env.int('SENSOR_CACHE_MAX_STALE', default=120)
+SENSOR_CACHE_MAX_ENTRIES = env.int('SENSOR_CACHE_MAX_ENTRIES', default=256)
+
+# Stream SSE del dashboard de sensores: segundos entre consultas de lecturas
+# nuevas, duración máxima de cada conexión (el navegador se reconecta solo) y
+# máximo de conexiones por proceso (menor que los hilos de cada worker para
+# que el resto de las peticiones siga teniendo hilos libres)
+SENSOR_STREAM_POLL_SECONDS = env.float('SENSOR_STREAM_POLL_SECONDS', default=5.0)
+SENSOR_STREAM_MAX_SECONDS = env.int('SENSOR_STREAM_MAX_SECONDS', default=300)
+SENSOR_STREAM_MAX_CONNECTIONS = env.int('SENSOR_STREAM_MAX_CONNECTIONS', default=12)
+
 # WhiteNoise configuration
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -4,8 +4,15 @@ WSGI config para el proyecto de trazabilidad.
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+if settings.REPORT_PDF_WARMUP:
+    # El primer reporte del worker no paga la carga de fuentes y estilos
+    from apps.reports.rendering import get_pdf_renderer
+
+    get_pdf_renderer()
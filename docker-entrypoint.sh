@@ -9,8 +9,9 @@ until python -c "import psycopg2; psycopg2.connect(host='${POSTGRES_HOST:-db}',
 done
 echo "PostgreSQL está listo"
 
-# Skip migrations if migrations don't exist yet
-if [ -f "/app/apps/core/migrations/0001_initial.py" ]; then
+# Skip migrations if migrations don't exist yet; the workers set
+# SKIP_MIGRATIONS=true and leave migrations and static files to the web service
+if [ "${SKIP_MIGRATIONS:-false}" != "true" ] && [ -f "/app/apps/core/migrations/0001_initial.py" ]; then
     echo "Aplicando migraciones..."
     python manage.py migrate --noinput
 
@@ -18,5 +19,5 @@ if [ -f "/app/apps/core/migrations/0001_initial.py" ]; then
     python manage.py collectstatic --noinput --clear
 fi
 
-echo "Iniciando servidor..."
+echo "Iniciando: $*"
 exec "$@"